@@ -6,6 +6,8 @@
 # Usage:
 #   ./run_all.sh              # Run complete workflow
 #   ./run_all.sh --clean      # Clean outputs and re-run
+#   ./run_all.sh --no-cache   # Ignore the result cache and recompute
+#   ./run_all.sh --jobs=4     # Worker processes for the task DAG (workflow.py)
 #
 # Author: Monisha Mudunuri and Yamuna Nair 
 # Date: December 2025
@@ -18,8 +20,21 @@ echo "======================================================================"
 
 # Parse arguments
 CLEAN=false
-if [ "$1" == "--clean" ]; then
-    CLEAN=true
+USE_CACHE=true
+JOBS=""
+for arg in "$@"; do
+    case "$arg" in
+        --clean) CLEAN=true ;;
+        --no-cache) USE_CACHE=false ;;
+        --jobs=*) JOBS="-j ${arg#--jobs=}" ;;
+    esac
+done
+
+# With workflow.py present, integration and every table/figure run as a task DAG:
+# independent tasks in parallel, unchanged artifacts skipped
+USE_DAG=false
+if [ -f "workflow.py" ]; then
+    USE_DAG=true
 fi
 
 # Clean previous outputs if requested
@@ -43,6 +58,14 @@ if ! command -v python &> /dev/null; then
 fi
 echo "  ✓ Python found: $(python --version)"
 
+# Rebuild the cleaned datasets from the raw drops when they are missing
+if { [ ! -f "cleaned_cmu-sleep.csv" ] || [ ! -f "cleaned_student_habits.csv" ]; } \
+        && [ -f "refine_replay.py" ] && [ -f "data/raw/cmu_sleep.csv" ] && [ -f "data/raw/student_habits.csv" ]; then
+    mkdir -p logs
+    python refine_replay.py > logs/cleaning.log 2>&1 \
+        && echo "  ✓ Cleaned datasets rebuilt from OpenRefine histories (see logs/cleaning.log)"
+fi
+
 # Check required files
 if [ ! -f "cleaned_cmu-sleep.csv" ]; then
     echo "  ✗ cleaned_cmu-sleep.csv not found"
@@ -57,14 +80,15 @@ if [ ! -f "cleaned_student_habits.csv" ]; then
 fi
 echo "  ✓ Cleaned datasets found"
 
-# Check required scripts
-if [ ! -f "03_data_integration.py" ]; then
-    echo "  ✗ 03_data_integration.py not found"
+# Check required scripts (the DAG's integrate task runs 02_data_integration.py too;
+# 03_analysis_visualization.py is only needed without workflow.py)
+if [ ! -f "02_data_integration.py" ]; then
+    echo "  ✗ 02_data_integration.py not found"
     exit 1
 fi
 
-if [ ! -f "04_analysis_visualization.py" ]; then
-    echo "  ✗ 04_analysis_visualization.py not found"
+if [ "$USE_DAG" = false ] && [ ! -f "03_analysis_visualization.py" ]; then
+    echo "  ✗ 03_analysis_visualization.py not found"
     exit 1
 fi
 echo "  ✓ Analysis scripts found"
@@ -76,10 +100,26 @@ mkdir -p results/figures
 mkdir -p logs
 echo "  ✓ Output directories ready"
 
+# Result cache: identical inputs, scripts and config restore previous outputs
+CACHE_HIT=false
+if [ "$USE_CACHE" = true ] && [ -f "result_cache.py" ]; then
+    if python result_cache.py restore > logs/cache.log 2>&1; then
+        CACHE_HIT=true
+        echo ""
+        echo "  ✓ Inputs unchanged - outputs restored from cache (see logs/cache.log)"
+    fi
+fi
+
 # Step 2: Data Integration
 echo ""
 echo "[2/4] Running data integration..."
-python 03_data_integration.py > logs/integration.log 2>&1
+if [ "$CACHE_HIT" = false ]; then
+    if [ "$USE_DAG" = true ]; then
+        python workflow.py integrate $JOBS > logs/integration.log 2>&1
+    else
+        python 02_data_integration.py > logs/integration.log 2>&1
+    fi
+fi
 
 if [ ! -f "data/integrated_data.csv" ]; then
     echo "  ✗ Integration failed. Check logs/integration.log"
@@ -90,10 +130,16 @@ echo "  ✓ Data integration complete"
 # Step 3: Analysis and Visualization
 echo ""
 echo "[3/4] Running analysis and visualization..."
-python 04_analysis_visualization.py > logs/analysis.log 2>&1
+if [ "$CACHE_HIT" = false ]; then
+    if [ "$USE_DAG" = true ]; then
+        python workflow.py $JOBS > logs/analysis.log 2>&1
+    else
+        python 03_analysis_visualization.py > logs/analysis.log 2>&1
+    fi
+fi
 
 # Check outputs
-EXPECTED_TABLES=("descriptive_statistics.json" "correlations.json" "regression_results.json" "category_analysis.json")
+EXPECTED_TABLES=("descriptive_statistics.json" "correlations.json" "regression_results.json" "category_analysis.json" "sleep_category_sensitivity.json")
 EXPECTED_FIGURES=("01_sleep_distribution.png" "02_sleep_vs_performance.png" "03_dataset_comparison.png" "04_productivity_mediation.png")
 
 MISSING_FILES=0
@@ -118,6 +164,10 @@ if [ $MISSING_FILES -gt 0 ]; then
 fi
 echo "  ✓ Analysis and visualization complete"
 
+if [ "$USE_CACHE" = true ] && [ "$CACHE_HIT" = false ] && [ -f "result_cache.py" ]; then
+    python result_cache.py store >> logs/cache.log 2>&1 && echo "  ✓ Outputs cached for identical re-runs"
+fi
+
 # Step 4: Summary
 echo ""
 echo "[4/4] Generating summary..."
@@ -2,63 +2,251 @@
 Data Acquisition Script
 Project: Sleep Patterns and Academic Performance
 Authors: Yamuna Nair & Monisha Mudunuri
- 
+
 This script downloads the required datasets and verifies their integrity.
+
+Downloads stream straight to disk with the SHA-256 (and row count) computed
+on the fly. Interrupted transfers leave a .part file that is resumed with an
+HTTP Range request. Sources are fetched concurrently over one pooled session
+with retry/backoff, and a fetch is skipped when the server answers a
+conditional request (ETag / If-Modified-Since) with 304 Not Modified, or when
+the local file still matches CHECKSUMS.txt and the server offers no validators.
+A new or resumed download must match its CHECKSUMS.txt entry before it
+replaces the local file (--refresh accepts a changed source as the new baseline).
 """
- 
+
 import requests
+import argparse
 import hashlib
+import json
 import os
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
- 
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import checksums
+
 # Create data directories if they don't exist
 DATA_DIR = Path("data/raw")
-DATA_DIR.mkdir(parents=True, exist_ok=True)
- 
-def calculate_sha256(filepath):
-    """Calculate SHA-256 checksum of a file."""
+
+# Downloadable sources (the Kaggle dataset needs a manual download)
+SOURCES = {
+    "cmu_sleep.csv": "https://cmustatistics.github.io/data-repository/data/cmu-sleep.csv",
+}
+
+# Transfer settings
+CHUNK_SIZE = 1024 * 1024
+TIMEOUT = 30
+RETRIES = 5
+BACKOFF = 0.5
+
+def make_session(pool_size=8, retries=RETRIES, backoff=BACKOFF):
+    """HTTP session with a shared connection pool and retry/backoff on transient errors."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def read_checksums(data_dir=DATA_DIR):
+    """Parse CHECKSUMS.txt into {filename: sha256}."""
+    checksum_file = Path(data_dir) / "CHECKSUMS.txt"
+    if not checksum_file.exists():
+        return {}
+    checksums = {}
+    lines = [line.strip() for line in checksum_file.read_text().splitlines()]
+    for name, value in zip(lines, lines[1:]):
+        if name.endswith(":") and len(value) == 64:
+            checksums[name[:-1]] = value
+    return checksums
+
+def _meta_path(output_path):
+    return output_path.with_name(output_path.name + ".meta.json")
+
+def _load_meta(output_path):
+    path = _meta_path(output_path)
+    return json.loads(path.read_text()) if path.exists() else {}
+
+def _file_info(path, sha256_hash=None):
+    """One pass over a local file: checksum, line count and header."""
+    sha256_hash = hashlib.sha256() if sha256_hash is None else sha256_hash
+    lines = 0
+    header = b""
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            if not header:
+                header = block.split(b"\n", 1)[0]
+            sha256_hash.update(block)
+            lines += block.count(b"\n")
+    return sha256_hash.hexdigest(), lines, header
+
+def _content_range(value):
+    """(start, total) from a Content-Range header ('bytes 100-199/200' or 'bytes */200')."""
+    try:
+        _, spec = value.split(" ", 1)
+        span, total = spec.split("/", 1)
+        first = None if span == "*" else int(span.split("-", 1)[0])
+        return first, None if total == "*" else int(total)
+    except (AttributeError, ValueError):
+        return None, None
+
+def _discard_part(part_path):
+    part_path.unlink(missing_ok=True)
+    part_path.with_suffix(".part.json").unlink(missing_ok=True)
+
+def fetch(session, name, url, data_dir=DATA_DIR, expected=None, refresh=False):
+    """Fetch one source: conditional, resumable, hashed while streaming.
+
+    Returns a dict with status ('downloaded', 'resumed', 'not-modified',
+    'checksum-match' or 'error'), sha256, bytes, rows and columns. A transfer
+    whose SHA-256 differs from expected (unless refresh) is an error and the
+    local file is left untouched.
+    """
+    output_path = Path(data_dir) / name
+    part_path = output_path.with_name(output_path.name + ".part")
+    meta = _load_meta(output_path) if output_path.exists() else {}
+    has_validators = bool(meta.get("etag") or meta.get("last_modified"))
+
+    # No validators to ask the server with: trust a local file that matches CHECKSUMS.txt
+    if output_path.exists() and expected and not has_validators and not refresh:
+        if meta.get("sha256") == expected and meta.get("size") == output_path.stat().st_size:
+            return {"name": name, "status": "checksum-match", **meta}
+        sha, lines, header = _file_info(output_path)
+        if sha == expected:
+            meta = {"sha256": sha, "size": output_path.stat().st_size, "rows": max(lines - 1, 0),
+                    "columns": header.decode("utf-8-sig").strip().split(",")}
+            _meta_path(output_path).write_text(json.dumps(meta, indent=2))
+            return {"name": name, "status": "checksum-match", **meta}
+
+    # Byte offsets only line up with an unencoded body (GitHub Pages gzips CSVs otherwise)
+    headers = {"Accept-Encoding": "identity"}
+    if output_path.exists() and not refresh:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    # Resume a previous partial transfer; If-Range makes the server restart if the file changed
     sha256_hash = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        # Read file in chunks to handle large files
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
- 
-def download_cmu_dataset():
-    """Download CMU Sleep and GPA dataset."""
-    url = "https://cmustatistics.github.io/data-repository/data/cmu-sleep.csv"
-    output_path = DATA_DIR / "cmu_sleep.csv"
-    print("=" * 60)
-    print("DOWNLOADING CMU SLEEP DATASET")
-    print("=" * 60)
-    print(f"Source URL: {url}")
-    print(f"Destination: {output_path}")
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    part_meta_path = part_path.with_suffix(".part.json")
+    part_meta = json.loads(part_meta_path.read_text()) if part_meta_path.exists() else {}
+    if offset and part_meta.get("etag"):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = part_meta["etag"]
+    elif offset and part_meta.get("last_modified"):
+        headers["Range"] = f"bytes={offset}-"
+        headers["If-Range"] = part_meta["last_modified"]
+
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()  # Raise error for bad status codes
-        # Save the file
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-        # Calculate checksum
-        checksum = calculate_sha256(output_path)
-        print(f"✓ Download successful!")
-        print(f"SHA-256: {checksum}")
-        # Load and display basic info
-        df = pd.read_csv(output_path)
-        print(f"\nDataset Info:")
-        print(f"  Rows: {len(df)}")
-        print(f"  Columns: {len(df.columns)}")
-        print(f"  Column names: {', '.join(df.columns.tolist())}")
-        print(f"  File size: {os.path.getsize(output_path) / 1024:.2f} KB")
-        return checksum
+        with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as response:
+            if response.status_code == 304:
+                return {"name": name, "status": "not-modified", **meta}
+            if response.status_code == 416 and "Range" in headers:
+                # Nothing left to send: the .part is complete if it is as long as the file
+                _, total = _content_range(response.headers.get("Content-Range"))
+                if total != offset:
+                    _discard_part(part_path)
+                    return {"name": name, "status": "error",
+                            "error": f"server rejected resuming at byte {offset:,} (size {total}); "
+                                     f"partial download discarded"}
+                resumed = True
+                etag, last_modified = part_meta.get("etag"), part_meta.get("last_modified")
+                _, lines, header = _file_info(part_path, sha256_hash)
+            else:
+                response.raise_for_status()
+                resumed = response.status_code == 206
+                if resumed and _content_range(response.headers.get("Content-Range"))[0] != offset:
+                    _discard_part(part_path)
+                    return {"name": name, "status": "error",
+                            "error": f"server resumed at {response.headers.get('Content-Range')!r}, "
+                                     f"not byte {offset:,}; partial download discarded"}
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+                part_meta_path.write_text(
+                    json.dumps({"etag": etag, "last_modified": last_modified}))
+
+                lines, header = 0, b""
+                if resumed:
+                    # Hash the bytes already on disk once, then continue streaming
+                    _, lines, header = _file_info(part_path, sha256_hash)
+                mode = "ab" if resumed else "wb"
+                with open(part_path, mode) as f:
+                    for block in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if not header:
+                            header = block.split(b"\n", 1)[0]
+                        sha256_hash.update(block)
+                        lines += block.count(b"\n")
+                        f.write(block)
     except requests.exceptions.RequestException as e:
-        print(f"✗ Error downloading dataset: {e}")
+        return {"name": name, "status": "error", "error": str(e)}
+
+    sha = sha256_hash.hexdigest()
+    if expected and sha != expected and not refresh:
+        _discard_part(part_path)
+        return {"name": name, "status": "error",
+                "error": f"SHA-256 {sha} does not match CHECKSUMS.txt ({expected}); download discarded "
+                         f"(use --refresh to accept a changed source)"}
+
+    os.replace(part_path, output_path)
+    part_meta_path.unlink(missing_ok=True)
+    meta = {
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+        "sha256": sha,
+        "size": output_path.stat().st_size,
+        "rows": max(lines - 1, 0),
+        "columns": header.decode("utf-8-sig").strip().split(","),
+        "fetched": datetime.now().isoformat(timespec="seconds"),
+    }
+    _meta_path(output_path).write_text(json.dumps(meta, indent=2))
+    return {"name": name, "status": "resumed" if resumed else "downloaded", **meta}
+
+def fetch_all(sources, data_dir=DATA_DIR, workers=4, refresh=False):
+    """Fetch several sources concurrently over one pooled session."""
+    expected = read_checksums(data_dir)
+    with make_session(pool_size=max(workers, 1)) as session:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(fetch, session, name, url, data_dir, expected.get(name), refresh)
+                       for name, url in sources.items()]
+            return [future.result() for future in futures]
+
+def report_download(result, data_dir=DATA_DIR):
+    """Print the outcome of one fetch."""
+    print("=" * 60)
+    print(f"DOWNLOADING {result['name']}")
+    print("=" * 60)
+    if result["status"] == "error":
+        print(f"✗ Error downloading dataset: {result['error']}")
         return None
- 
-def verify_kaggle_dataset():
+    messages = {
+        "downloaded": "✓ Download successful!",
+        "resumed": "✓ Download resumed and completed!",
+        "not-modified": "✓ Unchanged on server (304 Not Modified) - skipped download",
+        "checksum-match": "✓ Local file matches CHECKSUMS.txt - skipped download",
+    }
+    print(messages[result["status"]])
+    print(f"SHA-256: {result.get('sha256')}")
+    if result.get("rows") is not None:
+        print(f"\nDataset Info:")
+        print(f"  Rows: {result['rows']}")
+        print(f"  Columns: {len(result['columns'])}")
+        print(f"  Column names: {', '.join(result['columns'])}")
+        print(f"  File size: {result['size'] / 1024:.2f} KB")
+    return result.get("sha256")
+
+def verify_kaggle_dataset(data_dir=DATA_DIR):
     """Verify the Kaggle dataset (must be downloaded manually)."""
-    kaggle_path = DATA_DIR / "student_habits.csv"
+    kaggle_path = Path(data_dir) / "student_habits.csv"
     print("\n" + "=" * 60)
     print("VERIFYING KAGGLE DATASET")
     print("=" * 60)
@@ -72,48 +260,73 @@ def verify_kaggle_dataset():
         print("4. Run this script again to verify")
         return None
     try:
-        # Calculate checksum
-        checksum = calculate_sha256(kaggle_path)
+        # Checksum and basic info in a single read
+        checksum, lines, header = _file_info(kaggle_path)
+        columns = header.decode("utf-8-sig").strip().split(",")
         print(f"✓ Dataset found!")
         print(f"SHA-256: {checksum}")
-        # Load and display basic info
-        df = pd.read_csv(kaggle_path)
         print(f"\nDataset Info:")
-        print(f"  Rows: {len(df)}")
-        print(f"  Columns: {len(df.columns)}")
-        print(f"  Column names: {', '.join(df.columns.tolist())}")
+        print(f"  Rows: {max(lines - 1, 0)}")
+        print(f"  Columns: {len(columns)}")
+        print(f"  Column names: {', '.join(columns)}")
         print(f"  File size: {os.path.getsize(kaggle_path) / 1024:.2f} KB")
         return checksum
     except Exception as e:
         print(f"✗ Error reading dataset: {e}")
         return None
- 
-def save_checksums(cmu_checksum, kaggle_checksum):
+
+def save_checksums(digests, data_dir=DATA_DIR):
     """Save checksums to a file for future verification."""
-    checksum_file = DATA_DIR / "CHECKSUMS.txt"
+    checksum_file = Path(data_dir) / "CHECKSUMS.txt"
     with open(checksum_file, 'w') as f:
         f.write("Dataset Checksums (SHA-256)\n")
         f.write("=" * 60 + "\n\n")
-        if cmu_checksum:
-            f.write(f"cmu_sleep.csv:\n{cmu_checksum}\n\n")
-        if kaggle_checksum:
-            f.write(f"student_habits.csv:\n{kaggle_checksum}\n\n")
-        f.write(f"Generated: {pd.Timestamp.now()}\n")
+        for name, checksum in digests.items():
+            if checksum:
+                f.write(f"{name}:\n{checksum}\n\n")
+        f.write(f"Generated: {datetime.now()}\n")
     print(f"\n✓ Checksums saved to: {checksum_file}")
- 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download and verify raw datasets")
+    parser.add_argument("--data-dir", default=str(DATA_DIR), help="destination directory")
+    parser.add_argument("--source", action="append", default=[], metavar="NAME=URL",
+                        help="override/add a source (e.g. a local test server); repeatable")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent downloads")
+    parser.add_argument("--refresh", action="store_true",
+                        help="ignore validators and checksums and download again")
+    parser.add_argument("--manifest", default=checksums.MANIFEST_PATH, help="JSON checksum manifest")
+    return parser.parse_args()
+
 def main():
     """Main execution function."""
+    args = parse_args()
+    data_dir = Path(args.data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    sources = dict(SOURCES)
+    for override in args.source:
+        name, url = override.split("=", 1)
+        sources[name] = url
+
     print("\n" + "=" * 60)
     print("DATA ACQUISITION SCRIPT")
     print("Sleep Patterns & Academic Performance Project")
     print("=" * 60 + "\n")
-    # Download CMU dataset
-    cmu_checksum = download_cmu_dataset()
+    # Download sources concurrently
+    digests = {}
+    for result in fetch_all(sources, data_dir, workers=args.workers, refresh=args.refresh):
+        digests[result["name"]] = report_download(result, data_dir)
+    cmu_checksum = digests.get("cmu_sleep.csv")
     # Verify Kaggle dataset (manual download required)
-    kaggle_checksum = verify_kaggle_dataset()
-    # Save checksums
-    if cmu_checksum or kaggle_checksum:
-        save_checksums(cmu_checksum, kaggle_checksum)
+    kaggle_checksum = verify_kaggle_dataset(data_dir)
+    digests["student_habits.csv"] = kaggle_checksum
+    # Save checksums (text file for people, JSON manifest for checksums.py verify);
+    # a failed fetch keeps its previous entry so the next run still verifies against it
+    if any(digests.values()):
+        save_checksums({**read_checksums(data_dir), **{n: d for n, d in digests.items() if d}}, data_dir)
+        known = {data_dir / name: digest for name, digest in digests.items() if digest}
+        checksums.update_manifest(list(known), 'raw', args.manifest, digests=known)
+        print(f"✓ Manifest updated: {args.manifest}")
     print("\n" + "=" * 60)
     print("ACQUISITION COMPLETE")
     print("=" * 60)
@@ -127,6 +340,6 @@ def main():
         print("  Follow the instructions above to download from Kaggle")
     else:
         print("⚠ Issues detected - review output above")
- 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,31 +8,98 @@ Date: December 2025
 
 import pandas as pd
 import numpy as np
+import argparse
+import csv
+import glob
+import heapq
+import json
+import math
 import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import binning
+import compact_frame
+import dedup
+import derived
+import storage
+import tracing
+import validation
 
 # File paths
 CMU_PATH = "cleaned_cmu-sleep.csv"
 KAGGLE_PATH = "cleaned_student_habits.csv"
+OUTPUT_PATH = "data/integrated_data.csv"
+STORE_PATH = "data/integrated_data.parquet"
+TRACE_DIR = "results/traces"
+
+# Streaming mode: rows per chunk and how many sorted runs are merged at once
+STREAM_CHUNKSIZE = 100_000
+MERGE_FAN_IN = 64
+
+# Sharded mode: shard k owns record_ids k * RECORD_ID_STRIDE + 1 ... (k + 1) * RECORD_ID_STRIDE
+RECORD_ID_STRIDE = 2 ** 32
+SHARD_MAP_FILE = "_shards.json"
+
+# Header columns that identify the source of a shard
+SOURCE_SIGNATURES = {
+    'CMU': {'subject_id', 'TotalSleepTime', 'term_gpa'},
+    'Kaggle': {'student_id', 'sleep_hours', 'exam_score'},
+}
+
+# Column order of the integrated dataset (CMU block first, as produced by concat)
+INTEGRATED_COLUMNS = [
+    'record_id', 'student_id', 'dataset_source', 'sleep_hours', 'academic_score',
+    'gender', 'sleep_category', 'integration_method', 'bedtime_variability',
+    'cumulative_gpa', 'cohort', 'age', 'study_hours_per_day', 'attendance_percentage',
+    'productivity_score', 'distraction_hours'
+]
+
+# Built from config.yaml on first use, so importing this module does not read it
+_SLEEP_SCHEME = None
+_DERIVED = None
+
+def sleep_scheme():
+    """Sleep category bins (analysis.sleep_categories in config.yaml)"""
+    global _SLEEP_SCHEME
+    if _SLEEP_SCHEME is None:
+        _SLEEP_SCHEME = binning.primary_scheme()
+    return _SLEEP_SCHEME
+
+def derived_registry():
+    """Derived variables (derived section of config.yaml)"""
+    global _DERIVED
+    if _DERIVED is None:
+        _DERIVED = derived.load_registry()
+    return _DERIVED
+
+def derived_columns(source):
+    """Derived variables of a source that the integrated schema keeps"""
+    return [name for name in derived_registry().names(source) if name in INTEGRATED_COLUMNS]
+
+def bind_derived(df, source):
+    """Memoized derived variables of one frame, shared by its standardize and prepare stages"""
+    return derived_registry().bind(df, source)
 
 def load_cmu(csv_file):
     """Load and standardize CMU Sleep dataset"""
-    df = pd.read_csv(csv_file)
-    
-    # Convert sleep from minutes to hours
-    df['sleep_hours'] = df['TotalSleepTime'] / 60
-    
-    # Convert GPA (0-4 scale) to 0-100 scale
-    df['academic_score'] = (df['term_gpa'] / 4.0) * 100
+    return standardize_cmu(pd.read_csv(csv_file))
+
+def standardize_cmu(df, columns=None):
+    """Standardize a CMU Sleep frame (whole file or a single chunk)
+
+    columns is the frame's bind_derived(); pass the same one to prepare_cmu.
+    """
+    # Sleep in hours and GPA on the 0-100 scale (derived section of config.yaml)
+    columns = bind_derived(df, 'CMU') if columns is None else columns
+    columns.assign(derived_columns('CMU'))
     
     # Convert gender from 0/1 to Male/Female
     df['gender'] = df['demo_gender'].map({0: 'Male', 1: 'Female'})
     
-    # Create sleep quality categories
-    df['sleep_category'] = pd.cut(
-        df['sleep_hours'],
-        bins=[0, 6, 7, 8, 12],
-        labels=['Poor', 'Insufficient', 'Adequate', 'Optimal']
-    )
+    # Create sleep quality categories (edges from config.yaml, see binning.py)
+    df['sleep_category'] = sleep_scheme().categorical(columns.get(['sleep_hours'])['sleep_hours'])
     
     # Select and rename columns for integration
     df = df.rename(columns={
@@ -45,39 +112,33 @@ def load_cmu(csv_file):
 
 def load_kaggle(csv_file):
     """Load and standardize Kaggle Student Habits dataset"""
-    df = pd.read_csv(csv_file)
-    
-    # Rename for consistency
-    df['academic_score'] = df['exam_score']
-    
-    # Create sleep quality categories
-    df['sleep_category'] = pd.cut(
-        df['sleep_hours'],
-        bins=[0, 6, 7, 8, 12],
-        labels=['Poor', 'Insufficient', 'Adequate', 'Optimal']
-    )
-    
-    # Create derived productivity variables
-    df['distraction_hours'] = df['social_media_hours'] + df['netflix_hours']
+    return standardize_kaggle(pd.read_csv(csv_file))
+
+def standardize_kaggle(df, columns=None):
+    """Standardize a Kaggle Student Habits frame (whole file or a single chunk)
+
+    columns is the frame's bind_derived(); pass the same one to prepare_kaggle.
+    """
+    # Academic score and productivity variables (derived section of config.yaml)
+    columns = bind_derived(df, 'Kaggle') if columns is None else columns
+    columns.assign(derived_columns('Kaggle'))
     
-    df['productivity_score'] = (
-        (df['study_hours_per_day'] / 12) * 25 +
-        (df['attendance_percentage'] / 100) * 25 +
-        (1 - df['distraction_hours'] / 24) * 25 +
-        (df['mental_health_rating'] / 10) * 25
-    ) * 100
+    # Create sleep quality categories (edges from config.yaml, see binning.py)
+    df['sleep_category'] = sleep_scheme().categorical(df['sleep_hours'])
     
     return df
 
-def integrate_datasets(cmu_df, kaggle_df):
-    """Integrate CMU and Kaggle datasets using append method"""
-    
-    # Prepare CMU data for integration
-    cmu_integrated = pd.DataFrame()
+def prepare_cmu(cmu_df, columns=None):
+    """Map standardized CMU rows onto the integrated schema
+
+    With columns (the frame's bind_derived()), derived values come from its memo.
+    """
+    derived_values = cmu_df if columns is None else columns.get(derived_columns('CMU'))
+    cmu_integrated = pd.DataFrame(index=cmu_df.index)
     cmu_integrated['student_id'] = 'CMU_' + cmu_df['student_id'].astype(str)
     cmu_integrated['dataset_source'] = 'CMU'
-    cmu_integrated['sleep_hours'] = cmu_df['sleep_hours']
-    cmu_integrated['academic_score'] = cmu_df['academic_score']
+    cmu_integrated['sleep_hours'] = derived_values['sleep_hours']
+    cmu_integrated['academic_score'] = derived_values['academic_score']
     cmu_integrated['gender'] = cmu_df['gender']
     cmu_integrated['sleep_category'] = cmu_df['sleep_category']
     cmu_integrated['integration_method'] = 'append'
@@ -85,18 +146,26 @@ def integrate_datasets(cmu_df, kaggle_df):
     # CMU-specific variables
     cmu_integrated['bedtime_variability'] = cmu_df['bedtime_variability']
     cmu_integrated['cumulative_gpa'] = cmu_df['cumulative_gpa']
+    cmu_integrated['cohort'] = cmu_df['cohort']
     cmu_integrated['age'] = pd.NA
     cmu_integrated['study_hours_per_day'] = pd.NA
     cmu_integrated['attendance_percentage'] = pd.NA
     cmu_integrated['productivity_score'] = pd.NA
     cmu_integrated['distraction_hours'] = pd.NA
     
-    # Prepare Kaggle data for integration
-    kaggle_integrated = pd.DataFrame()
+    return cmu_integrated
+
+def prepare_kaggle(kaggle_df, columns=None):
+    """Map standardized Kaggle rows onto the integrated schema
+
+    With columns (the frame's bind_derived()), derived values come from its memo.
+    """
+    derived_values = kaggle_df if columns is None else columns.get(derived_columns('Kaggle'))
+    kaggle_integrated = pd.DataFrame(index=kaggle_df.index)
     kaggle_integrated['student_id'] = 'KGL_' + kaggle_df['student_id'].astype(str)
     kaggle_integrated['dataset_source'] = 'Kaggle'
     kaggle_integrated['sleep_hours'] = kaggle_df['sleep_hours']
-    kaggle_integrated['academic_score'] = kaggle_df['academic_score']
+    kaggle_integrated['academic_score'] = derived_values['academic_score']
     kaggle_integrated['gender'] = kaggle_df['gender']
     kaggle_integrated['sleep_category'] = kaggle_df['sleep_category']
     kaggle_integrated['integration_method'] = 'append'
@@ -105,46 +174,501 @@ def integrate_datasets(cmu_df, kaggle_df):
     kaggle_integrated['age'] = kaggle_df['age']
     kaggle_integrated['study_hours_per_day'] = kaggle_df['study_hours_per_day']
     kaggle_integrated['attendance_percentage'] = kaggle_df['attendance_percentage']
-    kaggle_integrated['productivity_score'] = kaggle_df['productivity_score']
-    kaggle_integrated['distraction_hours'] = kaggle_df['distraction_hours']
+    kaggle_integrated['productivity_score'] = derived_values['productivity_score']
+    kaggle_integrated['distraction_hours'] = derived_values['distraction_hours']
     kaggle_integrated['bedtime_variability'] = pd.NA
     kaggle_integrated['cumulative_gpa'] = pd.NA
+    kaggle_integrated['cohort'] = pd.NA
+    
+    return kaggle_integrated
+
+def integrate_datasets(cmu_df, kaggle_df, compact=False, bound=(None, None)):
+    """Integrate CMU and Kaggle datasets using append method
+
+    compact=True returns the low-memory representation of compact_frame.py
+    (categorical codes, split integer ids, float32 measures).
+    bound holds the frames' bind_derived() objects from standardization, if kept.
+    """
+    
+    # Prepare both sources for integration
+    cmu_integrated = prepare_cmu(cmu_df, bound[0])
+    kaggle_integrated = prepare_kaggle(kaggle_df, bound[1])
     
     # Combine datasets vertically (append)
+    if compact:
+        # Downcast each source first so the object-typed NA blocks never meet in one frame
+        cmu_integrated = compact_frame.compact(cmu_integrated)
+        kaggle_integrated = compact_frame.compact(kaggle_integrated)
     final = pd.concat([cmu_integrated, kaggle_integrated], ignore_index=True)
     
     # Add record ID and sort
     final.insert(0, 'record_id', range(1, len(final) + 1))
+    if compact:
+        final = compact_frame.compact(final)
     final = final.sort_values('sleep_hours', na_position='last')
     
     return final
 
+def _merge_key(header):
+    """Merge key for CSV rows: sleep_hours ascending, missing last, then record_id"""
+    sleep_idx = header.index('sleep_hours')
+    id_idx = header.index('record_id')
+    
+    def key(row):
+        hours = float(row[sleep_idx]) if row[sleep_idx] else math.nan
+        missing = math.isnan(hours)
+        return (missing, 0.0 if missing else hours, int(row[id_idx]))
+    
+    return key
+
+def _merge_runs(run_paths, output_path):
+    """Merge sorted CSV runs into one sorted CSV, holding one row per run in memory"""
+    files = [open(path, newline='') for path in run_paths]
+    try:
+        readers = [csv.reader(f) for f in files]
+        header = [next(reader) for reader in readers][0]
+        with open(output_path, 'w', newline='') as out:
+            writer = csv.writer(out)
+            writer.writerow(header)
+            writer.writerows(heapq.merge(*readers, key=_merge_key(header)))
+    finally:
+        for f in files:
+            f.close()
+
+def external_sort_runs(run_paths, output_path, tmp_dir, fan_in=MERGE_FAN_IN):
+    """Multi-level k-way merge so the number of open runs never exceeds fan_in"""
+    level = 0
+    while len(run_paths) > fan_in:
+        merged = []
+        for i in range(0, len(run_paths), fan_in):
+            merged_path = os.path.join(tmp_dir, f"merge_{level}_{i // fan_in:05d}.csv")
+            _merge_runs(run_paths[i:i + fan_in], merged_path)
+            for path in run_paths[i:i + fan_in]:
+                os.remove(path)
+            merged.append(merged_path)
+        run_paths = merged
+        level += 1
+    _merge_runs(run_paths, output_path)
+
+def start_validation(quarantine_dir, name="quarantine.csv", rules=None):
+    """Validator for the configured rules, quarantining into quarantine_dir/name"""
+    rules = validation.load_rules() if rules is None else rules
+    return validation.Validator(rules, os.path.join(quarantine_dir, name))
+
+def report_validation(summary, quarantine_dir):
+    """Print the violation summary and write it next to the quarantined rows"""
+    validation.print_summary(summary)
+    path = validation.write_summary(summary, quarantine_dir)
+    if summary['rows_quarantined']:
+        print(f"  ✓ Quarantined rows → {quarantine_dir}/")
+    print(f"  ✓ Validation summary → {path}")
+
+def start_dedup(args):
+    """Dedup index for this run; reset because the run rebuilds the integrated data from scratch"""
+    return dedup.DedupIndex(args.dedup_index, reset=True, output_dir=args.quarantine_dir)
+
+def report_dedup(index, quarantine_dir):
+    """Print the duplicate counts and write them next to the quarantined rows"""
+    summary = index.summary()
+    index.close()
+    dedup.print_summary(summary)
+    exact = summary['exact_in_batch'] + summary['exact_in_index']
+    if exact or summary['near_duplicate_pairs']:
+        print(f"  ✓ Duplicates and near-duplicate pairs → {quarantine_dir}/")
+    print(f"  ✓ Dedup summary → {dedup.write_summary(summary, quarantine_dir)} (index: {summary['index']})")
+
+def record_order(positions):
+    """Row positions in record order, from each row's position before the sleep_hours sort"""
+    if len(positions) and positions.max() + 1 == len(positions):
+        # A permutation: invert it instead of sorting
+        order = np.empty_like(positions)
+        order[positions] = np.arange(len(positions))
+        return order
+    return np.argsort(positions, kind='stable')
+
+def integrate_streaming(cmu_path, kaggle_path, output_path, chunksize=STREAM_CHUNKSIZE, validator=None,
+                        deduper=None):
+    """Integrate both sources chunk by chunk and externally sort on sleep_hours
+    
+    Each chunk goes through the same standardization as the in-memory path,
+    is sorted and spilled to a temporary run file; the runs are then k-way
+    merged into output_path. Peak memory is bounded by chunksize, not input size.
+    With a deduper, exact duplicates of earlier rows are dropped per chunk
+    (dedup.py); with a validator, rows breaking an error rule are quarantined.
+    Returns running per-source totals for the summary printout.
+    """
+    sources = [
+        ('CMU', cmu_path, standardize_cmu, prepare_cmu),
+        ('Kaggle', kaggle_path, standardize_kaggle, prepare_kaggle),
+    ]
+    totals = {}
+    next_id = 1
+    
+    out_dir = os.path.dirname(output_path) or "."
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp_dir:
+        run_paths = []
+        for source, path, standardize, prepare in sources:
+            source_totals = totals.setdefault(source, {'n': 0, 'sleep_sum': 0.0, 'academic_sum': 0.0})
+            for chunk in pd.read_csv(path, chunksize=chunksize):
+                columns = bind_derived(chunk, source)
+                part = prepare(standardize(chunk, columns), columns)
+                part.insert(0, 'record_id', range(next_id, next_id + len(part)))
+                part = part[INTEGRATED_COLUMNS]
+                next_id += len(part)
+                if deduper is not None:
+                    part, _, _ = deduper.check(part)
+                if validator is not None:
+                    part, _ = validator.validate(part)
+                
+                source_totals['n'] += len(part)
+                source_totals['sleep_sum'] += float(part['sleep_hours'].sum())
+                source_totals['academic_sum'] += float(part['academic_score'].sum())
+                
+                part = part.sort_values(['sleep_hours', 'record_id'], na_position='last')
+                run_path = os.path.join(tmp_dir, f"run_{len(run_paths):05d}.csv")
+                part.to_csv(run_path, index=False)
+                run_paths.append(run_path)
+        
+        external_sort_runs(run_paths, output_path, tmp_dir)
+    
+    return totals
+
+def run_streaming(args):
+    """Streaming integration entry point with a running-totals summary"""
+    print("=" * 70)
+    print("DATA INTEGRATION (STREAMING): Sleep Patterns & Academic Performance")
+    print("=" * 70)
+    
+    print(f"\n[1/2] Standardizing, deduplicating, validating and sorting in chunks of {args.chunksize:,} rows...")
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    validator = start_validation(args.quarantine_dir) if args.validate else None
+    deduper = start_dedup(args) if args.dedup else None
+    with tracing.span('integrate_streaming') as span:
+        totals = integrate_streaming(args.cmu, args.kaggle, args.output, chunksize=args.chunksize,
+                                     validator=validator, deduper=deduper)
+        span.set(rows_out=sum(t['n'] for t in totals.values()))
+    if deduper is not None:
+        report_dedup(deduper, args.quarantine_dir)
+    if validator is not None:
+        report_validation(validator.summary(), args.quarantine_dir)
+    if args.store:
+        with tracing.span('write_store', layout=args.layout):
+            storage.convert_csv(args.output, args.store, chunksize=args.chunksize, layout=args.layout)
+    
+    print("\n[2/2] Integration summary")
+    total_n = sum(t['n'] for t in totals.values())
+    print(f"  ✓ Integration complete: {total_n} total students")
+    for source, t in totals.items():
+        if t['n']:
+            print(f"    - {source}: {t['n']} (sleep mean {t['sleep_sum'] / t['n']:.2f}h, "
+                  f"academic mean {t['academic_sum'] / t['n']:.2f})")
+    
+    print("\n" + "=" * 70)
+    print(f"✓ Integration complete! → {args.output}")
+    if args.store:
+        print(f"✓ Columnar copy → {args.store}")
+    print("=" * 70)
+
+# Per-source standardization for shards: (standardize, prepare)
+SHARD_HANDLERS = {
+    'CMU': (standardize_cmu, prepare_cmu),
+    'Kaggle': (standardize_kaggle, prepare_kaggle),
+}
+
+def detect_source(path):
+    """Source of a shard ('CMU' or 'Kaggle') from its CSV header"""
+    with open(path, newline='') as f:
+        header = set(next(csv.reader(f), []))
+    matches = [source for source, required in SOURCE_SIGNATURES.items() if required <= header]
+    if len(matches) != 1:
+        raise ValueError(f"Cannot tell the source of {path!r} from its header "
+                         f"(matches: {', '.join(matches) or 'none'})")
+    return matches[0]
+
+def read_shard_manifest(path):
+    """Shard entries listed in a JSON manifest
+    
+    The manifest is a list (or {"shards": [...]}) whose items are paths or
+    {"path": ..., "source": ..., "shard": ...} objects; source and shard are
+    optional. Relative paths are taken from the manifest's directory.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+    items = manifest.get('shards', []) if isinstance(manifest, dict) else manifest
+    base = os.path.dirname(path)
+    entries = []
+    for item in items:
+        entry = {'path': item} if isinstance(item, str) else dict(item)
+        if 'path' not in entry:
+            raise ValueError(f"Shard entry without a path in {path}: {item!r}")
+        entry['path'] = os.path.join(base, entry['path'])
+        entries.append(entry)
+    return entries
+
+def list_shards(patterns=None, manifest=None):
+    """Numbered shards [{'shard', 'path', 'source'}] from glob patterns or a manifest
+    
+    Glob matches are numbered in sorted path order, manifest entries in the
+    order listed unless they pin a shard number. Pinning keeps record_ids
+    stable when shards are added later.
+    """
+    if manifest:
+        entries = read_shard_manifest(manifest)
+    else:
+        paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+        entries = [{'path': path} for path in paths]
+    if not entries:
+        raise ValueError(f"No input shards matched {manifest or ' '.join(patterns)}")
+    
+    shards = []
+    for position, entry in enumerate(entries):
+        source = entry.get('source') or detect_source(entry['path'])
+        if source not in SHARD_HANDLERS:
+            raise ValueError(f"Unknown source {source!r} for {entry['path']} (expected one of {list(SHARD_HANDLERS)})")
+        shards.append({'shard': int(entry.get('shard', position)), 'path': entry['path'], 'source': source})
+    
+    numbers = [shard['shard'] for shard in shards]
+    if min(numbers) < 0 or len(set(numbers)) != len(numbers):
+        raise ValueError(f"Shard numbers must be unique and non-negative, got {numbers}")
+    return shards
+
+def integrate_shard(shard, store, layout=storage.DEFAULT_LAYOUT, chunksize=STREAM_CHUNKSIZE,
+                    rules=None, quarantine_dir=validation.QUARANTINE_DIR):
+    """Standardize one shard chunk by chunk into parts of store; returns its totals
+    
+    record_ids come from the shard number and the row position inside the
+    shard, so no worker needs to know how many rows the other shards hold.
+    With rules, each chunk is validated and quarantined rows go to
+    quarantine_dir/shard-<n>.csv (uniqueness is checked within the shard).
+    """
+    start = time.perf_counter()
+    standardize, prepare = SHARD_HANDLERS[shard['source']]
+    first_id = shard['shard'] * RECORD_ID_STRIDE + 1
+    validator = None if rules is None else start_validation(quarantine_dir, f"shard-{shard['shard']}.csv", rules)
+    totals = {'n': 0, 'sleep_sum': 0.0, 'academic_sum': 0.0}
+    rows_read = 0
+    for i, chunk in enumerate(pd.read_csv(shard['path'], chunksize=chunksize)):
+        columns = bind_derived(chunk, shard['source'])
+        part = prepare(standardize(chunk, columns), columns)
+        if rows_read + len(part) > RECORD_ID_STRIDE:
+            raise ValueError(f"{shard['path']} has more than {RECORD_ID_STRIDE:,} rows; split it into more shards")
+        next_id = first_id + rows_read
+        rows_read += len(part)
+        part.insert(0, 'record_id', np.arange(next_id, next_id + len(part), dtype='int64'))
+        part = part[INTEGRATED_COLUMNS]
+        if validator is not None:
+            part, _ = validator.validate(part)
+        part = part.sort_values(['sleep_hours', 'record_id'], na_position='last')
+        
+        totals['n'] += len(part)
+        totals['sleep_sum'] += float(part['sleep_hours'].sum())
+        totals['academic_sum'] += float(part['academic_score'].sum())
+        if len(part):
+            storage.write_part(part, store, f"{shard['shard']}-{i}", layout)
+    
+    return dict(shard, **totals, first_record_id=first_id, last_record_id=first_id + rows_read - 1,
+                validation=None if validator is None else validator.summary(),
+                seconds=time.perf_counter() - start)
+
+def integrate_sharded(shards, store, jobs=None, layout=storage.DEFAULT_LAYOUT, chunksize=STREAM_CHUNKSIZE,
+                      rules=None, quarantine_dir=validation.QUARANTINE_DIR):
+    """Standardize shards in parallel into one partitioned dataset; returns per-shard totals"""
+    storage.reset_dataset(store)
+    if rules is not None:
+        for stale in glob.glob(os.path.join(quarantine_dir, "shard-*.csv")):
+            os.remove(stale)
+    jobs = min(jobs or os.cpu_count() or 1, len(shards))
+    args = (store, layout, chunksize, rules, quarantine_dir)
+    if jobs == 1:
+        results = [integrate_shard(shard, *args) for shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(integrate_shard, shard, *args) for shard in shards]
+            results = [future.result() for future in futures]
+    
+    # Map record_id ranges back to their input files
+    os.makedirs(store, exist_ok=True)
+    with open(os.path.join(store, SHARD_MAP_FILE), 'w') as f:
+        json.dump({'record_id_stride': RECORD_ID_STRIDE, 'layout': layout,
+                   'shards': [{k: v for k, v in r.items()
+                               if k not in ('sleep_sum', 'academic_sum', 'seconds', 'validation')}
+                              for r in results]}, f, indent=2)
+    return results
+
+def run_sharded(args):
+    """Sharded integration entry point: parallel per-shard standardization"""
+    print("=" * 70)
+    print("DATA INTEGRATION (SHARDED): Sleep Patterns & Academic Performance")
+    print("=" * 70)
+    
+    print("\n[1/3] Listing shards...")
+    shards = list_shards(args.shards, args.shard_manifest)
+    for source in SHARD_HANDLERS:
+        count = sum(shard['source'] == source for shard in shards)
+        if count:
+            print(f"  ✓ {source}: {count} shard(s)")
+    
+    print(f"\n[2/3] Standardizing {len(shards)} shard(s) in parallel...")
+    with tracing.span('integrate_shards', shards=len(shards), layout=args.layout) as span:
+        rules = validation.load_rules() if args.validate else None
+        results = integrate_sharded(shards, args.store, args.jobs, args.layout, args.chunksize,
+                                    rules, args.quarantine_dir)
+        span.set(rows_out=sum(r['n'] for r in results))
+    for r in results:
+        print(f"  ✓ shard {r['shard']} ({r['source']}): {r['n']:,} rows in {r['seconds']:.2f}s ← {r['path']}")
+    if args.validate:
+        report_validation(validation.merge_summaries(r['validation'] for r in results), args.quarantine_dir)
+    if args.dedup:
+        # Workers write their parts concurrently, so there is no single record order to dedup in
+        print(f"  - Deduplication not applied in sharded mode; check the store with "
+              f"python dedup.py build --input {args.store} --reset")
+    
+    print("\n[3/3] Integration summary")
+    totals = {}
+    for r in results:
+        t = totals.setdefault(r['source'], {'n': 0, 'sleep_sum': 0.0, 'academic_sum': 0.0})
+        for key in t:
+            t[key] += r[key]
+    print(f"  ✓ Integration complete: {sum(t['n'] for t in totals.values())} total students")
+    for source, t in totals.items():
+        if t['n']:
+            print(f"    - {source}: {t['n']} (sleep mean {t['sleep_sum'] / t['n']:.2f}h, "
+                  f"academic mean {t['academic_sum'] / t['n']:.2f})")
+    
+    print("\n" + "=" * 70)
+    print(f"✓ Integration complete! → {args.store} ({args.layout} layout, one part per shard chunk)")
+    print("=" * 70)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Integrate CMU and Kaggle datasets")
+    parser.add_argument("--cmu", default=CMU_PATH, help="cleaned CMU CSV")
+    parser.add_argument("--kaggle", default=KAGGLE_PATH, help="cleaned Kaggle CSV")
+    parser.add_argument("--output", default=OUTPUT_PATH, help="integrated CSV export to write")
+    parser.add_argument("--store", default=STORE_PATH,
+                        help="columnar dataset to write (.parquet or .feather); '' to skip")
+    parser.add_argument("--layout", choices=storage.LAYOUTS, default=storage.DEFAULT_LAYOUT,
+                        help="split = core table + per-source extensions; wide = one padded table")
+    parser.add_argument("--stream", action="store_true",
+                        help="process inputs in bounded chunks with an external sort")
+    parser.add_argument("--chunksize", type=int, default=STREAM_CHUNKSIZE,
+                        help="rows per chunk in streaming mode")
+    parser.add_argument("--compact", action="store_true",
+                        help="keep the integrated frame in the compact representation (compact_frame.py)")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="print bytes/row of the full-width and compact frames")
+    parser.add_argument("--no-validate", dest="validate", action="store_false",
+                        help="skip the validation rules (validation.py, config.yaml)")
+    parser.add_argument("--quarantine-dir", default=validation.QUARANTINE_DIR,
+                        help="rows breaking an error rule and the violation summary go here")
+    parser.add_argument("--no-dedup", dest="dedup", action="store_false",
+                        help="keep exact duplicates and skip the near-duplicate report (dedup.py)")
+    parser.add_argument("--dedup-index", default=dedup.INDEX_PATH,
+                        help="persistent fingerprint / blocking index, rebuilt by each run")
+    parser.add_argument("--shards", nargs='+', default=None, metavar="GLOB",
+                        help="integrate many input CSVs (source detected per file) into --store")
+    parser.add_argument("--shard-manifest", default=None, metavar="JSON",
+                        help="like --shards, from a JSON list of paths or {path, source, shard} entries")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="worker processes in sharded mode (default: CPU count)")
+    tracing.add_arguments(parser, TRACE_DIR)
+    args = parser.parse_args()
+    if args.shards and args.shard_manifest:
+        parser.error("use either --shards or --shard-manifest")
+    if (args.shards or args.shard_manifest) and (args.stream or not args.store):
+        parser.error("sharded mode writes --store (a .parquet or .feather dataset) and is always chunked")
+    return args
+
 def main():
+    args = parse_args()
+    # Read config.yaml once, before any data, so a bad bin or expression fails fast
+    sleep_scheme()
+    derived_registry()
+    tracing.configure("integration", TRACE_DIR if args.trace_dir is None else args.trace_dir,
+                      args.profile, args.profile_stages)
+    if args.shards or args.shard_manifest:
+        run_sharded(args)
+        tracing.finish()
+        return
+    if args.stream:
+        run_streaming(args)
+        tracing.finish()
+        return
+    
     print("=" * 70)
     print("DATA INTEGRATION: Sleep Patterns & Academic Performance")
     print("=" * 70)
     
     # Load datasets
-    print("\n[1/3] Loading datasets...")
-    cmu = load_cmu(CMU_PATH)
+    print("\n[1/4] Loading datasets...")
+    with tracing.span('load_cmu', input=args.cmu) as span:
+        # The bound derived variables stay alive until integration, which reuses their memo
+        cmu_columns = bind_derived(pd.read_csv(args.cmu), 'CMU')
+        cmu = standardize_cmu(cmu_columns.df, cmu_columns)
+        span.set(rows_out=len(cmu))
     print(f"  ✓ CMU: {len(cmu)} students loaded and standardized")
     
-    kaggle = load_kaggle(KAGGLE_PATH)
+    with tracing.span('load_kaggle', input=args.kaggle) as span:
+        kaggle_columns = bind_derived(pd.read_csv(args.kaggle), 'Kaggle')
+        kaggle = standardize_kaggle(kaggle_columns.df, kaggle_columns)
+        span.set(rows_out=len(kaggle))
     print(f"  ✓ Kaggle: {len(kaggle)} students loaded and standardized")
     
     # Integrate datasets
-    print("\n[2/3] Integrating datasets...")
-    integrated = integrate_datasets(cmu, kaggle)
+    print("\n[2/4] Integrating datasets...")
+    with tracing.span('integrate', rows_in=len(cmu) + len(kaggle), compact=args.compact) as span:
+        integrated = integrate_datasets(cmu, kaggle, compact=args.compact,
+                                        bound=(cmu_columns, kaggle_columns))
+        span.set(rows_out=len(integrated))
     print(f"  ✓ Integration complete: {len(integrated)} total students")
+    if args.memory_report:
+        other = integrate_datasets(cmu, kaggle, compact=not args.compact,
+                                   bound=(cmu_columns, kaggle_columns))
+        full, compact = (other, integrated) if args.compact else (integrated, other)
+        compact_frame.memory_report({'full-width': full, 'compact': compact})
+        del other, full, compact
     print(f"    - CMU: {(integrated['dataset_source'] == 'CMU').sum()}")
     print(f"    - Kaggle: {(integrated['dataset_source'] == 'Kaggle').sum()}")
     
+    # Deduplicate and validate before anything is written
+    print("\n[3/4] Deduplicating and validating integrated data...")
+    exported = compact_frame.expand(integrated)
+    if args.dedup:
+        deduper = start_dedup(args)
+        with tracing.span('dedup', rows_in=len(exported)) as span:
+            kept, _, _ = deduper.check(exported)
+            if len(kept) < len(exported):
+                keep = exported.index.isin(kept.index)
+                integrated, exported = integrated[keep], exported[keep]
+            span.set(rows_out=len(exported))
+        report_dedup(deduper, args.quarantine_dir)
+    else:
+        print("  - Deduplication skipped (--no-dedup)")
+    if args.validate:
+        validator = start_validation(args.quarantine_dir)
+        with tracing.span('validate', rows_in=len(exported)) as span:
+            # Record order, so the first occurrence of a duplicate id is the one kept (the
+            # index holds each row's position before the sort)
+            order = record_order(exported.index.to_numpy())
+            kept, _ = validator.validate(exported, order=order)
+            if len(kept) < len(exported):
+                keep = exported.index.isin(kept.index)
+                integrated, exported = integrated[keep], exported[keep]
+            span.set(rows_out=len(exported))
+        report_validation(validator.summary(), args.quarantine_dir)
+    else:
+        print("  - Validation skipped (--no-validate)")
+    
     # Save integrated dataset
-    print("\n[3/3] Saving integrated dataset...")
-    os.makedirs("data", exist_ok=True)
-    output_path = "data/integrated_data.csv"
-    integrated.to_csv(output_path, index=False)
+    print("\n[4/4] Saving integrated dataset...")
+    output_path = args.output
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with tracing.span('write_csv', rows_in=len(exported)):
+        exported.to_csv(output_path, index=False)
     print(f"  ✓ Saved to: {output_path}")
+    if args.store:
+        with tracing.span('write_store', rows_in=len(exported), layout=args.layout):
+            storage.write_integrated(exported, args.store, layout=args.layout)
+        print(f"  ✓ Columnar copy saved to: {args.store} ({args.layout} layout, partitioned by dataset_source)")
     
     # Print summary statistics
     print("\n" + "=" * 70)
@@ -153,7 +677,7 @@ def main():
     
     print(f"\nDataset Statistics:")
     print(f"  Total records: {len(integrated)}")
-    print(f"  Total variables: {len(integrated.columns)}")
+    print(f"  Total variables: {len(exported.columns)}")
     
     print(f"\nSleep Hours:")
     print(f"  Overall mean: {integrated['sleep_hours'].mean():.2f} hours")
@@ -178,6 +702,7 @@ def main():
     print("\n" + "=" * 70)
     print(f"✓ Integration complete! → {output_path}")
     print("=" * 70)
+    tracing.finish()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,171 @@
+"""
+Analysis Tables - Sleep Patterns and Academic Performance
+Builds the JSON result tables from grouped sufficient statistics
+
+Rows are grouped once by (dataset_source, sleep_category); every table is
+derived from those per-group moments (see stats_kernel.py), so the integrated
+data is scanned a single time regardless of how many subsets are reported.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+import ols_engine
+import stats_kernel
+from storage import SOURCES, SLEEP_CATEGORIES
+
+# Variables the tables are computed from
+ANALYSIS_VARIABLES = ['sleep_hours', 'academic_score', 'productivity_score']
+
+def group_keys():
+    """(source, sleep_category) keys; category None holds rows without a category"""
+    return [(source, cat) for source in SOURCES for cat in SLEEP_CATEGORIES + [None]]
+
+def group_codes(df):
+    """Integer group code per row matching group_keys()"""
+    source = pd.Categorical(df['dataset_source'], categories=SOURCES).codes.astype(np.int64)
+    if (source < 0).any():
+        raise ValueError("Unknown dataset_source values in integrated data")
+    category = pd.Categorical(df['sleep_category'], categories=SLEEP_CATEGORIES).codes.astype(np.int64)
+    category[category < 0] = len(SLEEP_CATEGORIES)
+    return source * (len(SLEEP_CATEGORIES) + 1) + category
+
+def compute_moments(df, variables=ANALYSIS_VARIABLES):
+    """One grouped pass over df for the given variables (missing columns are skipped)"""
+    present = [v for v in variables if v in df.columns]
+    columns = {v: df[v].to_numpy(dtype=np.float64, na_value=np.nan) for v in present}
+    return stats_kernel.Moments.from_arrays(columns, group_codes(df), group_keys())
+
+def _source(name):
+    return lambda key: key[0] == name
+
+def _category(name):
+    return lambda key: key[1] == name
+
+def descriptive_table(m):
+    """descriptive_statistics.json"""
+    table = {}
+    for label, select in [("Overall", None), ("CMU", _source('CMU')), ("Kaggle", _source('Kaggle'))]:
+        subset = m.total(select)
+        sleep = stats_kernel.describe(subset, 'sleep_hours')
+        academic = stats_kernel.describe(subset, 'academic_score')
+        table[label] = {
+            "n": int(subset.rows[0]),
+            "sleep_mean": sleep['mean'],
+            "sleep_std": sleep['std'],
+            "academic_mean": academic['mean'],
+            "academic_std": academic['std']
+        }
+
+    counts = {cat: int(m.total(_category(cat)).rows[0]) for cat in SLEEP_CATEGORIES}
+    ordered = sorted((item for item in counts.items() if item[1] > 0),
+                     key=lambda item: item[1], reverse=True)
+    table['sleep_distribution'] = dict(ordered)
+    return table
+
+def correlation_table(m):
+    """correlations.json"""
+    overall, cmu, kaggle = m.total(), m.total(_source('CMU')), m.total(_source('Kaggle'))
+    table = {
+        "sleep_hours_vs_academic_score": {
+            "overall": stats_kernel.pearson(overall, 'sleep_hours', 'academic_score'),
+            "cmu": stats_kernel.pearson(cmu, 'sleep_hours', 'academic_score'),
+            "kaggle": stats_kernel.pearson(kaggle, 'sleep_hours', 'academic_score')
+        }
+    }
+    if 'productivity_score' in m.index:
+        table['sleep_hours_vs_productivity'] = stats_kernel.pearson(
+            kaggle, 'sleep_hours', 'productivity_score')
+        table['productivity_vs_academic_score'] = stats_kernel.pearson(
+            kaggle, 'productivity_score', 'academic_score')
+    return table
+
+# Models 1-3 of regression_results.json: academic_score ~ sleep_hours per subset
+SIMPLE_MODELS = [
+    ('model_1_simple', "Academic Score ~ Sleep Hours (All Students)", None),
+    ('model_2_cmu', "Academic Score ~ Sleep Hours (CMU Only)", _source('CMU')),
+    ('model_3_kaggle', "Academic Score ~ Sleep Hours (Kaggle Only)", _source('Kaggle')),
+]
+
+def regression_fits(m):
+    """Every regression behind regression_results.json, solved in one batch"""
+    specs = {name: ('academic_score', ['sleep_hours'], select) for name, _, select in SIMPLE_MODELS}
+    if 'productivity_score' in m.index:
+        specs['mediation_path_a'] = ('productivity_score', ['sleep_hours'], _source('Kaggle'))
+        specs['mediation_path_b'] = ('academic_score', ['sleep_hours', 'productivity_score'],
+                                     _source('Kaggle'))
+    return ols_engine.fit_many(m, specs)
+
+def simple_regressions(fits):
+    """Models 1-3 of regression_results.json"""
+    return {name: {"description": description, **ols_engine.simple(fits[name])}
+            for name, description, _ in SIMPLE_MODELS}
+
+def mediation_model(fits, path_c):
+    """Model 4 of regression_results.json: Sleep -> Productivity -> Academic Score (Kaggle)"""
+    path_a = fits['mediation_path_a']['coefficients'][0]
+    model_b = fits['mediation_path_b']
+    path_c_prime, path_b = model_b['coefficients']
+
+    indirect_effect = path_a * path_b
+    proportion_mediated = (indirect_effect / path_c) if path_c != 0 else 0
+    return {
+        "description": "Mediation: Sleep -> Productivity -> Academic Score",
+        "n": model_b['n'],
+        "path_a_sleep_to_productivity": path_a,
+        "path_b_productivity_to_academic": path_b,
+        "path_c_total_effect": path_c,
+        "path_c_prime_direct_effect": path_c_prime,
+        "indirect_effect": indirect_effect,
+        "proportion_mediated": float(proportion_mediated),
+        "path_a_p_value": fits['mediation_path_a']['p_values'][0],
+        "path_b_p_value": model_b['p_values'][1],
+        "path_c_prime_p_value": model_b['p_values'][0],
+        "model_b_r_squared": model_b['r_squared'],
+    }
+
+def regression_table(m):
+    """regression_results.json"""
+    fits = regression_fits(m)
+    results = simple_regressions(fits)
+    if 'mediation_path_b' in fits:
+        results['model_4_mediation'] = mediation_model(fits, results['model_3_kaggle']['coefficient'])
+    return results
+
+def category_table(m, alpha=None):
+    """category_analysis.json (alpha defaults to significance_level in config.yaml)"""
+    if alpha is None:
+        import pipeline_config
+        alpha = pipeline_config.significance_level()
+    groups = [(cat, m.total(_category(cat))) for cat in SLEEP_CATEGORIES]
+    groups = [(cat, g) for cat, g in groups if g.rows[0] > 0]
+    anova = stats_kernel.anova_oneway([g for _, g in groups], 'academic_score')
+
+    table = {
+        "anova": {
+            "f_statistic": anova['f_statistic'],
+            "p_value": anova['p_value'],
+            "significant": bool(anova['p_value'] < alpha)
+        },
+        "by_category": {}
+    }
+    for cat, g in groups:
+        academic = stats_kernel.describe(g, 'academic_score')
+        table["by_category"][cat] = {
+            "n": int(g.rows[0]),
+            "academic_score_mean": academic['mean'],
+            "academic_score_std": academic['std']
+        }
+    return table
+
+def build_tables(m, alpha=None):
+    """All four result tables keyed by their JSON file name"""
+    return {
+        'descriptive_statistics.json': descriptive_table(m),
+        'correlations.json': correlation_table(m),
+        'regression_results.json': regression_table(m),
+        'category_analysis.json': category_table(m, alpha),
+    }
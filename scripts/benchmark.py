@@ -0,0 +1,354 @@
+"""
+Benchmark Suite - Sleep Patterns and Academic Performance
+Times each pipeline stage on synthetic inputs and tracks regressions
+
+Stages (run in order; later stages use the artifacts of earlier ones):
+    load_cmu, load_kaggle      read + standardize one source (02_data_integration)
+    integrate_datasets         prepare, concat and sort both sources
+    write_store                write the columnar store (storage.py)
+    read_store                 read the analysis columns back
+    compute_moments            grouped sufficient statistics (analysis_tables.py)
+    build_tables               all four result tables from the moments
+    mixed_sparse               mixed-effects REML fit on sparse cell matrices (mixed_model.py)
+    mixed_dense                the same fit on a dense row-level design matrix
+    figure_inputs              fixed-size figure reductions (figures.py)
+    render_figures             render the four PNGs
+    cold_start_stats           python -m sleep_analysis --stats-only, fresh interpreter
+    cold_start_full            python -m sleep_analysis (tables + figures), fresh interpreter
+
+Every stage runs in a fresh process, so its peak RSS (ru_maxrss) is its own.
+Wall time covers the stage call only, not imports or setup. Results are
+appended to a JSON history; each run is compared with the median of the last
+few runs at the same scale and slower or larger stages are reported as
+regressions.
+
+Usage:
+    python benchmark.py --rows 1e3 1e5 1e6
+    python benchmark.py --rows 1e5 --repeat 3 --fail-on-regression
+    python benchmark.py --report
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import importlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import synthetic_data
+
+HISTORY_PATH = "results/benchmarks/history.json"
+DATA_DIR = ".cache/bench_data"
+
+STAGES = ['load_cmu', 'load_kaggle', 'integrate_datasets', 'write_store', 'read_store',
+          'compute_moments', 'build_tables', 'mixed_sparse', 'mixed_dense', 'figure_inputs',
+          'render_figures', 'cold_start_stats', 'cold_start_full']
+
+# Cold-start stages: whole analysis CLI in a new interpreter, imports included
+COLD_START = {'cold_start_stats': 'stats', 'cold_start_full': 'full'}
+
+# Regression thresholds: relative slowdown / growth, ignored below the absolute floors
+TOLERANCE = 0.20
+MIN_SECONDS = 0.02
+MIN_RSS_MB = 5.0
+# Number of previous runs at the same scale the baseline is the median of
+BASELINE_WINDOW = 3
+
+def _integration():
+    return importlib.import_module("02_data_integration")
+
+def _stage(name, paths):
+    """(setup, run) for a stage; setup returns the argument run is timed on"""
+    import storage
+    integration = _integration()
+    core = ['record_id', 'dataset_source', 'sleep_hours', 'academic_score', 'sleep_category',
+            'productivity_score']
+    kaggle_columns = core + ['study_hours_per_day', 'attendance_percentage']
+
+    def integrated():
+        return integration.integrate_datasets(integration.load_cmu(paths['cmu']),
+                                              integration.load_kaggle(paths['kaggle']))
+
+    def analysis_frame():
+        return storage.read_integrated(paths['store'], columns=core)
+
+    if name == 'load_cmu':
+        return lambda: paths['cmu'], integration.load_cmu
+    if name == 'load_kaggle':
+        return lambda: paths['kaggle'], integration.load_kaggle
+    if name == 'integrate_datasets':
+        def setup():
+            return integration.load_cmu(paths['cmu']), integration.load_kaggle(paths['kaggle'])
+        return setup, lambda frames: integration.integrate_datasets(*frames)
+    if name == 'write_store':
+        return integrated, lambda df: storage.write_integrated(df, paths['store']) or df
+    if name == 'read_store':
+        return lambda: paths['store'], lambda path: storage.read_integrated(path, columns=core)
+
+    import analysis_tables
+    if name == 'compute_moments':
+        return analysis_frame, analysis_tables.compute_moments
+    if name == 'build_tables':
+        def setup():
+            return analysis_tables.compute_moments(analysis_frame())
+        return setup, analysis_tables.build_tables
+    if name in ('mixed_sparse', 'mixed_dense'):
+        import mixed_model
+
+        def setup():
+            df = storage.read_integrated(paths['store'], columns=core + ['cohort'])
+            return (df['sleep_hours'].to_numpy(dtype='float64', na_value=float('nan')),
+                    df['academic_score'].to_numpy(dtype='float64', na_value=float('nan')),
+                    mixed_model.grouping_levels(df))
+        fit = mixed_model.fit if name == 'mixed_sparse' else mixed_model.fit_dense
+        return setup, lambda args: fit(*args)
+
+    import figures
+
+    def figure_setup():
+        df = analysis_frame()
+        tables = analysis_tables.build_tables(analysis_tables.compute_moments(df))
+        kaggle_df = storage.read_integrated(paths['store'], columns=kaggle_columns, sources=['Kaggle'])
+        return df, kaggle_df, tables
+
+    def figure_inputs(args):
+        df, kaggle_df, tables = args
+        cmu_df = df[df['dataset_source'] == 'CMU']
+        return {
+            '01_sleep_distribution': figures.sleep_distribution_inputs(df),
+            '02_sleep_vs_performance': figures.sleep_vs_performance_inputs(
+                df, tables['regression_results.json']['model_1_simple']),
+            '03_dataset_comparison': figures.dataset_comparison_inputs(cmu_df, kaggle_df),
+            '04_productivity_mediation': figures.productivity_inputs(
+                kaggle_df, tables['correlations.json']),
+        }
+
+    if name == 'figure_inputs':
+        return figure_setup, figure_inputs
+    if name == 'render_figures':
+        def render(inputs):
+            renderer = figures.FigureRenderer(paths['figures'], force=True)
+            for figure, figure_input in inputs.items():
+                renderer.submit(figure, figure_input)
+            return renderer.wait()
+        return lambda: figure_inputs(figure_setup()), render
+    raise ValueError(f"Unknown stage: {name}")
+
+def _rows(result):
+    """Rows a stage produced (or consumed, for stages that return something else)"""
+    if isinstance(result, tuple):
+        return sum(_rows(part) or 0 for part in result) or None
+    return len(result) if hasattr(result, '__len__') and hasattr(result, 'columns') else None
+
+def _peak_rss_mb():
+    """Peak RSS of this process and any worker processes it waited for"""
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def _run_stage(name, paths, conn):
+    """Child process body: setup, then time the stage call alone"""
+    try:
+        setup, run = _stage(name, paths)
+        arg = setup()
+        input_rows = _rows(arg)
+        setup_rss = _peak_rss_mb()
+        start = time.perf_counter()
+        result = run(arg)
+        wall = time.perf_counter() - start
+        rows = _rows(result) or input_rows
+        conn.send({'wall_seconds': wall, 'peak_rss_mb': _peak_rss_mb(), 'setup_rss_mb': setup_rss,
+                   'rows': rows})
+    except Exception as e:
+        conn.send({'error': f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+def measure_cold_start(mode, paths):
+    """Wall time and peak RSS of the analysis CLI in a new interpreter"""
+    env = dict(os.environ)
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [scripts_dir, env.get('PYTHONPATH')]))
+    command = [sys.executable, "-m", "sleep_analysis", "--mode", mode, "--input", paths['store'],
+               "--output-dir", paths['cold_start'], "--force-figures"]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    stderr = process.stderr.read()
+    _, status, usage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - start
+    if status:
+        raise RuntimeError(f"Stage cold_start_{mode} failed: {stderr.decode(errors='replace')[-500:]}")
+    peak = usage.ru_maxrss / 1024 / 1024 if sys.platform == 'darwin' else usage.ru_maxrss / 1024
+    return {'wall_seconds': wall, 'peak_rss_mb': peak, 'rows': None}
+
+def measure(name, paths):
+    """Run one stage in a fresh process and return its measurements"""
+    if name in COLD_START:
+        return measure_cold_start(COLD_START[name], paths)
+    ctx = mp.get_context('spawn')
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_run_stage, args=(name, paths, child))
+    process.start()
+    child.close()
+    try:
+        result = parent.recv()
+    except EOFError:
+        result = {'error': 'process exited without a result'}
+    process.join()
+    if 'error' in result:
+        raise RuntimeError(f"Stage {name} failed: {result['error']}")
+    return result
+
+def run_benchmarks(rows, stages=STAGES, repeat=1, data_dir=DATA_DIR, seed=0):
+    """Measure every stage at one scale; keeps the fastest of repeat runs per stage"""
+    input_dir = os.path.join(data_dir, f"rows_{rows}_seed_{seed}")
+    if not os.path.exists(os.path.join(input_dir, synthetic_data.KAGGLE_FILE)):
+        synthetic_data.write_inputs(input_dir, rows, seed)
+    results = {}
+    with tempfile.TemporaryDirectory(dir=data_dir) as work_dir:
+        paths = {
+            'cmu': os.path.join(input_dir, synthetic_data.CMU_FILE),
+            'kaggle': os.path.join(input_dir, synthetic_data.KAGGLE_FILE),
+            'store': os.path.join(work_dir, "integrated_data.parquet"),
+            'figures': os.path.join(work_dir, "figures"),
+            'cold_start': os.path.join(work_dir, "cold_start"),
+        }
+        os.makedirs(paths['figures'])
+        needs_store = {'read_store', 'compute_moments', 'build_tables', 'mixed_sparse', 'mixed_dense',
+                       'figure_inputs', 'render_figures', *COLD_START}
+        if needs_store & set(stages) and 'write_store' not in stages:
+            measure('write_store', paths)
+        for name in stages:
+            runs = [measure(name, paths) for _ in range(repeat)]
+            best = min(runs, key=lambda r: r['wall_seconds'])
+            best['peak_rss_mb'] = max(r['peak_rss_mb'] for r in runs)
+            if best['rows']:
+                best['rows_per_sec'] = best['rows'] / best['wall_seconds'] if best['wall_seconds'] else None
+            results[name] = best
+            rate = f"{best['rows_per_sec']:>14,.0f} rows/s" if best.get('rows_per_sec') else " " * 21
+            print(f"  {name:20s} {best['wall_seconds']:9.3f}s {rate} {best['peak_rss_mb']:9.1f} MB")
+    return results
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+def load_history(path=HISTORY_PATH):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+def save_history(history, path=HISTORY_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp, path)
+
+def find_regressions(run, history, tolerance=TOLERANCE, window=BASELINE_WINDOW):
+    """Stages slower or larger than the median of the last window runs at the same scale"""
+    previous = [h for h in history if h['rows'] == run['rows'] and h is not run][-window:]
+    regressions = []
+    for name, current in run['stages'].items():
+        for metric, floor in (('wall_seconds', MIN_SECONDS), ('peak_rss_mb', MIN_RSS_MB)):
+            values = [h['stages'][name][metric] for h in previous if name in h['stages']]
+            if not values:
+                continue
+            baseline = statistics.median(values)
+            value = current[metric]
+            if value > baseline * (1 + tolerance) and value - baseline > floor:
+                regressions.append({'stage': name, 'metric': metric, 'baseline': baseline,
+                                    'value': value, 'change': value / baseline - 1 if baseline else None})
+    return regressions
+
+def print_report(history):
+    """Latest run per scale, with the change against the run before it"""
+    by_rows = {}
+    for run in history:
+        by_rows.setdefault(run['rows'], []).append(run)
+    for rows, runs in sorted(by_rows.items()):
+        latest = runs[-1]
+        before = runs[-2] if len(runs) > 1 else None
+        print(f"\n{rows:,} rows per source - {len(runs)} run(s), latest {latest['timestamp']} "
+              f"({latest.get('git_commit') or 'no commit'})")
+        for name, stage in latest['stages'].items():
+            change = ""
+            if before and name in before['stages'] and before['stages'][name]['wall_seconds']:
+                change = f"{stage['wall_seconds'] / before['stages'][name]['wall_seconds'] - 1:+.0%}"
+            print(f"  {name:20s} {stage['wall_seconds']:9.3f}s {change:>6s} {stage['peak_rss_mb']:9.1f} MB")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data")
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e3, 1e5],
+                        help="rows per source, one benchmark per value (1e3 - 1e8)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--repeat", type=int, default=1, help="runs per stage (fastest is kept)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=DATA_DIR, help="where synthetic inputs are cached")
+    parser.add_argument("--history", default=HISTORY_PATH)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="relative slowdown/growth reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 on a regression")
+    parser.add_argument("--no-save", action="store_true", help="do not append to the history")
+    parser.add_argument("--report", action="store_true", help="print the history and exit")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    history = load_history(args.history)
+    if args.report:
+        print_report(history)
+        return
+
+    import result_cache
+    os.makedirs(args.data_dir, exist_ok=True)
+    found = []
+    for rows in (int(r) for r in args.rows):
+        print("=" * 70)
+        print(f"BENCHMARK: {rows:,} rows per source")
+        print("=" * 70)
+        run = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'git_commit': _git_commit(),
+            'code_hash': result_cache.code_hash()[:12],
+            'python': platform.python_version(),
+            'machine': f"{platform.system()} {platform.machine()} x{os.cpu_count()}",
+            'rows': rows,
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'stages': run_benchmarks(rows, args.stages, args.repeat, args.data_dir, args.seed),
+        }
+        regressions = find_regressions(run, history, args.tolerance)
+        run['regressions'] = regressions
+        history.append(run)
+        for r in regressions:
+            unit = 's' if r['metric'] == 'wall_seconds' else ' MB'
+            print(f"  ✗ Regression: {r['stage']} {r['metric']} {r['baseline']:.3f}{unit} -> "
+                  f"{r['value']:.3f}{unit} ({r['change']:+.0%})")
+        if not regressions:
+            print("  ✓ No regressions against previous runs")
+        found += regressions
+
+    if not args.no_save:
+        save_history(history, args.history)
+        print(f"\n✓ History updated: {args.history}")
+    if found and args.fail_on_regression:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Sleep Category Binning - Sleep Patterns and Academic Performance
+Sleep-hour categories from config bins, and a sensitivity sweep over many schemes
+
+A scheme is a list of increasing edges plus one label per bin; bins are
+right-closed like pd.cut, so x falls in bin i when edges[i] < x <= edges[i + 1]
+and outside every bin otherwise.
+
+    primary     analysis.sleep_categories in config.yaml; becomes the
+                sleep_category column during integration
+    sweep       the primary scheme, analysis.sleep_category_schemes, and one
+                shifted copy of the primary per analysis.sleep_category_shifts
+                step (every interior edge moved by the same amount)
+
+MultiBinner handles any number of schemes in one pass: every edge of every
+scheme goes into one sorted array, a single searchsorted places each row in
+an elementary interval between neighbouring edges, and per-interval sums of
+the outcome are accumulated with bincount. Each scheme's bins are unions of
+elementary intervals, so its per-bin counts, means and one-way ANOVA follow
+from a lookup table over those sums; rows are never revisited per scheme.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+from stats_kernel import anova_from_sums
+from storage import SLEEP_CATEGORIES
+
+# Used when config.yaml has no analysis.sleep_categories
+DEFAULT_EDGES = [0, 6, 7, 8, 12]
+PRIMARY_NAME = 'primary'
+
+class BinScheme:
+    """Named edges and bin labels"""
+
+    def __init__(self, name, edges, labels):
+        edges = np.asarray(edges, dtype=np.float64)
+        if len(edges) < 2 or not np.all(np.diff(edges) > 0):
+            raise ValueError(f"Scheme {name!r}: edges must be strictly increasing, got {edges.tolist()}")
+        if len(labels) != len(edges) - 1:
+            raise ValueError(f"Scheme {name!r}: {len(edges) - 1} bins but {len(labels)} labels")
+        self.name = name
+        self.edges = edges
+        self.labels = list(labels)
+
+    def codes(self, values):
+        """Bin index per value (-1 outside the edges or missing)"""
+        values = np.asarray(values, dtype=np.float64)
+        codes = np.searchsorted(self.edges, values, side='left') - 1
+        outside = (codes < 0) | (codes >= len(self.labels)) | np.isnan(values)
+        codes[outside] = -1
+        return codes
+
+    def categorical(self, values):
+        """Ordered Categorical of labels, as pd.cut(values, edges, labels=labels) returns"""
+        return pd.Categorical.from_codes(self.codes(values), categories=self.labels, ordered=True)
+
+    def shifted(self, shift, name=None):
+        """Copy with every interior edge moved by shift (None if bins would collapse)"""
+        edges = self.edges.copy()
+        edges[1:-1] += shift
+        if not np.all(np.diff(edges) > 0):
+            return None
+        return BinScheme(name or f"{self.name}_shift{shift:+g}", edges, self.labels)
+
+    def describe(self):
+        return {'edges': self.edges.tolist(), 'labels': self.labels}
+
+def scheme_from_ranges(name, ranges):
+    """Scheme from {label: [low, high]} (the config.yaml sleep_categories form)"""
+    items = sorted(ranges.items(), key=lambda item: item[1][0])
+    edges = [items[0][1][0]]
+    for label, (low, high) in items:
+        if low != edges[-1]:
+            raise ValueError(f"Scheme {name!r}: bin {label!r} starts at {low}, previous bin ends at {edges[-1]}")
+        edges.append(high)
+    labels = [str(label).replace('_', ' ').title() for label, _ in items]
+    return BinScheme(name, edges, labels)
+
+def primary_scheme(config=None):
+    """The scheme behind the stored sleep_category column
+
+    Edges come from analysis.sleep_categories; the labels must be the stored
+    categories (storage.SLEEP_CATEGORIES) so the columnar schema still holds.
+    """
+    import pipeline_config
+    ranges = pipeline_config.analysis_params(config)['sleep_categories']
+    if not ranges:
+        return BinScheme(PRIMARY_NAME, DEFAULT_EDGES, SLEEP_CATEGORIES)
+    scheme = scheme_from_ranges(PRIMARY_NAME, ranges)
+    if scheme.labels != SLEEP_CATEGORIES:
+        raise ValueError(f"analysis.sleep_categories must define {SLEEP_CATEGORIES} in order, "
+                         f"got {scheme.labels}; use sleep_category_schemes for other labels")
+    return scheme
+
+def sweep_schemes(config=None):
+    """Primary scheme, the configured alternatives and the shifted copies of the primary"""
+    import pipeline_config
+    params = pipeline_config.analysis_params(config)
+    primary = primary_scheme(config)
+    schemes = [primary]
+    for i, spec in enumerate(params.get('sleep_category_schemes') or []):
+        name = spec.get('name', f"scheme_{i + 1}")
+        if 'ranges' in spec:
+            schemes.append(scheme_from_ranges(name, spec['ranges']))
+        else:
+            labels = spec.get('labels') or [f"bin_{j + 1}" for j in range(len(spec['edges']) - 1)]
+            schemes.append(BinScheme(name, spec['edges'], labels))
+    shifts = params.get('sleep_category_shifts')
+    if shifts:
+        steps = int(round((shifts['max'] - shifts['min']) / shifts['step'])) + 1
+        for shift in np.round(np.linspace(shifts['min'], shifts['max'], steps), 6):
+            if shift != 0:
+                scheme = primary.shifted(float(shift))
+                if scheme is not None:
+                    schemes.append(scheme)
+    names = [scheme.name for scheme in schemes]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate binning scheme names: {names}")
+    return schemes
+
+class MultiBinner:
+    """Many schemes compiled into one edge array and a per-scheme lookup table"""
+
+    def __init__(self, schemes):
+        self.schemes = list(schemes)
+        self.edges = np.unique(np.concatenate([s.edges for s in self.schemes]))
+        # Slot j < len(edges) holds edges[j-1] < x <= edges[j]; the last two slots hold
+        # values above every edge and missing values
+        self.n_slots = len(self.edges) + 2
+        self.width = max(len(s.labels) for s in self.schemes)
+        self.lut = np.full((len(self.schemes), self.n_slots), -1, dtype=np.int64)
+        for i, scheme in enumerate(self.schemes):
+            # The right end of a slot lies in the same bin as every other value of the slot
+            self.lut[i, :len(self.edges)] = scheme.codes(self.edges)
+
+    def slots(self, values):
+        """Elementary interval per value, from one searchsorted over all schemes' edges"""
+        values = np.asarray(values, dtype=np.float64)
+        slots = np.searchsorted(self.edges, values, side='left')
+        slots[np.isnan(values)] = self.n_slots - 1
+        return slots
+
+    def codes(self, values, scheme=0):
+        """Bin codes of one scheme (index or name)"""
+        if not isinstance(scheme, (int, np.integer)):
+            scheme = [s.name for s in self.schemes].index(scheme)
+        return self.lut[scheme][self.slots(values)]
+
+    def slot_sums(self, values, outcome):
+        """Per-slot rows, and count / sum / sum of squares of the observed outcome"""
+        slots = self.slots(values)
+        outcome = np.asarray(outcome, dtype=np.float64)
+        observed = ~np.isnan(outcome)
+        y = np.where(observed, outcome, 0.0)
+        return {
+            'rows': np.bincount(slots, minlength=self.n_slots).astype(np.float64),
+            'n': np.bincount(slots, weights=observed.astype(np.float64), minlength=self.n_slots),
+            's': np.bincount(slots, weights=y, minlength=self.n_slots),
+            'q': np.bincount(slots, weights=y * y, minlength=self.n_slots),
+        }
+
+    def bin_sums(self, sums):
+        """{stat: (schemes, width) array} of per-bin sums for every scheme at once"""
+        inside = self.lut >= 0
+        target = (np.arange(len(self.schemes))[:, None] * self.width + self.lut)[inside]
+        size = len(self.schemes) * self.width
+        return {stat: np.bincount(target, weights=np.broadcast_to(values, self.lut.shape)[inside],
+                                  minlength=size).reshape(len(self.schemes), self.width)
+                for stat, values in sums.items()}
+
+def _finite(value):
+    value = float(value)
+    return value if np.isfinite(value) else None
+
+def sensitivity_table(df, schemes=None, alpha=None, variable='academic_score', binned='sleep_hours'):
+    """sleep_category_sensitivity.json: per-bin n / mean / std and ANOVA for every scheme
+
+    alpha defaults to significance_level in config.yaml.
+    """
+    if alpha is None:
+        import pipeline_config
+        alpha = pipeline_config.significance_level()
+    schemes = sweep_schemes() if schemes is None else schemes
+    binner = MultiBinner(schemes)
+    sums = binner.bin_sums(binner.slot_sums(
+        df[binned].to_numpy(dtype=np.float64, na_value=np.nan),
+        df[variable].to_numpy(dtype=np.float64, na_value=np.nan)))
+    f_stat, p_value, eta_squared = anova_from_sums(sums['n'], sums['s'], sums['q'])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = sums['s'] / sums['n']
+        std = np.sqrt(np.maximum(sums['q'] - sums['n'] * mean ** 2, 0.0) / (sums['n'] - 1))
+
+    table = {'variable': variable, 'binned': binned, 'schemes': {}}
+    for i, scheme in enumerate(binner.schemes):
+        entry = scheme.describe()
+        entry['anova'] = {
+            'f_statistic': _finite(f_stat[i]),
+            'p_value': _finite(p_value[i]),
+            'eta_squared': _finite(eta_squared[i]),
+            'significant': bool(p_value[i] < alpha),
+        }
+        entry['by_category'] = {
+            label: {'n': int(sums['rows'][i, b]),
+                    f"{variable}_mean": _finite(mean[i, b]),
+                    f"{variable}_std": _finite(std[i, b])}
+            for b, label in enumerate(scheme.labels) if sums['rows'][i, b] > 0
+        }
+        table['schemes'][scheme.name] = entry
+
+    significant = [bool(p < alpha) for p in p_value]
+    finite_f = f_stat[np.isfinite(f_stat)]
+    table['summary'] = {
+        'schemes': len(binner.schemes),
+        'significant': int(sum(significant)),
+        'f_statistic_min': _finite(finite_f.min()) if len(finite_f) else None,
+        'f_statistic_max': _finite(finite_f.max()) if len(finite_f) else None,
+        'primary_significant': significant[0],
+    }
+    return table
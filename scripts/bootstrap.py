@@ -0,0 +1,294 @@
+"""
+Bootstrap and Permutation Inference - Sleep Patterns and Academic Performance
+Confidence intervals for the regression slopes and mediation paths
+
+Each row contributes a fixed vector of products (1, x, y, x², xy, ...) over
+the variables the models use. A bootstrap resample is a vector of counts
+(how often each row was drawn), so its sufficient statistics are one
+matrix product: counts (B x n) @ products (n x p). The resampled slopes are
+then solved for all B resamples at once by ols_engine.solve_centered.
+Resampling is stratified by dataset_source (each source keeps its size).
+
+Permutation tests shuffle academic_score (productivity_score for path a)
+within each source; only the cross-product x·y changes, so each
+permutation costs one shuffle and one dot product.
+
+Resamples are drawn in fixed-size chunks, each seeded from its own child of
+one SeedSequence, and the chunks run on a process pool. Results depend on
+the seed only, never on the number of worker processes.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import ols_engine
+from storage import SOURCES
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_PERMUTATIONS = 2000
+DEFAULT_SEED = 477
+CI_LEVEL = 0.95
+
+# Resamples per task, and per matrix product inside a task (bounds memory to
+# BATCH x rows float64 per worker)
+CHUNK_RESAMPLES = 256
+BATCH = 16
+# Below this many resampled rows in total the work runs in-process
+POOL_MIN_WORK = 20_000_000
+
+# Per-row products. 'xy_*' are taken over rows with sleep_hours and
+# academic_score; the rest over rows where productivity_score is observed too.
+PRODUCTS = ['xy_n', 'xy_x', 'xy_y', 'xy_xx', 'xy_yy', 'xy_xy',
+            'n', 'x', 'm', 'y', 'xx', 'mm', 'yy', 'xm', 'xy', 'my']
+P = {name: i for i, name in enumerate(PRODUCTS)}
+
+def row_products(x, y, m):
+    """(rows, len(PRODUCTS)) matrix of per-row products; unobserved terms are 0"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    m = np.asarray(m, dtype=np.float64)
+    has_xy = ~np.isnan(x) & ~np.isnan(y)
+    has_all = has_xy & ~np.isnan(m)
+    out = np.zeros((len(x), len(PRODUCTS)))
+    for mask, prefix, terms in [
+        (has_xy, 'xy_', {'n': 1.0, 'x': x, 'y': y, 'xx': x * x, 'yy': y * y, 'xy': x * y}),
+        (has_all, '', {'n': 1.0, 'x': x, 'm': m, 'y': y, 'xx': x * x, 'mm': m * m, 'yy': y * y,
+                       'xm': x * m, 'xy': x * y, 'my': m * y}),
+    ]:
+        for name, values in terms.items():
+            out[:, P[prefix + name]] = np.where(mask, values, 0.0)
+    return out
+
+def prepare(df):
+    """Per-source arrays the workers need: {source: (x, y, m)} as float64"""
+    data = {}
+    for source in SOURCES:
+        part = df[df['dataset_source'] == source]
+        m = part['productivity_score'] if 'productivity_score' in part else np.full(len(part), np.nan)
+        data[source] = tuple(np.asarray(values, dtype=np.float64)
+                             for values in (part['sleep_hours'], part['academic_score'], m))
+    return data
+
+# ---------------------------------------------------------------------------
+# Statistics from summed products
+# ---------------------------------------------------------------------------
+
+def _simple_slope(n, sx, sy, sxx, sxy):
+    """Slope of y ~ x from raw sums (arrays)"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (sxy - sx * sy / n) / (sxx - sx * sx / n)
+
+def _two_regressor(sums):
+    """Coefficients of y ~ x + m for each row of sums (B, len(PRODUCTS))"""
+    n = sums[:, P['n']]
+    s = sums[:, [P['x'], P['m'], P['y']]]
+    cross = np.empty((len(sums), 3, 3))
+    for i, a in enumerate('xmy'):
+        for j, b in enumerate('xmy'):
+            key = a + b if a + b in P else b + a
+            cross[:, i, j] = sums[:, P[key]]
+    cross -= s[:, :, None] * s[:, None, :] / n[:, None, None]
+    fit = ols_engine.solve_centered(n, s / n[:, None], cross[:, :2, :2], cross[:, :2, 2], cross[:, 2, 2])
+    return fit['coefficients']
+
+def statistics(sums):
+    """{statistic: (B,) array} from per-source sums of shape (B, len(SOURCES), len(PRODUCTS))"""
+    def slope(block, prefix='xy_'):
+        return _simple_slope(block[:, P[prefix + 'n']], block[:, P[prefix + 'x']],
+                             block[:, P[prefix + 'y']], block[:, P[prefix + 'xx']],
+                             block[:, P[prefix + 'xy']])
+
+    cmu = sums[:, SOURCES.index('CMU')]
+    kaggle = sums[:, SOURCES.index('Kaggle')]
+    out = {
+        'model_1_simple': slope(sums.sum(axis=1)),
+        'model_2_cmu': slope(cmu),
+        'model_3_kaggle': slope(kaggle),
+    }
+    if np.all(kaggle[:, P['n']] > 3):
+        path_a = _simple_slope(kaggle[:, P['n']], kaggle[:, P['x']], kaggle[:, P['m']],
+                               kaggle[:, P['xx']], kaggle[:, P['xm']])
+        path_c_prime, path_b = _two_regressor(kaggle).T
+        indirect = path_a * path_b
+        out.update({
+            'path_a': path_a,
+            'path_b': path_b,
+            'path_c_prime': path_c_prime,
+            'indirect_effect': indirect,
+            'proportion_mediated': indirect / out['model_3_kaggle'],
+        })
+    return out
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+
+_DATA = None
+_DATA_TOKEN = None
+
+def _data_token(data):
+    """Content hash of data; keys the per-process cache (an id() can be reused after GC)"""
+    h = hashlib.sha256()
+    for source in sorted(data):
+        h.update(source.encode())
+        for values in data[source]:
+            values = np.ascontiguousarray(values, dtype=np.float64)
+            h.update(str(values.shape).encode())
+            h.update(values.data)
+    return h.hexdigest()
+
+def _init_worker(data, token):
+    """Per-process row products for data (computed once per process and token)"""
+    global _DATA, _DATA_TOKEN
+    if _DATA_TOKEN != token:
+        _DATA = {source: (row_products(*arrays), arrays) for source, arrays in data.items()}
+        _DATA_TOKEN = token
+
+def _observed_sums(data):
+    """Full-sample summed products, shape (sources, products)"""
+    _init_worker(data, _data_token(data))
+    return np.array([_DATA[source][0].sum(axis=0) for source in SOURCES])
+
+def _bootstrap_chunk(seed, size):
+    """Per-source summed products for size resamples, shape (size, sources, products)"""
+    rng = np.random.default_rng(seed)
+    out = np.zeros((size, len(SOURCES), len(PRODUCTS)))
+    for s, source in enumerate(SOURCES):
+        products, _ = _DATA[source]
+        n = len(products)
+        if n == 0:
+            continue
+        for start in range(0, size, BATCH):
+            stop = min(start + BATCH, size)
+            counts = np.empty((stop - start, n))
+            for b in range(stop - start):
+                counts[b] = np.bincount(rng.integers(0, n, n), minlength=n)
+            out[start:stop, s] = counts @ products
+    return out
+
+def _permutation_chunk(seed, size):
+    """Permuted cross-products per source, shape (size, sources, 2): x·y and x·m"""
+    rng = np.random.default_rng(seed)
+    out = np.zeros((size, len(SOURCES), 2))
+    for s, source in enumerate(SOURCES):
+        _, (x, y, m) = _DATA[source]
+        # Same row sets as the 'xy_xy' and 'xm' products
+        has_xy = ~np.isnan(x) & ~np.isnan(y)
+        has_all = has_xy & ~np.isnan(m)
+        if has_all.any() and np.array_equal(has_xy, has_all):
+            # One shuffle of the row order serves both tests
+            xs, ys, ms = x[has_xy], y[has_xy], m[has_xy]
+            for b in range(size):
+                order = rng.permutation(len(xs))
+                out[b, s] = ys[order] @ xs, ms[order] @ xs
+            continue
+        for j, (values, keep) in enumerate([(y, has_xy), (m, has_all)]):
+            xs, values = x[keep], values[keep].copy()
+            if not len(xs):
+                continue
+            for b in range(size):
+                rng.shuffle(values)
+                out[b, s, j] = values @ xs
+    return out
+
+def _run_chunks(task, data, total, seed_seq, jobs):
+    """Run task over CHUNK_RESAMPLES-sized chunks, each with its own child seed"""
+    sizes = [min(CHUNK_RESAMPLES, total - start) for start in range(0, total, CHUNK_RESAMPLES)]
+    seeds = seed_seq.spawn(len(sizes))
+    rows = sum(len(arrays[0]) for arrays in data.values())
+    token = _data_token(data)
+    if jobs == 1 or rows * total < POOL_MIN_WORK:
+        _init_worker(data, token)
+        return np.concatenate([task(seed, size) for seed, size in zip(seeds, sizes)])
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(data, token)) as pool:
+        return np.concatenate(list(pool.map(task, seeds, sizes)))
+
+# ---------------------------------------------------------------------------
+# Inference
+# ---------------------------------------------------------------------------
+
+def bootstrap(data, resamples=DEFAULT_RESAMPLES, seed=DEFAULT_SEED, jobs=None):
+    """{statistic: (resamples,) array} of stratified bootstrap replicates"""
+    boot_seed, _ = np.random.SeedSequence(seed).spawn(2)
+    sums = _run_chunks(_bootstrap_chunk, data, resamples, boot_seed, jobs)
+    return statistics(sums)
+
+def permutation_slopes(data, permutations=DEFAULT_PERMUTATIONS, seed=DEFAULT_SEED, jobs=None):
+    """{statistic: (permutations,) array} of slopes under within-source shuffling"""
+    _, perm_seed = np.random.SeedSequence(seed).spawn(2)
+    cross = _run_chunks(_permutation_chunk, data, permutations, perm_seed, jobs)
+    observed = _observed_sums(data)
+    # Only x·y (and x·m) change under permutation; every other sum is fixed
+    sums = np.broadcast_to(observed, (permutations,) + observed.shape).copy()
+    sums[:, :, P['xy_xy']] = cross[:, :, 0]
+    sums[:, :, P['xm']] = cross[:, :, 1]
+    out = statistics(sums)
+    return {name: out[name] for name in ['model_1_simple', 'model_2_cmu', 'model_3_kaggle', 'path_a']
+            if name in out}
+
+def observed_statistics(data):
+    """The point estimates the replicates are compared with"""
+    sums = _observed_sums(data)[None]
+    return {name: float(values[0]) for name, values in statistics(sums).items()}
+
+def percentile_ci(replicates, level=CI_LEVEL):
+    """Percentile interval of the finite replicates (NaN if there are none, e.g. an empty source)"""
+    finite = replicates[np.isfinite(replicates)]
+    if not len(finite):
+        return [float('nan'), float('nan')]
+    alpha = (1 - level) / 2
+    return [float(v) for v in np.quantile(finite, [alpha, 1 - alpha])]
+
+def permutation_p_value(replicates, observed):
+    """Two-sided p-value with the +1 correction (NaN if the observed statistic is)"""
+    if not np.isfinite(observed):
+        return float('nan')
+    return float((1 + np.sum(np.abs(replicates) >= abs(observed))) / (1 + len(replicates)))
+
+def regression_intervals(df, resamples=DEFAULT_RESAMPLES, permutations=DEFAULT_PERMUTATIONS,
+                         seed=DEFAULT_SEED, level=CI_LEVEL, jobs=None):
+    """Keys to merge into regression_results.json (per model), plus an 'inference' entry"""
+    jobs = jobs or os.cpu_count()
+    data = prepare(df)
+    observed = observed_statistics(data)
+    boot = bootstrap(data, resamples, seed, jobs) if resamples else {}
+    perm = permutation_slopes(data, permutations, seed, jobs) if permutations else {}
+
+    extra = {}
+    for model in ['model_1_simple', 'model_2_cmu', 'model_3_kaggle']:
+        extra[model] = {}
+        if model in boot:
+            extra[model]['coefficient_ci'] = percentile_ci(boot[model], level)
+        if model in perm:
+            extra[model]['permutation_p_value'] = permutation_p_value(perm[model], observed[model])
+    if 'path_a' in observed:
+        mediation = {}
+        for name in ['path_a', 'path_b', 'path_c_prime', 'indirect_effect', 'proportion_mediated']:
+            if name in boot:
+                mediation[f"{name}_ci"] = percentile_ci(boot[name], level)
+        if 'path_a' in perm:
+            mediation['path_a_permutation_p_value'] = permutation_p_value(perm['path_a'], observed['path_a'])
+        extra['model_4_mediation'] = mediation
+    extra['inference'] = {
+        "method": "percentile bootstrap and permutation test, stratified by dataset_source",
+        "bootstrap_resamples": resamples,
+        "permutations": permutations,
+        "ci_level": level,
+        "seed": seed,
+    }
+    return extra
+
+def add_intervals(results, extra):
+    """Merge regression_intervals output into a regression table in place"""
+    for name, values in extra.items():
+        if name == 'inference':
+            results[name] = values
+        elif name in results:
+            results[name].update(values)
+    return results
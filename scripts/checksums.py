@@ -0,0 +1,208 @@
+"""
+Checksum Manifest - Sleep Patterns and Academic Performance
+SHA-256 manifest for raw, cleaned and integrated data artifacts
+
+Files are hashed through a memory map (large buffers for small files) and
+several files are hashed at once on a thread pool; hashlib releases the GIL
+while digesting, so the threads run in parallel.
+The manifest (data/MANIFEST.json) records sha256, size and mtime per file.
+A fast verify trusts entries whose size and mtime are unchanged and only
+rehashes the rest; --full rehashes everything.
+
+Usage:
+    python checksums.py build                 # hash all artifacts and write the manifest
+    python checksums.py verify                # fast verify (size + mtime, rehash changed files)
+    python checksums.py verify --full         # rehash every file
+    python checksums.py hash FILE [FILE ...]  # print checksums
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+MANIFEST_PATH = "data/MANIFEST.json"
+MANIFEST_VERSION = 1
+
+# Artifact groups (glob patterns, relative to the project root)
+ARTIFACTS = {
+    'raw': ["data/raw/*.csv"],
+    'cleaned': ["cleaned_*.csv", "data/processed/Cleaned CSV Datasets/*.csv"],
+    'integrated': ["data/integrated_data.csv", "data/integrated_data.parquet",
+                   "data/integrated_data.feather", "data/integrated/*.csv"],
+}
+
+# Bytes handed to the hash per update (a slice of the memory map or a read buffer)
+HASH_BLOCK = 8 * 1024 * 1024
+# Files smaller than this are read with a buffer instead of mapped
+MMAP_THRESHOLD = 1024 * 1024
+
+def hash_file(path, block=HASH_BLOCK):
+    """SHA-256 hex digest of a file"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_THRESHOLD:
+            for chunk in iter(lambda: f.read(block), b""):
+                h.update(chunk)
+            return h.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                for start in range(0, size, block):
+                    h.update(view[start:start + block])
+            finally:
+                view.release()
+    return h.hexdigest()
+
+def hash_files(paths, workers=None):
+    """{path: sha256} for several files, hashed in parallel"""
+    paths = list(paths)
+    workers = workers or min(8, os.cpu_count() or 1)
+    if workers == 1 or len(paths) < 2:
+        return {path: hash_file(path) for path in paths}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(hash_file, paths)))
+
+def collect_artifacts(artifacts=ARTIFACTS):
+    """{path: group} for every existing artifact file (directories are expanded)"""
+    found = {}
+    for group, patterns in artifacts.items():
+        for pattern in patterns:
+            for match in sorted(glob.glob(pattern)):
+                if os.path.isdir(match):
+                    files = sorted(str(p) for p in Path(match).rglob("*") if p.is_file())
+                else:
+                    files = [match]
+                for path in files:
+                    found.setdefault(Path(path).as_posix(), group)
+    return found
+
+def _stat(path):
+    st = os.stat(path)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+def load_manifest(path=MANIFEST_PATH):
+    """Manifest as a dict (an empty manifest if the file does not exist)"""
+    if not os.path.exists(path):
+        return {'version': MANIFEST_VERSION, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def build_manifest(files, previous=None, workers=None, rehash=False):
+    """Manifest for {path: group}; unchanged entries of previous are reused unless rehash"""
+    previous = (previous or {}).get('files', {})
+    entries, pending = {}, []
+    for path, group in files.items():
+        entry = {'group': group, **_stat(path)}
+        old = previous.get(path)
+        if not rehash and old and old['size'] == entry['size'] and old['mtime_ns'] == entry['mtime_ns']:
+            entry['sha256'] = old['sha256']
+        else:
+            pending.append(path)
+        entries[path] = entry
+    for path, digest in hash_files(pending, workers).items():
+        entries[path]['sha256'] = digest
+    manifest = {'version': MANIFEST_VERSION, 'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'files': entries}
+    return manifest, pending
+
+def update_manifest(paths, group, path=MANIFEST_PATH, workers=None, digests=None):
+    """Add or refresh entries for paths in the manifest on disk; returns {path: sha256}
+
+    digests: {path: sha256} already computed by the caller (e.g. while downloading)
+    """
+    manifest = load_manifest(path)
+    files = {Path(p).as_posix(): group for p in paths}
+    previous = dict(manifest['files'])
+    for p, digest in (digests or {}).items():
+        previous[Path(p).as_posix()] = {'sha256': digest, **_stat(p)}
+    partial, _ = build_manifest(files, {'files': previous}, workers)
+    manifest['files'].update(partial['files'])
+    manifest['generated'] = partial['generated']
+    save_manifest(manifest, path)
+    return {p: partial['files'][p]['sha256'] for p in files}
+
+def verify_manifest(manifest, full=False, workers=None):
+    """{path: status} with status ok / unchanged / changed / missing
+
+    'unchanged' means size and mtime match, so the file was not rehashed.
+    """
+    status, pending = {}, []
+    for path, entry in manifest.get('files', {}).items():
+        if not os.path.exists(path):
+            status[path] = 'missing'
+            continue
+        st = _stat(path)
+        if st['size'] != entry['size']:
+            status[path] = 'changed'
+        elif not full and st['mtime_ns'] == entry['mtime_ns']:
+            status[path] = 'unchanged'
+        else:
+            pending.append(path)
+    for path, digest in hash_files(pending, workers).items():
+        status[path] = 'ok' if digest == manifest['files'][path]['sha256'] else 'changed'
+    return status
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Checksum manifest for data artifacts")
+    parser.add_argument("command", choices=["build", "verify", "hash"])
+    parser.add_argument("files", nargs="*", help="files to hash (hash command)")
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--full", action="store_true", help="rehash every file (build/verify)")
+    parser.add_argument("--workers", type=int, default=None, help="parallel hashing threads")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+
+    if args.command == "hash":
+        for path, digest in hash_files(args.files, args.workers).items():
+            print(f"{digest}  {path}")
+        return
+
+    if args.command == "build":
+        files = collect_artifacts()
+        manifest, hashed = build_manifest(files, load_manifest(args.manifest), args.workers, args.full)
+        save_manifest(manifest, args.manifest)
+        total = sum(entry['size'] for entry in manifest['files'].values())
+        print(f"✓ Manifest written to {args.manifest}: {len(files)} files "
+              f"({total / 1024 / 1024:.1f} MB), {len(hashed)} hashed "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+
+    manifest = load_manifest(args.manifest)
+    if not manifest['files']:
+        print(f"✗ No manifest at {args.manifest} (run: python checksums.py build)")
+        sys.exit(1)
+    status = verify_manifest(manifest, args.full, args.workers)
+    failed = {path: s for path, s in status.items() if s in ('changed', 'missing')}
+    for path, s in sorted(failed.items()):
+        print(f"✗ {s:9s} {path}")
+    counts = {s: list(status.values()).count(s) for s in ('ok', 'unchanged', 'changed', 'missing')}
+    print(f"{'✗' if failed else '✓'} Verified {len(status)} files in {time.perf_counter() - start:.2f}s "
+          f"({counts['ok']} rehashed ok, {counts['unchanged']} unchanged, "
+          f"{counts['changed']} changed, {counts['missing']} missing)")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
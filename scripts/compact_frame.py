@@ -0,0 +1,131 @@
+"""
+Compact Frame - Sleep Patterns and Academic Performance
+Low-memory in-memory representation of the integrated dataset
+
+    labels         categorical codes (dataset_source, gender, sleep_category,
+                   integration_method), vocabularies from storage.py
+    student_id     split into student_id_prefix (categorical, e.g. 'CMU_',
+                   'KGL_S') and student_id_number (smallest unsigned int)
+    measures       float32, NaN marks missing (no object pd.NA blocks)
+    whole numbers  record_id / age downcast to the smallest integer type;
+                   columns with gaps use pandas nullable (masked) integers
+
+expand() restores the string student_id for exports. memory_report()
+compares bytes per row of two representations column by column.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+# Known student_id prefixes (others found in the data are appended)
+ID_PREFIXES = ['CMU_', 'KGL_S']
+ID_PATTERN = r'^(?P<prefix>.*?)(?P<number>[1-9]\d*|0)$'
+
+# Whole-number columns and whether they may be missing
+INTEGER_COLUMNS = {'record_id': False, 'age': True}
+
+def _smallest_int(values, nullable):
+    """Downcast whole numbers to the smallest (nullable) integer dtype that holds them"""
+    numbers = pd.to_numeric(values, errors='coerce')
+    observed = numbers.dropna()
+    if len(observed) and not np.all(observed == np.round(observed)):
+        return numbers.astype('float32')
+    low = observed.min() if len(observed) else 0
+    high = observed.max() if len(observed) else 0
+    for kind in (['uint8', 'uint16', 'uint32', 'uint64'] if low >= 0 else ['int8', 'int16', 'int32', 'int64']):
+        info = np.iinfo(kind)
+        if info.min <= low and high <= info.max:
+            break
+    if nullable or numbers.isna().any():
+        return numbers.astype(kind.capitalize().replace('Uint', 'UInt'))
+    return numbers.astype(kind)
+
+def split_ids(student_id):
+    """(prefix categorical, number array) for ids of the form <prefix><digits>
+
+    Returns None when an id does not fit (no trailing number, or leading zeros
+    that an integer would drop); the caller then keeps the strings.
+    """
+    ids = pd.Series(student_id, copy=False).astype('string')
+    parts = ids.str.extract(ID_PATTERN)
+    if ids.isna().any() or parts['number'].isna().any():
+        return None
+    prefixes = ID_PREFIXES + sorted(set(parts['prefix'].unique()) - set(ID_PREFIXES))
+    prefix = pd.Categorical(parts['prefix'], categories=prefixes)
+    number = _smallest_int(parts['number'].astype('int64'), nullable=False)
+    return prefix, number
+
+def compact(df):
+    """Compact copy of an integrated frame (also fine for already compact frames)"""
+    out = {}
+    for col in df.columns:
+        dtype = storage.PANDAS_DTYPES.get(col)
+        if col == 'student_id':
+            split = split_ids(df[col])
+            if split is None:
+                out[col] = df[col].astype('string')
+            else:
+                out['student_id_prefix'], out['student_id_number'] = split
+        elif col in INTEGER_COLUMNS:
+            out[col] = _smallest_int(df[col], INTEGER_COLUMNS[col])
+        elif col == 'student_id_prefix':
+            # Parts with different extra prefixes concatenate to object; re-encode those
+            if isinstance(df[col].dtype, pd.CategoricalDtype):
+                out[col] = df[col]
+            else:
+                prefixes = ID_PREFIXES + sorted(set(df[col].dropna().astype(str)) - set(ID_PREFIXES))
+                out[col] = df[col].astype(pd.CategoricalDtype(prefixes))
+        elif isinstance(dtype, pd.CategoricalDtype):
+            out[col] = storage.as_categorical(col, df[col]) if df[col].dtype != dtype else df[col]
+        elif dtype == 'float32':
+            out[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+        elif dtype == 'string':
+            # Free-text labels with few distinct values (cohort)
+            out[col] = df[col].astype('category')
+        else:
+            out[col] = df[col]
+    return pd.DataFrame(out, index=df.index)
+
+def expand(df):
+    """Frame with the string student_id restored (for CSV export and joins)"""
+    if 'student_id_prefix' not in df.columns:
+        return df
+    student_id = (df['student_id_prefix'].astype(str)
+                  + df['student_id_number'].astype('int64').astype(str))
+    out = df.drop(columns=['student_id_number'])
+    out = out.rename(columns={'student_id_prefix': 'student_id'})
+    out['student_id'] = student_id
+    return out
+
+def read_compact(path, columns=None, sources=None):
+    """storage.read_integrated, downcast to the compact representation on load"""
+    return compact(storage.read_integrated(path, columns=columns, sources=sources))
+
+def memory_usage(df):
+    """{column: bytes} including string and object payloads"""
+    usage = df.memory_usage(deep=True, index=False)
+    return {col: int(usage[col]) for col in df.columns}
+
+def memory_report(frames):
+    """Print bytes per row per column for {label: frame}; returns {label: total bytes per row}"""
+    usage = {label: memory_usage(df) for label, df in frames.items()}
+    rows = {label: max(len(df), 1) for label, df in frames.items()}
+    labels = list(frames)
+    columns = list(dict.fromkeys(col for label in labels for col in usage[label]))
+
+    print(f"\n  {'column':24s}" + "".join(f"{label:>14s}" for label in labels) + "   (bytes/row)")
+    for col in columns:
+        cells = "".join(f"{usage[label][col] / rows[label]:14.1f}" if col in usage[label] else f"{'-':>14s}"
+                        for label in labels)
+        print(f"  {col:24s}{cells}")
+    totals = {label: sum(usage[label].values()) / rows[label] for label in labels}
+    print(f"  {'TOTAL':24s}" + "".join(f"{totals[label]:14.1f}" for label in labels))
+    if len(labels) == 2 and totals[labels[1]]:
+        print(f"  {labels[1]} uses {totals[labels[1]] / totals[labels[0]]:.1%} of {labels[0]} "
+              f"({totals[labels[0]] / totals[labels[1]]:.1f}x smaller)")
+    return totals
@@ -0,0 +1,363 @@
+"""
+Deduplication and Record Linkage - Sleep Patterns and Academic Performance
+Persistent hash index of record fingerprints plus a blocking index for near duplicates
+
+Every record gets two 64-bit keys, stored in one SQLite table
+(data/dedup/index.sqlite):
+
+    fingerprint   hash of every integrated column except record_id and
+                  integration_method, with measures rounded to the float32
+                  precision the columnar store keeps; equal fingerprints are
+                  exact duplicates (unique index)
+    block         hash of the block_on labels (dataset_source, gender, cohort,
+                  age) and the sleep_hours / academic_score bins; near-duplicate
+                  candidates are records in the same or a neighbouring block
+                  (indexed), within the sleep / score tolerances
+
+A batch is checked by joining its keys against the two indexes, so the work
+grows with the batch and the candidates it finds, not with the history.
+Exact duplicates (against the index or earlier in the batch; the lowest
+record_id is the original) are dropped and written to duplicates.csv with a
+duplicate_of column. Candidate pairs are compared field by field within the
+configured tolerances; pairs agreeing on at least min_agreement of the
+fields both records have go to near_duplicates.csv for review and stay in
+the data. Settings come from the dedup section of config.yaml.
+
+Usage:
+    python dedup.py build --input data/integrated_data.parquet --reset
+    python dedup.py check --input new_batch.csv [--add]
+    python dedup.py stats
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+INDEX_PATH = "data/dedup/index.sqlite"
+DUPLICATES_FILE = "duplicates.csv"
+PAIRS_FILE = "near_duplicates.csv"
+SUMMARY_FILE = "dedup_summary.json"
+
+# Columns left out of the fingerprint (assigned per run, not part of the record)
+NOT_FINGERPRINTED = ['record_id', 'integration_method']
+
+# Used when config.yaml has no dedup section (mirrors the shipped config)
+DEFAULT_SETTINGS = {
+    'block_on': ['dataset_source', 'gender', 'cohort', 'age'],
+    'sleep_bin': 0.1,
+    'score_bin': 0.5,
+    'min_agreement': 0.8,
+    'tolerances': {
+        'sleep_hours': 0.1, 'academic_score': 0.5, 'cumulative_gpa': 0.01, 'bedtime_variability': 0.01,
+        'age': 0, 'study_hours_per_day': 0.1, 'attendance_percentage': 0.5, 'distraction_hours': 0.1,
+    },
+}
+
+# Rows per parameter batch sent to SQLite, and rows whose near-duplicate candidates are scored together
+SQL_BATCH = 50_000
+CANDIDATE_CHUNK = 2_048
+
+# Block offsets probed for near duplicates: the row's own block and its 8 neighbours
+NEIGHBOURS = [(ds, dc) for ds in (-1, 0, 1) for dc in (-1, 0, 1)]
+
+def load_settings(config=None):
+    """Dedup settings from config.yaml's dedup section, else DEFAULT_SETTINGS"""
+    import pipeline_config
+    settings = pipeline_config.analysis_params(config)['dedup']
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    tolerances = settings['tolerances']
+    for column in ('sleep_hours', 'academic_score'):
+        if column not in tolerances:
+            raise ValueError(f"dedup.tolerances must include {column} (it is blocked on)")
+    for column in tolerances:
+        if storage.PANDAS_DTYPES.get(column) != 'float32':
+            raise ValueError(f"dedup.tolerances: {column!r} is not a numeric column of the integrated schema")
+    if settings['sleep_bin'] < tolerances['sleep_hours'] or settings['score_bin'] < tolerances['academic_score']:
+        raise ValueError("dedup: sleep_bin / score_bin must be at least the sleep_hours / academic_score "
+                         "tolerance, or neighbouring blocks can miss candidates")
+    return settings
+
+def _labels(series):
+    return series.astype('object').where(series.notna(), '').astype(str)
+
+def fingerprints(df):
+    """64-bit content hash per row (int64), stable across runs and storage formats"""
+    columns = {}
+    for col in sorted(c for c in df.columns if c not in NOT_FINGERPRINTED):
+        if storage.PANDAS_DTYPES.get(col) in ('float32', 'int64') or pd.api.types.is_float_dtype(df[col]):
+            columns[col] = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=np.float32)
+        else:
+            columns[col] = _labels(df[col]).to_numpy()
+    frame = pd.DataFrame(columns)
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+def block_keys(df, settings, sleep_shift=0, score_shift=0):
+    """Block key per row (int64; rows without sleep_hours or academic_score get none) and a validity mask"""
+    sleep = pd.to_numeric(df['sleep_hours'], errors='coerce').to_numpy(dtype=np.float64)
+    score = pd.to_numeric(df['academic_score'], errors='coerce').to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(sleep) | np.isnan(score))
+    frame = pd.DataFrame({col: _labels(df[col]).to_numpy() if col in df.columns else np.full(len(df), '')
+                          for col in settings['block_on']})
+    frame['sleep_bin'] = np.where(valid, np.floor(np.nan_to_num(sleep) / settings['sleep_bin']), 0) + sleep_shift
+    frame['score_bin'] = np.where(valid, np.floor(np.nan_to_num(score) / settings['score_bin']), 0) + score_shift
+    frame = frame.astype({'sleep_bin': 'int64', 'score_bin': 'int64'})
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64), valid
+
+class DedupIndex:
+    """SQLite-backed fingerprint and blocking index, checked and extended one batch at a time"""
+
+    def __init__(self, path=INDEX_PATH, settings=None, reset=False, output_dir=None):
+        self.path = path
+        self.settings = load_settings() if settings is None else settings
+        self.compare = list(self.settings['tolerances'])
+        self.output_dir = output_dir
+        if reset and os.path.exists(path):
+            os.remove(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self._create()
+        self.counts = {'rows_checked': 0, 'exact_in_index': 0, 'exact_in_batch': 0, 'near_duplicate_pairs': 0,
+                       'rows_added': 0, 'batches': 0, 'seconds': 0.0}
+        self._started = set()
+        if output_dir:
+            for name in (DUPLICATES_FILE, PAIRS_FILE):
+                if os.path.exists(os.path.join(output_dir, name)):
+                    os.remove(os.path.join(output_dir, name))
+
+    def _create(self):
+        columns = ''.join(f', "{col}" REAL' for col in self.compare)
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE IF NOT EXISTS records (record_id INTEGER, fingerprint INTEGER NOT NULL,
+                                                block INTEGER, batch TEXT{columns});
+            CREATE UNIQUE INDEX IF NOT EXISTS records_fingerprint ON records (fingerprint);
+            CREATE INDEX IF NOT EXISTS records_block ON records (block);
+            CREATE TEMP TABLE probe (row INTEGER, key INTEGER, sleep REAL, score REAL);
+        """)
+        stored = self.conn.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+        if stored is None:
+            with self.conn:
+                self.conn.execute("INSERT INTO meta VALUES ('settings', ?)", (json.dumps(self.settings, sort_keys=True),))
+        elif json.loads(stored[0]) != json.loads(json.dumps(self.settings)):
+            raise ValueError(f"{self.path} was built with other dedup settings; rebuild it (--reset)")
+
+    def _probe(self, query, rows, keys, sleep=None, score=None, params=()):
+        """Rows of query joined against the probe table of (row, key[, sleep, score])"""
+        self.conn.execute("DELETE FROM probe")
+        missing = [None] * len(rows)
+        self.conn.executemany("INSERT INTO probe VALUES (?, ?, ?, ?)",
+                              zip(rows.tolist(), keys.tolist(), missing if sleep is None else sleep.tolist(),
+                                  missing if score is None else score.tolist()))
+        return self.conn.execute(query, params).fetchall()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def check(self, batch, add=True, name=None):
+        """(rows to keep, exact duplicates with duplicate_of, near-duplicate pairs) for one batch
+
+        add=True also indexes the kept rows, so later batches are checked against them.
+        """
+        start = time.perf_counter()
+        n = len(batch)
+        record_ids = batch['record_id'].to_numpy(dtype=np.int64) if 'record_id' in batch.columns \
+            else np.arange(n, dtype=np.int64)
+        # Record order decides which copy is the original
+        order = np.argsort(record_ids, kind='stable')
+        fp = fingerprints(batch)
+
+        # Exact duplicates: earlier in this batch, then in the index
+        duplicate_of = np.full(n, -1, dtype=np.int64)
+        fp_sorted = pd.Series(fp[order])
+        repeated = fp_sorted.duplicated(keep='first').to_numpy()
+        if repeated.any():
+            first = pd.Series(record_ids[order][~repeated], index=fp_sorted[~repeated].to_numpy())
+            duplicate_of[order[repeated]] = first.loc[fp_sorted[repeated].to_numpy()].to_numpy()
+        in_batch = int(repeated.sum())
+        fresh = np.flatnonzero(duplicate_of < 0)
+        for i in range(0, len(fresh), SQL_BATCH):
+            rows = fresh[i:i + SQL_BATCH]
+            for row, original in self._probe("SELECT p.row, r.record_id FROM probe p "
+                                             "JOIN records r ON r.fingerprint = p.key", rows, fp[rows]):
+                duplicate_of[row] = original
+        exact = duplicate_of >= 0
+
+        # Near duplicates among the remaining rows: same or neighbouring block, in the index or earlier here
+        pairs = self._near_duplicates(batch, ~exact, record_ids, order)
+
+        kept = batch.loc[~exact]
+        duplicates = batch.loc[exact].copy()
+        duplicates['duplicate_of'] = duplicate_of[exact]
+        if add:
+            self._add(kept, fp[~exact], record_ids[~exact], name)
+
+        self.counts['rows_checked'] += n
+        self.counts['exact_in_batch'] += in_batch
+        self.counts['exact_in_index'] += int(exact.sum()) - in_batch
+        self.counts['near_duplicate_pairs'] += len(pairs)
+        self.counts['batches'] += 1
+        self.counts['seconds'] += time.perf_counter() - start
+        self._write(DUPLICATES_FILE, duplicates)
+        self._write(PAIRS_FILE, pairs)
+        return kept, duplicates, pairs
+
+    def _values(self, batch):
+        return np.column_stack([pd.to_numeric(batch[col], errors='coerce').to_numpy(dtype=np.float64)
+                                if col in batch.columns else np.full(len(batch), np.nan)
+                                for col in self.compare])
+
+    def _near_duplicates(self, batch, candidates, record_ids, order):
+        """Candidate pairs from the blocking index and earlier rows of the batch, scored by field agreement"""
+        values = self._values(batch)
+        own, valid = block_keys(batch, self.settings)
+        rows = np.flatnonzero(candidates & valid)
+        rank = np.empty(len(batch), dtype=np.int64)
+        rank[order] = np.arange(len(batch))
+        earlier = pd.DataFrame({'other': rows, 'key': own[rows]})
+        compared = ''.join(f', r."{col}"' for col in self.compare)
+        # Blocks are probed in SQLite with the sleep / score tolerances applied there
+        query = (f"SELECT p.row, r.record_id{compared} FROM probe p JOIN records r ON r.block = p.key "
+                 f"WHERE ABS(r.sleep_hours - p.sleep) <= ? AND ABS(r.academic_score - p.score) <= ?")
+        tolerances = self.settings['tolerances']
+        params = (tolerances['sleep_hours'] + 1e-9, tolerances['academic_score'] + 1e-9)
+        sleep, score = values[:, self.compare.index('sleep_hours')], values[:, self.compare.index('academic_score')]
+
+        # Candidates are scored a chunk of rows at a time, so memory follows the chunk, not the batch
+        pairs = [self._score(np.empty((0, len(self.compare))), np.empty((0, len(self.compare))),
+                             np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))]
+        for i in range(0, len(rows), CANDIDATE_CHUNK):
+            chunk = rows[i:i + CANDIDATE_CHUNK]
+            probe = pd.concat([pd.DataFrame({'row': chunk, 'key': block_keys(batch.iloc[chunk], self.settings,
+                                                                             ds, dc)[0]})
+                               for ds, dc in NEIGHBOURS], ignore_index=True)
+            probe_rows = probe['row'].to_numpy()
+            found = self._probe(query, probe_rows, probe['key'].to_numpy(), sleep[probe_rows], score[probe_rows],
+                                params)
+            row = np.array([f[0] for f in found], dtype=np.int64)
+            other = np.array([f[2:] for f in found], dtype=np.float64).reshape(len(found), len(self.compare))
+            pairs.append(self._score(values[row], other, record_ids[row],
+                                     np.array([f[1] for f in found], dtype=np.int64)))
+
+            matches = probe.merge(earlier, on='key')
+            row, other = matches['row'].to_numpy(), matches['other'].to_numpy()
+            before = rank[other] < rank[row]
+            row, other = row[before], other[before]
+            pairs.append(self._score(values[row], values[other], record_ids[row], record_ids[other]))
+        pairs = pd.concat(pairs, ignore_index=True)
+        return pairs.sort_values(['record_id', 'candidate_record_id']).reset_index(drop=True)
+
+    def _score(self, mine, other, record_id, other_id):
+        """Pairs whose blocked fields agree and whose share of agreeing fields reaches min_agreement"""
+        tolerances = np.array([self.settings['tolerances'][col] for col in self.compare])
+        both = ~(np.isnan(mine) | np.isnan(other))
+        agree = both & (np.abs(np.nan_to_num(mine) - np.nan_to_num(other)) <= tolerances + 1e-9)
+        compared = both.sum(axis=1)
+        blocked = [self.compare.index('sleep_hours'), self.compare.index('academic_score')]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            share = agree.sum(axis=1) / compared
+        hit = agree[:, blocked].all(axis=1) & (share >= self.settings['min_agreement'])
+        names = np.array(self.compare)
+        return pd.DataFrame({
+            'record_id': record_id[hit],
+            'candidate_record_id': other_id[hit],
+            'agreement': np.round(share[hit], 4),
+            'fields_compared': compared[hit],
+            'fields_agreeing': [';'.join(names[a]) for a in agree[hit]],
+        })
+
+    def _add(self, rows, fp, record_ids, name):
+        keys, valid = block_keys(rows, self.settings)
+        values = self._values(rows)
+        blocks = [key if ok else None for key, ok in zip(keys.tolist(), valid.tolist())]
+        compared = [[None if np.isnan(v) else v for v in values[:, j].tolist()] for j in range(len(self.compare))]
+        placeholders = ', '.join('?' * (4 + len(self.compare)))
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO records VALUES ({placeholders})",
+                                  zip(record_ids.tolist(), fp.tolist(), blocks, [name] * len(rows), *compared))
+        self.counts['rows_added'] += len(rows)
+
+    def _write(self, file_name, rows):
+        if not self.output_dir or not len(rows):
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        rows.to_csv(os.path.join(self.output_dir, file_name), mode='a' if file_name in self._started else 'w',
+                    header=file_name not in self._started, index=False)
+        self._started.add(file_name)
+
+    def summary(self):
+        """Rows checked, exact duplicates (in the batch / against the index), near-duplicate pairs"""
+        return {**self.counts, 'seconds': round(self.counts['seconds'], 3), 'index_rows': len(self),
+                'index': self.path}
+
+    def close(self):
+        self.conn.close()
+
+def print_summary(summary):
+    """Console report of a dedup run"""
+    exact = summary['exact_in_batch'] + summary['exact_in_index']
+    print(f"  ✓ Checked {summary['rows_checked']:,} rows in {summary['seconds']:.2f}s; "
+          f"the dedup index now holds {summary['index_rows']:,} records")
+    mark = '✗' if exact else '✓'
+    print(f"    {mark} exact duplicates dropped: {exact:,} "
+          f"({summary['exact_in_batch']:,} within the batch, {summary['exact_in_index']:,} already indexed)")
+    mark = '!' if summary['near_duplicate_pairs'] else '✓'
+    print(f"    {mark} near-duplicate pairs for review: {summary['near_duplicate_pairs']:,}")
+
+def write_summary(summary, output_dir):
+    """Write <output_dir>/dedup_summary.json; returns the path"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, SUMMARY_FILE)
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return path
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Exact and near-duplicate detection against a persistent index")
+    parser.add_argument("--index", default=INDEX_PATH, help="SQLite index file")
+    parser.add_argument("--output-dir", default="data/quarantine",
+                        help="duplicates.csv, near_duplicates.csv and dedup_summary.json go here")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="index integrated data (dropping its own duplicates)")
+    build.add_argument("--input", required=True, help="integrated data (.parquet/.feather/.csv)")
+    build.add_argument("--reset", action="store_true", help="start from an empty index")
+
+    check = sub.add_parser("check", help="check a new batch against the index")
+    check.add_argument("--input", required=True, help="batch in the integrated schema (.parquet/.feather/.csv)")
+    check.add_argument("--add", action="store_true", help="also index the batch's non-duplicate rows")
+    check.add_argument("--output", default=None, help="write the batch without exact duplicates here (CSV)")
+
+    sub.add_parser("stats", help="index size and settings")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "stats":
+        index = DedupIndex(args.index)
+        print(f"✓ {args.index}: {len(index):,} records")
+        print(json.dumps(index.settings, indent=2))
+        return
+
+    index = DedupIndex(args.index, reset=args.command == "build" and args.reset, output_dir=args.output_dir)
+    batch = storage.read_integrated(args.input)
+    name = os.path.basename(args.input.rstrip('/'))
+    kept, _, _ = index.check(batch, add=args.command == "build" or args.add, name=name)
+    summary = index.summary()
+    print_summary(summary)
+    print(f"  ✓ Dedup summary → {write_summary(summary, args.output_dir)}")
+    if args.command == "check" and args.output:
+        kept.to_csv(args.output, index=False)
+        print(f"  ✓ Batch without exact duplicates → {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Figure Rendering - Sleep Patterns and Academic Performance
+Independent, parallel render tasks for the four analysis figures
+
+Each figure is drawn by a render function that takes only precomputed,
+picklable inputs (histogram counts, category counts, regression line
+points, box-plot statistics, ...), never the integrated DataFrame. Those
+inputs are fixed-size reductions (see plot_reduction.py): scatters become
+2D count grids and box plots come from quantile sketches. The
+*_inputs functions build those inputs in the analysis process; a
+FigureRenderer then runs the render functions on a process pool with the
+Agg backend. A figure is skipped when its inputs and renderer code are
+unchanged since the last run (tracked in .render_manifest.json).
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import plot_reduction
+from storage import SLEEP_CATEGORIES
+
+MANIFEST_NAME = ".render_manifest.json"
+FIGURE_DPI = 300
+CATEGORY_COLORS = ['#d62728', '#ff7f0e', '#2ca02c', '#1f77b4']
+SOURCE_COLORS = ['lightblue', 'lightcoral']
+
+# ---------------------------------------------------------------------------
+# Input preparation (analysis process, no matplotlib)
+# ---------------------------------------------------------------------------
+
+def _column(df, name):
+    return df[name].to_numpy(dtype=np.float64, na_value=np.nan)
+
+def box_stats(values, label):
+    """Box-plot statistics from a quantile sketch (bounded size, any number of rows)"""
+    return plot_reduction.KLLSketch.from_values(values).box_stats(label)
+
+def sleep_distribution_inputs(df, bins=25):
+    """Figure 1: sleep-hours histogram counts and sleep-category counts"""
+    sleep = _column(df, 'sleep_hours')
+    counts, edges = plot_reduction.histogram_counts(sleep, bins=bins)
+    category_counts = df['sleep_category'].value_counts()
+    return {
+        'hist_counts': counts,
+        'hist_edges': edges,
+        'sleep_mean': float(np.nanmean(sleep)),
+        'categories': list(SLEEP_CATEGORIES),
+        'category_counts': [int(category_counts.get(cat, 0)) for cat in SLEEP_CATEGORIES],
+        'n_total': int(len(df)),
+    }
+
+def sleep_vs_performance_inputs(df, model):
+    """Figure 2: binned sleep/score density, fitted line and per-category box statistics"""
+    sleep = _column(df, 'sleep_hours')
+    academic = _column(df, 'academic_score')
+    line_x = np.linspace(np.nanmin(sleep), np.nanmax(sleep), 100)
+    codes = pd.Categorical(df['sleep_category'], categories=SLEEP_CATEGORIES).codes
+    boxes = []
+    for i, cat in enumerate(SLEEP_CATEGORIES):
+        values = academic[codes == i]
+        if np.isfinite(values).any():
+            boxes.append(box_stats(values, cat))
+    return {
+        'density': plot_reduction.Grid2D.from_arrays(sleep, academic).to_dict(),
+        'line_x': line_x,
+        'line_y': model['coefficient'] * line_x + model['intercept'],
+        'line_label': (f"y = {model['coefficient']:.2f}x + {model['intercept']:.2f}\n"
+                       f"R² = {model['r_squared']:.3f}"),
+        'boxes': boxes,
+        'box_colors': [CATEGORY_COLORS[SLEEP_CATEGORIES.index(b['label'])] for b in boxes],
+    }
+
+def dataset_comparison_inputs(cmu_df, kaggle_df):
+    """Figure 3: per-source box statistics for sleep and academic score (sources without values left out)"""
+    inputs = {'sleep_boxes': [], 'sleep_colors': [], 'academic_boxes': [], 'academic_colors': []}
+    sources = [(cmu_df, 'CMU\n(Fitbit)', 'CMU\n(GPA scaled)', SOURCE_COLORS[0]),
+               (kaggle_df, 'Kaggle\n(Self-report)', 'Kaggle\n(Exam scores)', SOURCE_COLORS[1])]
+    for source_df, sleep_label, academic_label, color in sources:
+        for key, column, label in [('sleep', 'sleep_hours', sleep_label),
+                                   ('academic', 'academic_score', academic_label)]:
+            values = _column(source_df, column)
+            if np.isfinite(values).any():
+                inputs[f"{key}_boxes"].append(box_stats(values, label))
+                inputs[f"{key}_colors"].append(color)
+    return inputs
+
+def productivity_inputs(kaggle_df, correlations):
+    """Figure 4: binned Kaggle densities and per-category study/attendance means"""
+    def by_category(name):
+        if name not in kaggle_df.columns:
+            return None
+        means = kaggle_df.groupby('sleep_category', observed=True)[name].mean()
+        return {'labels': [str(c) for c in means.index], 'values': means.to_numpy(dtype=np.float64)}
+
+    return {
+        'sleep_productivity': plot_reduction.Grid2D.from_arrays(
+            _column(kaggle_df, 'sleep_hours'), _column(kaggle_df, 'productivity_score')).to_dict(),
+        'productivity_academic': plot_reduction.Grid2D.from_arrays(
+            _column(kaggle_df, 'productivity_score'), _column(kaggle_df, 'academic_score')).to_dict(),
+        'r_sleep_productivity': correlations['sleep_hours_vs_productivity'],
+        'r_productivity_academic': correlations['productivity_vs_academic_score'],
+        'study_by_category': by_category('study_hours_per_day'),
+        'attendance_by_category': by_category('attendance_percentage'),
+    }
+
+# ---------------------------------------------------------------------------
+# Render functions (worker processes, Agg backend)
+# ---------------------------------------------------------------------------
+
+def _category_bars(ax, data, ylabel, title):
+    x = range(len(data['values']))
+    ax.bar(x, data['values'], color=CATEGORY_COLORS[:len(data['values'])], edgecolor='black', alpha=0.8)
+    ax.set_xticks(list(x))
+    ax.set_xticklabels(data['labels'], rotation=0)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(alpha=0.3, axis='y')
+
+def _no_data(ax, title):
+    """Leave an empty panel blank apart from its title"""
+    ax.set_title(title)
+    ax.text(0.5, 0.5, 'No data', ha='center', va='center', transform=ax.transAxes)
+    ax.set_axis_off()
+
+def _density(ax, grid, cmap):
+    """Draw a 2D count grid; empty cells stay transparent"""
+    from matplotlib.colors import LogNorm
+
+    counts = np.ma.masked_equal(grid['counts'].T, 0)
+    mesh = ax.pcolormesh(grid['x_edges'], grid['y_edges'], counts, cmap=cmap,
+                         norm=LogNorm(vmin=1, vmax=max(int(counts.max() or 1), 2)))
+    ax.figure.colorbar(mesh, ax=ax, label='Students per cell')
+
+def _source_boxes(ax, boxes, colors, ylabel, title):
+    if not boxes:
+        _no_data(ax, title)
+        return
+    bp = ax.bxp(boxes, patch_artist=True, showmeans=True)
+    for patch, color in zip(bp['boxes'], colors):
+        patch.set_facecolor(color)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.grid(alpha=0.3, axis='y')
+
+def render_sleep_distribution(inputs, path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(12, 5))
+
+    edges = inputs['hist_edges']
+    axes[0].bar(edges[:-1], inputs['hist_counts'], width=np.diff(edges), align='edge',
+                color='steelblue', edgecolor='black', alpha=0.7)
+    axes[0].axvline(inputs['sleep_mean'], color='red', linestyle='--', linewidth=2,
+                    label=f"Mean: {inputs['sleep_mean']:.2f}h")
+    axes[0].axvline(7, color='green', linestyle=':', linewidth=2, label='Recommended: 7h')
+    axes[0].set_xlabel('Sleep Hours per Night')
+    axes[0].set_ylabel('Number of Students')
+    axes[0].set_title('Distribution of Sleep Duration')
+    axes[0].legend()
+    axes[0].grid(alpha=0.3)
+
+    counts = inputs['category_counts']
+    axes[1].bar(range(len(counts)), counts, color=CATEGORY_COLORS, edgecolor='black', alpha=0.8)
+    axes[1].set_xticks(range(len(counts)))
+    axes[1].set_xticklabels(inputs['categories'], rotation=0)
+    axes[1].set_ylabel('Number of Students')
+    axes[1].set_title('Sleep Quality Categories')
+    axes[1].grid(alpha=0.3, axis='y')
+
+    offset = max(counts) * 0.02 if max(counts) else 1
+    axes[1].set_ylim(0, max(max(counts) * 1.15, 1))
+    for i, v in enumerate(counts):
+        axes[1].text(i, v + offset, f"{v}\n({v / inputs['n_total'] * 100:.1f}%)",
+                     ha='center', fontsize=9, fontweight='bold')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=FIGURE_DPI, bbox_inches='tight')
+    plt.close(fig)
+
+def render_sleep_vs_performance(inputs, path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    _density(axes[0], inputs['density'], 'Blues')
+    axes[0].plot(inputs['line_x'], inputs['line_y'], 'r-', linewidth=2, label=inputs['line_label'])
+    axes[0].set_xlabel('Sleep Hours per Night')
+    axes[0].set_ylabel('Academic Score (0-100)')
+    axes[0].set_title('Sleep Duration vs Academic Performance\n(All Students)')
+    axes[0].legend()
+    axes[0].grid(alpha=0.3)
+
+    bp = axes[1].bxp(inputs['boxes'], patch_artist=True, showfliers=True)
+    for patch, color in zip(bp['boxes'], inputs['box_colors']):
+        patch.set_facecolor(color)
+    axes[1].set_xlabel('Sleep Category')
+    axes[1].set_ylabel('Academic Score (0-100)')
+    axes[1].set_title('Academic Performance by Sleep Category')
+    axes[1].grid(alpha=0.3, axis='y')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=FIGURE_DPI, bbox_inches='tight')
+    plt.close(fig)
+
+def render_dataset_comparison(inputs, path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    _source_boxes(axes[0], inputs['sleep_boxes'], inputs['sleep_colors'],
+                  'Sleep Hours per Night', 'Sleep Duration by Dataset')
+    _source_boxes(axes[1], inputs['academic_boxes'], inputs['academic_colors'],
+                  'Academic Score (0-100)', 'Academic Performance by Dataset')
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=FIGURE_DPI, bbox_inches='tight')
+    plt.close(fig)
+
+def render_productivity_mediation(inputs, path):
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+
+    panels = [
+        (axes[0, 0], 'sleep_productivity', 'Greens', 'Sleep Hours', 'Productivity Score',
+         f"Sleep to Productivity\nr = {inputs['r_sleep_productivity']:.3f}"),
+        (axes[0, 1], 'productivity_academic', 'Purples', 'Productivity Score', 'Academic Score',
+         f"Productivity to Academic\nr = {inputs['r_productivity_academic']:.3f}"),
+    ]
+    for ax, key, cmap, xlabel, ylabel, title in panels:
+        if not inputs[key]['counts'].any():
+            _no_data(ax, title)
+            continue
+        _density(ax, inputs[key], cmap)
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.grid(alpha=0.3)
+
+    for ax, key, ylabel, title in [
+            (axes[1, 0], 'study_by_category', 'Study Hours per Day', 'Study Hours by Sleep Category'),
+            (axes[1, 1], 'attendance_by_category', 'Attendance Percentage', 'Attendance by Sleep Category')]:
+        if inputs[key] is None or not len(inputs[key]['values']):
+            _no_data(ax, title)
+        else:
+            _category_bars(ax, inputs[key], ylabel, title)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=FIGURE_DPI, bbox_inches='tight')
+    plt.close(fig)
+
+RENDERERS = {
+    '01_sleep_distribution': render_sleep_distribution,
+    '02_sleep_vs_performance': render_sleep_vs_performance,
+    '03_dataset_comparison': render_dataset_comparison,
+    '04_productivity_mediation': render_productivity_mediation,
+}
+
+def _init_worker():
+    """Agg backend and the project plot style, once per worker process"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set_style("whitegrid")
+    plt.rcParams['figure.dpi'] = FIGURE_DPI
+    plt.rcParams['savefig.dpi'] = FIGURE_DPI
+    plt.rcParams['font.size'] = 10
+
+_style_ready = False
+
+def render(name, inputs, path):
+    """Render one figure in this process (Agg backend, project style); returns seconds"""
+    global _style_ready
+    if not _style_ready:
+        _init_worker()
+        _style_ready = True
+    return _render_task(name, inputs, path)
+
+def _render_task(name, inputs, path):
+    """Render one figure in a worker; returns the render wall time in seconds"""
+    start = time.perf_counter()
+    RENDERERS[name](inputs, path)
+    return time.perf_counter() - start
+
+# ---------------------------------------------------------------------------
+# Scheduling and change detection
+# ---------------------------------------------------------------------------
+
+def _update_digest(h, obj):
+    """Feed a nested structure of dicts/lists/arrays/scalars into a hash deterministically"""
+    if isinstance(obj, dict):
+        for key in sorted(obj):
+            h.update(repr(key).encode())
+            _update_digest(h, obj[key])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b'[')
+        for item in obj:
+            _update_digest(h, item)
+        h.update(b']')
+    elif isinstance(obj, np.ndarray):
+        h.update(str(obj.dtype).encode() + str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    else:
+        h.update(pickle.dumps(obj))
+
+def input_digest(name, inputs):
+    """Hash of a figure's inputs plus the source of its renderer"""
+    h = hashlib.sha256()
+    h.update(inspect.getsource(RENDERERS[name]).encode())
+    h.update(str(FIGURE_DPI).encode())
+    _update_digest(h, inputs)
+    return h.hexdigest()
+
+class FigureRenderer:
+    """Submit figures as their inputs become ready; render them on a process pool"""
+
+    def __init__(self, figures_dir, jobs=None, force=False):
+        self.figures_dir = figures_dir
+        self.force = force
+        self.manifest_path = os.path.join(figures_dir, MANIFEST_NAME)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+        self.pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker)
+        self.pending = {}
+        self.report = {}
+
+    def path(self, name):
+        return os.path.join(self.figures_dir, f"{name}.png")
+
+    def submit(self, name, inputs):
+        """Queue a render unless the figure exists and its inputs are unchanged"""
+        digest = input_digest(name, inputs)
+        previous = self.manifest.get(name, {})
+        if not self.force and previous.get('digest') == digest and os.path.exists(self.path(name)):
+            self.report[name] = {'status': 'skipped', 'seconds': 0.0}
+            return
+        future = self.pool.submit(_render_task, name, inputs, self.path(name))
+        self.pending[name] = (future, digest)
+
+    def wait(self):
+        """Wait for all submitted figures, update the manifest and return the per-figure report"""
+        try:
+            for name, (future, digest) in self.pending.items():
+                seconds = future.result()
+                self.manifest[name] = {'digest': digest, 'render_seconds': round(seconds, 3)}
+                self.report[name] = {'status': 'rendered', 'seconds': seconds}
+        finally:
+            self.pool.shutdown()
+            self.pending = {}
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+        return dict(sorted(self.report.items()))
@@ -0,0 +1,229 @@
+"""
+Mixed-Effects Model - Sleep Patterns and Academic Performance
+Random-intercept regression on sparse cell-level design matrices
+
+    academic_score ~ sleep_hours + (1 | dataset_source) + (1 | dataset_source:cohort)
+
+Rows are first reduced to cells, one per combination of grouping levels,
+holding counts and sums of x, y, x², xy and y² (one pass, bincount). Every
+matrix the model needs comes from those cells: Z'Z, Z'X and Z'y are sparse
+products of a cells-by-levels indicator matrix, so the row-level design
+matrix Z is never built and the cost of one likelihood evaluation depends
+on the number of levels, not students.
+
+The fit is REML in the profiled form used by lme4 (Bates et al. 2015): for
+relative standard deviations theta (one per grouping factor), Λ = diag(θ),
+the sparse system ΛZ'ZΛ + I is factorized (SuperLU), the fixed effects and
+scaled random effects solve the penalized least-squares problem, and the
+REML deviance follows in closed form. theta is optimized with L-BFGS-B
+under theta >= 0 (a variance may be estimated as zero).
+
+fit_dense() runs the same estimator on a materialized dense Z for the
+benchmark (benchmark.py stages mixed_sparse / mixed_dense).
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import optimize, sparse, special
+from scipy.sparse import linalg as sparse_linalg
+
+# Grouping factors; cohort is nested in source, and rows without a cohort share one level
+FACTORS = ['dataset_source', 'cohort']
+NO_COHORT = 'all'
+
+# The dense benchmark refuses designs larger than this
+DENSE_MAX_BYTES = 2 * 1024 ** 3
+
+def grouping_levels(df):
+    """[(factor, level index per row, level names)] for the source and source:cohort factors"""
+    source = df['dataset_source'].astype('object').astype(str)
+    cohort = df['cohort'].astype('object').where(df['cohort'].notna(), NO_COHORT).astype(str) \
+        if 'cohort' in df.columns else pd.Series(NO_COHORT, index=df.index)
+    factors = []
+    for name, labels in (('dataset_source', source), ('cohort', source + ':' + cohort)):
+        codes, levels = pd.factorize(labels, sort=True)
+        factors.append((name, codes, list(levels)))
+    return factors
+
+class Cells:
+    """Sufficient statistics per combination of grouping levels"""
+
+    def __init__(self, x, y, factors):
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        keep = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[keep], y[keep]
+        codes = [np.asarray(c)[keep].astype(np.int64) for _, c, _ in factors]
+
+        # Mixed-radix key over the factor levels, then one bincount per sum
+        key = np.zeros(len(x), dtype=np.int64)
+        for (_, _, levels), c in zip(factors, codes):
+            key = key * len(levels) + c
+        unique, cell = np.unique(key, return_inverse=True)
+        size = len(unique)
+        self.n = np.bincount(cell, minlength=size).astype(np.float64)
+        self.sx = np.bincount(cell, weights=x, minlength=size)
+        self.sy = np.bincount(cell, weights=y, minlength=size)
+        self.sxx = np.bincount(cell, weights=x * x, minlength=size)
+        self.sxy = np.bincount(cell, weights=x * y, minlength=size)
+        self.syy = np.bincount(cell, weights=y * y, minlength=size)
+
+        # Level of every factor for each cell, decoded from the key
+        self.factor_names = [name for name, _, _ in factors]
+        self.levels = [levels for _, _, levels in factors]
+        self.cell_levels = np.zeros((size, len(factors)), dtype=np.int64)
+        rest = unique.copy()
+        for f in range(len(factors) - 1, -1, -1):
+            self.cell_levels[:, f] = rest % len(self.levels[f])
+            rest //= len(self.levels[f])
+        self.rows = int(self.n.sum())
+
+def _system(cells):
+    """Cross-products of the model: X'X, X'y, y'y, Z'Z, Z'X, Z'y (Z' parts sparse)"""
+    sizes = [len(levels) for levels in cells.levels]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    n_cells, q = len(cells.n), int(sum(sizes))
+    rows = np.repeat(np.arange(n_cells), len(sizes))
+    cols = (cells.cell_levels + offsets).ravel()
+    indicator = sparse.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(n_cells, q))
+
+    cell_x = np.column_stack([cells.n, cells.sx])
+    return {
+        'n': cells.rows,
+        'xtx': np.array([[cells.n.sum(), cells.sx.sum()], [cells.sx.sum(), cells.sxx.sum()]]),
+        'xty': np.array([cells.sy.sum(), cells.sxy.sum()]),
+        'yty': cells.syy.sum(),
+        'ztz': (indicator.T @ sparse.diags(cells.n) @ indicator).tocsc(),
+        'ztx': indicator.T @ cell_x,
+        'zty': indicator.T @ cells.sy,
+        'factor_of_level': np.repeat(np.arange(len(sizes)), sizes),
+    }
+
+def _profile_sparse(theta, system):
+    """REML deviance and the solution at relative standard deviations theta"""
+    lam = theta[system['factor_of_level']]
+    q = len(lam)
+    a = (sparse.diags(lam) @ system['ztz'] @ sparse.diags(lam) + sparse.identity(q)).tocsc()
+    lu = sparse_linalg.splu(a, permc_spec='MMD_AT_PLUS_A')
+    # ΛZ'ZΛ + I is positive definite, so log|det| is its log-determinant (L has a unit diagonal)
+    logdet = float(np.log(np.abs(lu.U.diagonal())).sum())
+    return _finish(system, lam, logdet, lu.solve)
+
+def _finish(system, lam, logdet, solve):
+    """Fixed effects from the Schur complement, then the profiled REML deviance"""
+    lztx = lam[:, None] * system['ztx']
+    lzty = lam * system['zty']
+    cx = solve(lztx)
+    cu = solve(lzty)
+    schur = system['xtx'] - lztx.T @ cx
+    beta = np.linalg.solve(schur, system['xty'] - lztx.T @ cu)
+    u = cu - cx @ beta
+    r2 = system['yty'] - beta @ system['xty'] - u @ lzty
+    n, p = system['n'], len(beta)
+    dof = n - p
+    deviance = logdet + np.linalg.slogdet(schur)[1] + dof * (1 + np.log(2 * np.pi * r2 / dof))
+    return {'deviance': float(deviance), 'beta': beta, 'u': u, 'lam': lam, 'r2': float(r2), 'schur': schur}
+
+def _optimize(profile, system, n_factors):
+    """Minimize the REML deviance over theta >= 0; returns (theta, solution, optimizer result)"""
+    result = optimize.minimize(lambda t: profile(t, system)['deviance'], x0=np.ones(n_factors),
+                               method='L-BFGS-B', bounds=[(0, None)] * n_factors)
+    theta = np.maximum(result.x, 0.0)
+    return theta, profile(theta, system), result
+
+def _summary(cells, theta, solution, result, solver):
+    """JSON-ready fit: fixed effects with t tests, variance components, source intercepts"""
+    n, p = cells.rows, len(solution['beta'])
+    sigma2 = solution['r2'] / (n - p)
+    cov = sigma2 * np.linalg.inv(solution['schur'])
+    se = np.sqrt(np.diag(cov))
+    t = solution['beta'] / se
+    p_values = 2 * special.stdtr(n - p, -np.abs(t))
+
+    variances = {name: float(sigma2 * theta[f] ** 2) for f, name in enumerate(cells.factor_names)}
+    total = sigma2 + sum(variances.values())
+    random_effects = {}
+    blups = solution['lam'] * solution['u']
+    start = 0
+    for f, name in enumerate(cells.factor_names):
+        levels = cells.levels[f]
+        random_effects[name] = {
+            'variance': variances[name],
+            'std': float(np.sqrt(variances[name])),
+            'levels': len(levels),
+            'share_of_variance': float(variances[name] / total) if total else None,
+        }
+        if f == 0:
+            random_effects[name]['intercepts'] = {str(level): float(b)
+                                                  for level, b in zip(levels, blups[start:start + len(levels)])}
+        start += len(levels)
+    return {
+        'n': n,
+        'coefficient': float(solution['beta'][1]),
+        'intercept': float(solution['beta'][0]),
+        'std_error': float(se[1]),
+        't_value': float(t[1]),
+        'p_value': float(p_values[1]),
+        'intercept_std_error': float(se[0]),
+        'intercept_p_value': float(p_values[0]),
+        'residual_variance': float(sigma2),
+        'random_effects': random_effects,
+        'reml_deviance': solution['deviance'],
+        'converged': bool(result.success),
+        'iterations': int(result.nit),
+        'solver': solver,
+        'cells': len(cells.n),
+    }
+
+def fit(x, y, factors):
+    """Sparse REML fit of y ~ x with a random intercept per grouping factor"""
+    cells = Cells(x, y, factors)
+    system = _system(cells)
+    theta, solution, result = _optimize(_profile_sparse, system, len(factors))
+    return _summary(cells, theta, solution, result, 'sparse')
+
+def fit_dense(x, y, factors):
+    """The same REML fit on a dense row-level Z (benchmark reference)"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~(np.isnan(x) | np.isnan(y))
+    sizes = [len(levels) for _, _, levels in factors]
+    q = int(sum(sizes))
+    if keep.sum() * q * 8 > DENSE_MAX_BYTES:
+        raise ValueError(f"A dense Z of {int(keep.sum()):,} x {q:,} exceeds {DENSE_MAX_BYTES / 1024 ** 3:.0f} GB; "
+                         f"use the sparse fit")
+    z = np.zeros((int(keep.sum()), q))
+    offset = 0
+    for (_, codes, levels) in factors:
+        z[np.arange(len(z)), offset + np.asarray(codes)[keep]] = 1.0
+        offset += len(levels)
+    design = np.column_stack([np.ones(len(z)), x[keep]])
+    yk = y[keep]
+    system = {
+        'n': len(z), 'xtx': design.T @ design, 'xty': design.T @ yk, 'yty': yk @ yk,
+        'ztz': z.T @ z, 'ztx': z.T @ design, 'zty': z.T @ yk,
+        'factor_of_level': np.repeat(np.arange(len(sizes)), sizes),
+    }
+
+    def profile(theta, system):
+        lam = theta[system['factor_of_level']]
+        a = lam[:, None] * system['ztz'] * lam[None, :] + np.eye(len(lam))
+        chol = np.linalg.cholesky(a)
+        logdet = 2 * float(np.log(np.diag(chol)).sum())
+        return _finish(system, lam, logdet, lambda b: np.linalg.solve(a, b))
+
+    theta, solution, result = _optimize(profile, system, len(factors))
+    cells = Cells(x, y, factors)
+    return _summary(cells, theta, solution, result, 'dense')
+
+def mixed_regression(df, solver='sparse'):
+    """regression_results.json entry: academic_score ~ sleep_hours with source and cohort intercepts"""
+    factors = grouping_levels(df)
+    fitter = fit if solver == 'sparse' else fit_dense
+    result = fitter(df['sleep_hours'].to_numpy(dtype=np.float64, na_value=np.nan),
+                    df['academic_score'].to_numpy(dtype=np.float64, na_value=np.nan), factors)
+    return {'description': 'Academic Score ~ Sleep Hours + (1 | Source) + (1 | Source:Cohort), REML',
+            **result}
@@ -0,0 +1,153 @@
+"""
+OLS Engine - Sleep Patterns and Academic Performance
+Batched closed-form least squares from grouped sufficient statistics
+
+Every model y ~ xs (with intercept) is solved from its centered Gram
+matrix X'X and X'y, assembled from the sums in a Moments object (see
+stats_kernel.py), so no design matrix or prediction vector is ever built.
+Models with the same number of regressors are stacked and solved in one
+batched call, whether they come from different subsets (fit_many) or from
+every group of a Moments object at once (fit_groups).
+
+Each fit returns coefficients, standard errors, t statistics and two-sided
+p-values (classical OLS, n - k - 1 degrees of freedom), R² and RMSE (the
+population RMSE, as sklearn's mean_squared_error reports it).
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+from scipy import special
+
+def _system(m, y, xs, group):
+    """n, means, centered X'X, X'y and y'y of one model in one group, over its complete rows
+
+    A single regressor uses the pair moments of (x, y). Several use the
+    moments over rows where every variable of m is observed, which are the
+    model's complete rows when its columns are all of m's (or are missing
+    together, when the pairwise sums are the same thing).
+    """
+    names = list(xs) + [y]
+    idx = [m.index[v] for v in names]
+    k = len(xs)
+    if k == 1:
+        n, sx, sy, sxx, syy, sxy = m.pair(xs[0], y, group)
+        sums = np.array([sx, sy])
+        raw = np.array([[sxx, sxy], [sxy, syy]])
+    else:
+        n_block = m.n[group][np.ix_(idx, idx)]
+        if np.all(n_block == n_block[0, 0]):
+            n = n_block[0, 0]
+            sums = np.array([m.s[group, i, i] for i in idx])
+            raw = m.c[group][np.ix_(idx, idx)]
+        elif sorted(idx) == list(range(len(m.variables))):
+            n = m.complete[group, 0, 0]
+            sums = m.complete[group, 0, 1:][idx]
+            raw = m.complete[group, 1:, 1:][np.ix_(idx, idx)]
+        else:
+            raise ValueError(f"Variables {names} are missing on different rows and are not all of "
+                             f"{m.variables}; cannot fit from moments")
+    if n == 0:
+        return n, np.full(k + 1, np.nan), np.full((k, k), np.nan), np.full(k, np.nan), np.nan
+    cross = raw - np.outer(sums, sums) / n
+    return n, sums / n, cross[:k, :k], cross[:k, k], cross[k, k]
+
+def solve_centered(n, means, sxx, sxy, syy):
+    """Stacked fits: n (B,), means (B, k+1), sxx (B, k, k), sxy (B, k), syy (B,)
+
+    Fits with k rows or fewer (e.g. an empty group) come back as NaN.
+    """
+    k = sxx.shape[1]
+    inv = np.full_like(sxx, np.nan)
+    fitted = n > k
+    if fitted.any():
+        inv[fitted] = np.linalg.inv(sxx[fitted])
+    beta = np.einsum('bij,bj->bi', inv, sxy)
+    intercept = means[:, k] - np.einsum('bi,bi->b', beta, means[:, :k])
+    sse = np.maximum(syy - np.einsum('bi,bi->b', beta, sxy), 0.0)
+    dof = n - k - 1
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sigma2 = np.where(dof > 0, sse / dof, np.nan)
+        se = np.sqrt(sigma2[:, None] * np.diagonal(inv, axis1=1, axis2=2))
+        x_bar = means[:, :k]
+        intercept_se = np.sqrt(sigma2 * (1 / n + np.einsum('bi,bij,bj->b', x_bar, inv, x_bar)))
+        t = beta / se
+        intercept_t = intercept / intercept_se
+        r_squared = 1 - sse / syy
+        rmse = np.sqrt(sse / n)
+    p = 2 * special.stdtr(dof[:, None], -np.abs(t))
+    intercept_p = 2 * special.stdtr(dof, -np.abs(intercept_t))
+    return {
+        'n': n, 'coefficients': beta, 'std_errors': se, 't_values': t, 'p_values': p,
+        'intercept': intercept, 'intercept_std_error': intercept_se, 'intercept_p_value': intercept_p,
+        'r_squared': r_squared, 'rmse': rmse,
+    }
+
+def _unstack(batch, b):
+    """Plain-float result dict for model b of a solved batch"""
+    return {
+        'n': int(batch['n'][b]),
+        'coefficients': [float(v) for v in batch['coefficients'][b]],
+        'std_errors': [float(v) for v in batch['std_errors'][b]],
+        't_values': [float(v) for v in batch['t_values'][b]],
+        'p_values': [float(v) for v in batch['p_values'][b]],
+        'intercept': float(batch['intercept'][b]),
+        'intercept_std_error': float(batch['intercept_std_error'][b]),
+        'intercept_p_value': float(batch['intercept_p_value'][b]),
+        'r_squared': float(batch['r_squared'][b]),
+        'rmse': float(batch['rmse'][b]),
+    }
+
+def _fit_systems(systems):
+    """Solve {name: system}, batching systems with the same number of regressors"""
+    by_size = {}
+    for name, system in systems.items():
+        by_size.setdefault(system[2].shape[0], []).append(name)
+    results = {}
+    for names in by_size.values():
+        stacked = [np.array([systems[name][i] for name in names], dtype=np.float64) for i in range(5)]
+        batch = solve_centered(*stacked)
+        for b, name in enumerate(names):
+            results[name] = _unstack(batch, b)
+    return {name: results[name] for name in systems}
+
+def fit_many(m, specs):
+    """Fit {name: (y, xs, select)} where select picks the groups of m to pool (None = all)"""
+    systems = {}
+    for name, (y, xs, select) in specs.items():
+        systems[name] = _system(m.total(select), y, xs, 0)
+    return _fit_systems(systems)
+
+def fit(m, y, xs, select=None):
+    """Fit a single model y ~ xs over the groups picked by select"""
+    return fit_many(m, {'model': (y, xs, select)})['model']
+
+def fit_groups(m, y, xs, min_rows=None):
+    """Fit y ~ xs separately in every group of m; {group key: fit}
+
+    Groups with fewer than min_rows (default k + 2) complete rows are left out.
+    """
+    min_rows = len(xs) + 2 if min_rows is None else min_rows
+    systems = {}
+    for g, key in enumerate(m.keys):
+        system = _system(m, y, xs, g)
+        if system[0] >= min_rows:
+            systems[key] = system
+    return _fit_systems(systems)
+
+def simple(result):
+    """Single-regressor view of a fit: coefficient, std_error and p_value as scalars"""
+    return {
+        'n': result['n'],
+        'coefficient': result['coefficients'][0],
+        'intercept': result['intercept'],
+        'r_squared': result['r_squared'],
+        'rmse': result['rmse'],
+        'std_error': result['std_errors'][0],
+        't_value': result['t_values'][0],
+        'p_value': result['p_values'][0],
+        'intercept_std_error': result['intercept_std_error'],
+        'intercept_p_value': result['intercept_p_value'],
+    }
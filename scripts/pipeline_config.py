@@ -0,0 +1,52 @@
+"""
+Pipeline Configuration - Sleep Patterns and Academic Performance
+Loads the shared workflow settings from Workflow Automation/config.yaml
+
+The config is looked up in this order: the PIPELINE_CONFIG environment
+variable, config.yaml in the working directory, then the copy in the
+repository's "Workflow Automation" folder.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import os
+from pathlib import Path
+
+import yaml
+
+REPO_CONFIG = Path(__file__).resolve().parent.parent / "Workflow Automation" / "config.yaml"
+
+def config_path():
+    """Path of the config file in use (None if no config file is found)"""
+    candidates = [os.environ.get("PIPELINE_CONFIG"), "config.yaml", REPO_CONFIG]
+    for candidate in candidates:
+        if candidate and os.path.exists(candidate):
+            return Path(candidate)
+    return None
+
+def load_config(path=None):
+    """Parsed config as a dict (empty if no config file is found)"""
+    path = path or config_path()
+    if path is None:
+        return {}
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+def analysis_params(config=None):
+    """The parameters that affect results: category bins and sweep, significance level, validation, derived variables, dedup"""
+    config = load_config() if config is None else config
+    analysis = config.get('analysis', {})
+    return {
+        'sleep_categories': analysis.get('sleep_categories'),
+        'significance_level': analysis.get('significance_level', 0.05),
+        'sleep_category_schemes': analysis.get('sleep_category_schemes'),
+        'sleep_category_shifts': analysis.get('sleep_category_shifts'),
+        'validation_rules': (config.get('validation') or {}).get('rules'),
+        'derived_variables': config.get('derived'),
+        'dedup': config.get('dedup'),
+    }
+
+def significance_level(config=None):
+    """analysis.significance_level (0.05 when absent); the alpha of every significant flag"""
+    return analysis_params(config)['significance_level']
@@ -0,0 +1,187 @@
+"""
+Plot Data Reduction - Sleep Patterns and Academic Performance
+Fixed-size summaries that stand in for raw rows in the figures
+
+    histogram_counts   1D counts on fixed edges (figure 1)
+    Grid2D             2D counts on a fixed grid, drawn instead of a scatter
+    KLLSketch          mergeable streaming quantile sketch for box plots
+
+All three are updated chunk by chunk and have a size that does not depend
+on the number of rows, so render time and PNG size stay flat as data grows.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+
+# Rows per update when reducing large arrays
+CHUNK_ROWS = 1 << 20
+
+# Default resolutions
+HIST_BINS = 25
+GRID_BINS = (60, 50)
+SKETCH_K = 400
+
+def _finite(values):
+    x = np.asarray(values, dtype=np.float64)
+    return x[np.isfinite(x)]
+
+def _span(x):
+    """Observed (min, max) of x, or (0, 1) when nothing is observed (an empty panel)"""
+    finite = _finite(x)
+    return (float(finite.min()), float(finite.max())) if len(finite) else (0.0, 1.0)
+
+def _chunks(*arrays, size=CHUNK_ROWS):
+    n = len(arrays[0])
+    for start in range(0, n, size):
+        yield tuple(a[start:start + size] for a in arrays)
+
+def histogram_counts(values, bins=HIST_BINS):
+    """Counts and edges over the observed range, accumulated chunk by chunk"""
+    x = np.asarray(values, dtype=np.float64)
+    edges = np.linspace(*_span(x), bins + 1)
+    counts = np.zeros(bins, dtype=np.int64)
+    for (chunk,) in _chunks(x):
+        counts += np.histogram(_finite(chunk), bins=edges)[0]
+    return counts, edges
+
+class Grid2D:
+    """2D count grid on fixed edges; the bounded replacement for a scatter plot"""
+
+    def __init__(self, x_edges, y_edges):
+        self.x_edges = np.asarray(x_edges, dtype=np.float64)
+        self.y_edges = np.asarray(y_edges, dtype=np.float64)
+        self.counts = np.zeros((len(self.x_edges) - 1, len(self.y_edges) - 1), dtype=np.int64)
+
+    @classmethod
+    def from_arrays(cls, x, y, bins=GRID_BINS):
+        """Grid spanning the observed range of x and y, filled in chunks"""
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        grid = cls(np.linspace(*_span(x), bins[0] + 1), np.linspace(*_span(y), bins[1] + 1))
+        for cx, cy in _chunks(x, y):
+            grid.update(cx, cy)
+        return grid
+
+    def update(self, x, y):
+        keep = np.isfinite(x) & np.isfinite(y)
+        self.counts += np.histogram2d(x[keep], y[keep], bins=[self.x_edges, self.y_edges])[0].astype(np.int64)
+        return self
+
+    def merge(self, other):
+        if not (np.array_equal(self.x_edges, other.x_edges) and np.array_equal(self.y_edges, other.y_edges)):
+            raise ValueError("Can only merge grids with identical edges")
+        self.counts += other.counts
+        return self
+
+    def to_dict(self):
+        return {'x_edges': self.x_edges, 'y_edges': self.y_edges, 'counts': self.counts}
+
+class KLLSketch:
+    """KLL quantile sketch: retains O(k log(n/k)) weighted items, rank error about 1/k
+
+    Level h holds items of weight 2**h. When a level outgrows its capacity it
+    is sorted and every other item (random offset) is promoted to the next
+    level. Exact count, sum, min and max are tracked alongside.
+    """
+
+    def __init__(self, k=SKETCH_K, seed=0):
+        self.k = k
+        self.rng = np.random.default_rng(seed)
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    @classmethod
+    def from_values(cls, values, k=SKETCH_K, seed=0):
+        sketch = cls(k, seed)
+        x = np.asarray(values, dtype=np.float64)
+        for (chunk,) in _chunks(x):
+            sketch.update(chunk)
+        return sketch
+
+    def _capacity(self, h):
+        depth = len(self.levels) - h - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            level = self.levels[h]
+            if len(level) > self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                level = np.sort(level)
+                keep = level[:1] if len(level) % 2 else level[:0]
+                level = level[len(keep):]
+                promoted = level[self.rng.integers(2)::2]
+                self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
+                self.levels[h] = keep
+            h += 1
+
+    def update(self, values):
+        x = _finite(values)
+        if not len(x):
+            return self
+        self.count += len(x)
+        self.total += float(x.sum())
+        self.min = min(self.min, float(x.min()))
+        self.max = max(self.max, float(x.max()))
+        self.levels[0] = np.concatenate([self.levels[0], x])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for h, level in enumerate(other.levels):
+            self.levels[h] = np.concatenate([self.levels[h], level])
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _weighted(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantiles(self, qs):
+        """Approximate quantiles; 0 and 1 map to the exact min and max (NaN for an empty sketch)"""
+        if not self.count:
+            return np.full(np.shape(qs), np.nan)
+        values, weights = self._weighted()
+        cdf = np.cumsum(weights) / weights.sum()
+        out = values[np.minimum(np.searchsorted(cdf, qs, side='left'), len(values) - 1)]
+        out = np.where(np.asarray(qs) <= 0, self.min, out)
+        return np.where(np.asarray(qs) >= 1, self.max, out)
+
+    def box_stats(self, label, whis=1.5):
+        """Axes.bxp statistics; fliers are the retained items beyond the fences (bounded)
+
+        An empty sketch gives NaN statistics and no fliers.
+        """
+        if not self.count:
+            return {'label': label, 'med': np.nan, 'q1': np.nan, 'q3': np.nan,
+                    'whislo': np.nan, 'whishi': np.nan, 'mean': np.nan, 'fliers': np.empty(0)}
+        q1, med, q3 = self.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        lo_fence, hi_fence = q1 - whis * iqr, q3 + whis * iqr
+        values, _ = self._weighted()
+        values = np.concatenate([[self.min], values, [self.max]])
+        inside = values[(values >= lo_fence) & (values <= hi_fence)]
+        whislo = inside.min() if len(inside) else q1
+        whishi = inside.max() if len(inside) else q3
+        return {
+            'label': label,
+            'med': float(med), 'q1': float(q1), 'q3': float(q3),
+            'whislo': float(whislo), 'whishi': float(whishi),
+            'mean': self.total / self.count,
+            'fliers': np.unique(values[(values < whislo) | (values > whishi)]),
+        }
@@ -0,0 +1,441 @@
+"""
+Query Service - Sleep Patterns and Academic Performance
+Local HTTP/JSON service answering filtered aggregate queries on demand
+
+The integrated dataset is loaded once and kept in memory column by column
+(float64 measures with NaN for missing, integer codes for the labels).
+A query is a filter plus one aggregate:
+
+    {"filter": {"dataset_source": "Kaggle", "sleep_category": ["Poor"],
+                "age": [19, 21]},
+     "aggregate": "describe", "column": "academic_score"}
+
+    filter      label columns take a value or a list of values; numeric
+                columns take a value, [min, max] or {"min": .., "max": ..}
+                (inclusive, either end optional)
+    aggregate   describe     n, mean, std, min, max of column
+                correlation  Pearson r of x and y
+                slope        OLS y ~ x (coefficient, intercept, R², SE, p)
+
+The filter becomes one boolean mask (code lookups for labels, comparisons
+for ranges) and the aggregates come from stats_kernel / ols_engine on the
+selected rows. Answers are kept in an LRU cache keyed on the normalized
+query, so equivalent spellings share an entry.
+
+Endpoints:
+    GET  /query?aggregate=describe&column=academic_score&dataset_source=Kaggle&age=19..21
+    POST /query                    JSON body as above
+    GET  /results/<table>[/<key>]  precomputed tables from results/tables/
+    GET  /stats                    request count, p50/p99 latency, cache hits
+    GET  /health
+
+Usage:
+    python query_service.py --input data/integrated_data.parquet --port 8765
+    python query_service.py --query '{"aggregate": "slope", "x": "sleep_hours", "y": "academic_score"}'
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import numpy as np
+
+import ols_engine
+import stats_kernel
+import storage
+
+# Default locations (same as the analysis)
+INPUT_CANDIDATES = ["data/integrated_data.parquet", "data/integrated_data.csv"]
+TABLES_DIR = "results/tables"
+HOST = "127.0.0.1"
+PORT = 8765
+
+AGGREGATES = ['describe', 'correlation', 'slope']
+LABEL_COLUMNS = ['dataset_source', 'gender', 'sleep_category', 'integration_method']
+NUMERIC_COLUMNS = [
+    'record_id', 'sleep_hours', 'academic_score', 'bedtime_variability', 'cumulative_gpa', 'age',
+    'study_hours_per_day', 'attendance_percentage', 'productivity_score', 'distraction_hours'
+]
+
+# Answers kept by the LRU cache, and request latencies kept for the percentiles
+CACHE_SIZE = 4096
+LATENCY_WINDOW = 10_000
+MAX_BODY_BYTES = 1 << 20
+
+class QueryError(ValueError):
+    """A query the service cannot answer (reported as HTTP 400)"""
+
+def _number(value, name):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise QueryError(f"{name}: expected a number, got {value!r}") from None
+    if math.isnan(number):
+        raise QueryError(f"{name}: NaN is not a valid bound")
+    return number
+
+def _range(value, name):
+    """(min, max) from a number, [min, max], {"min", "max"} or the query-string form 'a..b'"""
+    if isinstance(value, str) and '..' in value:
+        value = [part or None for part in value.split('..', 1)]
+    if isinstance(value, dict):
+        unknown = set(value) - {'min', 'max'}
+        if unknown:
+            raise QueryError(f"{name}: unknown range keys {sorted(unknown)}")
+        low, high = value.get('min'), value.get('max')
+    elif isinstance(value, (list, tuple)):
+        if len(value) != 2:
+            raise QueryError(f"{name}: a range needs exactly [min, max]")
+        low, high = value
+    else:
+        low = high = value
+    low = None if low is None else _number(low, name)
+    high = None if high is None else _number(high, name)
+    if low is not None and high is not None and low > high:
+        raise QueryError(f"{name}: min {low} is above max {high}")
+    return [low, high]
+
+def normalize_query(query):
+    """Canonical form of a query dict; equivalent queries normalize identically"""
+    if not isinstance(query, dict):
+        raise QueryError("A query must be a JSON object")
+    aggregate = query.get('aggregate', 'describe')
+    if aggregate not in AGGREGATES:
+        raise QueryError(f"Unknown aggregate {aggregate!r}; expected one of {AGGREGATES}")
+    unknown = set(query) - {'aggregate', 'filter', 'column', 'x', 'y'}
+    if unknown:
+        raise QueryError(f"Unknown query fields {sorted(unknown)}")
+
+    normalized = {'aggregate': aggregate}
+    needed = ['column'] if aggregate == 'describe' else ['x', 'y']
+    for field in needed:
+        column = query.get(field)
+        if column not in NUMERIC_COLUMNS:
+            raise QueryError(f"{aggregate} needs {field!r} set to a numeric column ({', '.join(NUMERIC_COLUMNS)})")
+        normalized[field] = column
+
+    requested = query.get('filter') or {}
+    if not isinstance(requested, dict):
+        raise QueryError(f"filter must be an object of column: value pairs, got {requested!r}")
+    filters = {}
+    for column, value in sorted(requested.items()):
+        if column in LABEL_COLUMNS:
+            values = value if isinstance(value, (list, tuple)) else [value]
+            filters[column] = sorted({str(v) for v in values})
+        elif column in NUMERIC_COLUMNS:
+            filters[column] = _range(value, column)
+        else:
+            raise QueryError(f"Cannot filter on {column!r}")
+    normalized['filter'] = filters
+    return normalized
+
+def query_from_params(params):
+    """Query dict from query-string pairs; every pair but aggregate/column/x/y is a filter"""
+    query = {'filter': {}}
+    for key, value in params:
+        if key in ('aggregate', 'column', 'x', 'y'):
+            query[key] = value
+        elif key in LABEL_COLUMNS:
+            query['filter'].setdefault(key, []).extend(value.split(','))
+        else:
+            query['filter'][key] = value
+    return query
+
+def _plain(value):
+    """JSON-ready Python value (numpy scalars to floats/ints, NaN to None)"""
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_plain(v) for v in value]
+    if isinstance(value, (np.integer, int)) and not isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (np.floating, float)):
+        return None if math.isnan(value) else float(value)
+    return value
+
+class ResidentData:
+    """Integrated dataset held as numpy columns for repeated masking"""
+
+    def __init__(self, df):
+        self.rows = len(df)
+        self.numeric = {}
+        for col in NUMERIC_COLUMNS:
+            if col in df.columns:
+                self.numeric[col] = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        self.codes = {}
+        self.categories = {}
+        for col in LABEL_COLUMNS:
+            if col in df.columns:
+                dtype = storage.PANDAS_DTYPES[col]
+                values = df[col].astype('object').astype(dtype)
+                self.codes[col] = values.cat.codes.to_numpy()
+                self.categories[col] = list(dtype.categories)
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or storage.resolve_input(*INPUT_CANDIDATES)
+        columns = NUMERIC_COLUMNS + LABEL_COLUMNS
+        return cls(storage.read_integrated(path, columns=columns))
+
+    def mask(self, filters):
+        """Boolean row mask for a normalized filter"""
+        mask = np.ones(self.rows, dtype=bool)
+        for col, wanted in filters.items():
+            if col in self.codes:
+                # Lookup table over the codes; the extra last slot catches missing labels (code -1)
+                allowed = np.zeros(len(self.categories[col]) + 1, dtype=bool)
+                for value in wanted:
+                    if value in self.categories[col]:
+                        allowed[self.categories[col].index(value)] = True
+                mask &= allowed[self.codes[col]]
+            elif col in self.numeric:
+                low, high = wanted
+                values = self.numeric[col]
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+            else:
+                raise QueryError(f"Column {col!r} is not in the loaded data")
+        return mask
+
+    def column(self, name, mask):
+        if name not in self.numeric:
+            raise QueryError(f"Column {name!r} is not in the loaded data")
+        return self.numeric[name][mask]
+
+class QueryEngine:
+    """Answers normalized queries against resident data through an LRU cache"""
+
+    def __init__(self, data, cache_size=CACHE_SIZE):
+        self.data = data
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.hits = self.misses = 0
+
+    def answer(self, query):
+        """(answer dict, cache hit?) for a raw query dict"""
+        normalized = normalize_query(query)
+        key = json.dumps(normalized, sort_keys=True, separators=(',', ':'))
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return self.cache[key], True
+        self.misses += 1
+        result = {'query': normalized, 'result': _plain(self.compute(normalized))}
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result, False
+
+    def compute(self, query):
+        """Aggregate of the rows selected by the query's filter"""
+        mask = self.data.mask(query['filter'])
+        if query['aggregate'] == 'describe':
+            values = self.data.column(query['column'], mask)
+            moments = stats_kernel.Moments.from_arrays({'v': values}, np.zeros(len(values)), [None])
+            result = stats_kernel.describe(moments, 'v')
+            observed = values[~np.isnan(values)]
+            result['min'] = float(observed.min()) if len(observed) else np.nan
+            result['max'] = float(observed.max()) if len(observed) else np.nan
+            result['rows_matched'] = int(mask.sum())
+            return result
+
+        x, y = self.data.column(query['x'], mask), self.data.column(query['y'], mask)
+        complete = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[complete], y[complete]
+        moments = stats_kernel.Moments.from_arrays({'x': x, 'y': y}, np.zeros(len(x)), [None])
+        if query['aggregate'] == 'correlation':
+            return {'n': len(x), 'r': stats_kernel.pearson(moments, 'x', 'y'), 'rows_matched': int(mask.sum())}
+        if len(x) < 3 or np.ptp(x) == 0:
+            return {'n': len(x), 'coefficient': np.nan, 'rows_matched': int(mask.sum())}
+        result = ols_engine.simple(ols_engine.fit(moments, 'y', ['x']))
+        result['rows_matched'] = int(mask.sum())
+        return result
+
+    def cache_stats(self):
+        return {'entries': len(self.cache), 'capacity': self.cache_size,
+                'hits': self.hits, 'misses': self.misses}
+
+class LatencyTracker:
+    """Recent request latencies per route with p50/p99"""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}
+        self.counts = {}
+
+    def record(self, route, seconds):
+        self.samples.setdefault(route, deque(maxlen=self.window)).append(seconds)
+        self.counts[route] = self.counts.get(route, 0) + 1
+
+    def summary(self):
+        out = {}
+        for route, samples in self.samples.items():
+            ms = np.array(samples) * 1000
+            out[route] = {'requests': self.counts[route], 'window': len(ms),
+                          'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99)),
+                          'max_ms': float(ms.max())}
+        return out
+
+def read_table(tables_dir, path_parts):
+    """A precomputed table (results/tables/<name>.json), optionally one key deep"""
+    if not path_parts or not path_parts[0]:
+        names = sorted(f[:-5] for f in os.listdir(tables_dir) if f.endswith('.json'))
+        return {'tables': names}
+    name = os.path.basename(path_parts[0])
+    path = os.path.join(tables_dir, name if name.endswith('.json') else f"{name}.json")
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No table {name!r} in {tables_dir}")
+    with open(path) as f:
+        table = json.load(f)
+    for key in path_parts[1:]:
+        if not isinstance(table, dict) or key not in table:
+            raise FileNotFoundError(f"No entry {key!r} in table {name!r}")
+        table = table[key]
+    return table
+
+class QueryService:
+    """Routes HTTP requests to the query engine and the precomputed tables"""
+
+    def __init__(self, engine, tables_dir=TABLES_DIR):
+        self.engine = engine
+        self.tables_dir = tables_dir
+        self.latency = LatencyTracker()
+        self.started = time.time()
+
+    def handle(self, method, target, body):
+        """(status, payload, route) for one request"""
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.strip('/').split('/')]
+        route = parts[0] or '/'
+        try:
+            if route == 'query' and method in ('GET', 'POST'):
+                query = json.loads((body or b'{}').decode('utf-8')) if method == 'POST' \
+                    else query_from_params(parse_qsl(url.query))
+                result, hit = self.engine.answer(query)
+                return 200, dict(result, cached=hit), route
+            if route == 'results' and method == 'GET':
+                return 200, read_table(self.tables_dir, parts[1:]), route
+            if route == 'stats' and method == 'GET':
+                return 200, {'rows': self.engine.data.rows, 'uptime_seconds': time.time() - self.started,
+                             'latency': self.latency.summary(), 'cache': self.engine.cache_stats()}, route
+            if route == 'health' and method == 'GET':
+                return 200, {'status': 'ok', 'rows': self.engine.data.rows}, route
+            return 404, {'error': f"No route {method} {url.path}"}, 'other'
+        except UnicodeDecodeError:
+            return 400, {'error': 'Request body is not valid UTF-8'}, route
+        except (QueryError, json.JSONDecodeError) as e:
+            return 400, {'error': str(e)}, route
+        except (FileNotFoundError, NotADirectoryError) as e:
+            return 404, {'error': str(e)}, route
+        except Exception as e:
+            # Never drop the connection without an answer
+            return 500, {'error': f"Internal error: {type(e).__name__}: {e}"}, route
+
+    async def serve_connection(self, reader, writer):
+        """HTTP/1.1 with keep-alive; one request at a time per connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                start = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'Malformed request line'}, False)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._respond(writer, 400, {'error': 'Invalid Content-Length'}, False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': 'Request body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload, route = self.handle(method.upper(), target, body)
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and version.upper() == 'HTTP/1.1')
+                elapsed = time.perf_counter() - start
+                self.latency.record(route, elapsed)
+                await self._respond(writer, status, payload, keep_alive, elapsed)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive, elapsed=None):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                   500: 'Internal Server Error'}
+        body = json.dumps(payload, default=str).encode()
+        head = [f"HTTP/1.1 {status} {reasons.get(status, 'Error')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if elapsed is not None:
+            head.append(f"X-Elapsed-Ms: {elapsed * 1000:.3f}")
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+async def serve(service, host=HOST, port=PORT):
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"  ✓ Listening on http://{host}:{port} (GET /query, /results, /stats, /health)")
+    async with server:
+        await server.serve_forever()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve filtered aggregate queries over the integrated data")
+    parser.add_argument("--input", default=None,
+                        help="integrated dataset (default: data/integrated_data.parquet, else .csv)")
+    parser.add_argument("--tables-dir", default=TABLES_DIR, help="precomputed tables served under /results")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE, help="answers kept in the LRU cache")
+    parser.add_argument("--query", default=None, metavar="JSON",
+                        help="answer one query, print it and exit (no server)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    data = ResidentData.load(args.input)
+    engine = QueryEngine(data, cache_size=args.cache_size)
+    if args.query:
+        result, _ = engine.answer(json.loads(args.query))
+        print(json.dumps(result, indent=2))
+        return
+
+    print("=" * 70)
+    print("QUERY SERVICE: Sleep Patterns & Academic Performance")
+    print("=" * 70)
+    print(f"  ✓ {data.rows:,} rows resident ({len(data.numeric)} numeric, {len(data.codes)} label columns) "
+          f"in {time.perf_counter() - start:.2f}s")
+    try:
+        asyncio.run(serve(QueryService(engine, args.tables_dir), args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n✓ Query service stopped")
+
+if __name__ == "__main__":
+    main()
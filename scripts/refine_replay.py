@@ -0,0 +1,583 @@
+"""
+OpenRefine Replay - Sleep Patterns and Academic Performance
+Replays the OpenRefine cleaning histories as a streaming pipeline stage
+
+The cleaning step was done interactively in OpenRefine. Its exported
+operation histories (data/processed/OpenRefine Cleaning History/) are
+compiled here into vectorized pandas column transforms and replayed over
+the raw CSVs chunk by chunk, between 01_data_acquisition.py and
+02_data_integration.py:
+
+    data/raw/cmu_sleep.csv      + CMU_history-2.json            -> cleaned_cmu-sleep.csv
+    data/raw/student_habits.csv + Student_Habits_history-2.json -> cleaned_student_habits.csv
+
+Supported operations (row-based mode, optionally scoped by list, text and
+range facets): core/text-transform with the GREL expressions value, null,
+string literals and chains of toNumber/toString/trim/strip/toLowercase/
+toUppercase/toTitlecase; core/mass-edit; core/row-duplicate-removal
+(keeps the first row, across chunks); core/column-removal, column-rename
+and column-reorder. Consecutive edits of one column are fused into a
+single pass over that column, and redundant steps are dropped (repeated
+idempotent transforms, anything an unscoped null or literal overwrites).
+Unsupported operations stop compilation with the full list, so a history
+is never half-applied.
+
+Converted numbers print the way OpenRefine prints them: integer literals
+stay integers ("3"), decimals become floats ("3.0", "3.38").
+
+Usage:
+    python refine_replay.py                     # replay both datasets
+    python refine_replay.py --dataset kaggle
+    python refine_replay.py --history H.json --input raw.csv --output cleaned.csv
+    python refine_replay.py --plan              # show the compiled stages only
+    python refine_replay.py --check             # also compare with the committed cleaned CSVs
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+
+import tracing
+
+HISTORY_DIR = "data/processed/OpenRefine Cleaning History"
+# The cleaned CSVs exported from OpenRefine, which the replay must reproduce
+REFERENCE_DIR = "data/processed/Cleaned CSV Datasets"
+
+# Dataset -> (raw CSV, OpenRefine history, cleaned CSV read by 02_data_integration.py)
+RECIPES = {
+    'cmu': ("data/raw/cmu_sleep.csv", os.path.join(HISTORY_DIR, "CMU_history-2.json"),
+            "cleaned_cmu-sleep.csv"),
+    'kaggle': ("data/raw/student_habits.csv", os.path.join(HISTORY_DIR, "Student_Habits_history-2.json"),
+               "cleaned_student_habits.csv"),
+}
+
+CHUNKSIZE = 100_000
+TRACE_DIR = "results/traces"
+
+# Separator for multi-column duplicate keys (cannot occur in CSV text cells)
+KEY_SEPARATOR = '\x1f'
+BLANK_KEY = '\x00'
+
+# ---------------------------------------------------------------------------
+# Cell helpers
+# ---------------------------------------------------------------------------
+
+def _blank(series):
+    """Cells OpenRefine treats as blank (null or empty string)"""
+    return series.isna() | (series.astype(object) == '')
+
+def _text(series):
+    """Cell values as OpenRefine prints them, None for blanks"""
+    return series.astype(object).map(str).where(~_blank(series), None)
+
+def _no_errors(series):
+    return pd.Series(False, index=series.index)
+
+# ---------------------------------------------------------------------------
+# GREL functions: series -> (result, failed)
+# ---------------------------------------------------------------------------
+
+def _to_number(series):
+    """value.toNumber(); integer literals stay integers (Long), the rest become floats (Double)"""
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series, _no_errors(series)
+    text = series.astype(object).map(str).where(~_blank(series), None)
+    numbers = pd.to_numeric(text, errors='coerce')
+    failed = text.notna() & numbers.isna()
+    integral = text.str.fullmatch(r'[+-]?\d+').eq(True) & ~failed
+    decimal = numbers.notna() & ~integral
+    if not decimal.any():
+        return numbers.astype('Int64'), failed
+    if not integral.any():
+        return numbers.astype('float64'), failed
+    # Mixed column: keep each cell's own kind so it prints as OpenRefine does
+    result = numbers.astype(object)
+    result[integral] = numbers[integral].astype('int64').astype(object)
+    return result, failed
+
+def _to_string(series):
+    """value.toString()"""
+    return _text(series), _no_errors(series)
+
+def _string_method(method):
+    """GREL string function; numbers and blanks are left alone (keep-original)"""
+    def apply(series):
+        if series.dtype != object:
+            return series, _no_errors(series)
+        changed = getattr(series.str, method)()
+        return changed.where(changed.notna(), series), _no_errors(series)
+    return apply
+
+def _constant(value):
+    def apply(series):
+        return pd.Series(value, index=series.index, dtype=object), _no_errors(series)
+    return apply
+
+FUNCTIONS = {
+    'toNumber': _to_number,
+    'toString': _to_string,
+    'trim': _string_method('strip'),
+    'strip': _string_method('strip'),
+    'toLowercase': _string_method('lower'),
+    'toUppercase': _string_method('upper'),
+    'toTitlecase': _string_method('title'),
+}
+
+# Applying these twice gives the same result as applying them once
+IDEMPOTENT = set(FUNCTIONS)
+
+def parse_expression(expression):
+    """GREL expression -> list of function names, or ('constant', value)"""
+    expr = expression.strip()
+    if expr.startswith('grel:'):
+        expr = expr[5:].strip()
+    if expr == 'null':
+        return ('constant', None)
+    literal = re.fullmatch(r'"((?:[^"\\]|\\.)*)"', expr)
+    if literal:
+        return ('constant', json.loads(f'"{literal.group(1)}"'))
+    # f(value) is the same as value.f()
+    call = re.fullmatch(r'(\w+)\(value\)', expr)
+    if call:
+        expr = f"value.{call.group(1)}()"
+    if not expr.startswith('value'):
+        raise ValueError(f"unsupported GREL expression {expression!r}")
+    names = re.findall(r'\.(\w+)\(\)', expr)
+    if ''.join(f".{name}()" for name in names) != expr[len('value'):]:
+        raise ValueError(f"unsupported GREL expression {expression!r}")
+    unknown = [name for name in names if name not in FUNCTIONS]
+    if unknown:
+        raise ValueError(f"unsupported GREL function(s) {unknown} in {expression!r}")
+    return names
+
+# ---------------------------------------------------------------------------
+# Facets: (frame, current column values) -> row mask
+# ---------------------------------------------------------------------------
+
+def _facet_values(df, current, column):
+    if column == current[0]:
+        return current[1]
+    if column not in df.columns:
+        raise KeyError(f"Facet column {column!r} not in data")
+    return df[column]
+
+def compile_facet(facet):
+    """Row-mask function for one OpenRefine facet"""
+    kind = facet.get('type')
+    column = facet.get('columnName')
+    if facet.get('expression', 'value') not in ('value', 'grel:value'):
+        raise ValueError(f"unsupported facet expression {facet.get('expression')!r}")
+
+    if kind == 'list':
+        selected = {str(choice['v']['v']) for choice in facet.get('selection', [])}
+        def mask(df, current):
+            values = _facet_values(df, current, column)
+            hit = _text(values).isin(selected)
+            if facet.get('selectBlank'):
+                hit |= _blank(values)
+            return ~hit if facet.get('invert') else hit
+    elif kind == 'text':
+        query = facet.get('query') or ''
+        def mask(df, current):
+            text = _text(_facet_values(df, current, column))
+            hit = text.str.contains(query, case=facet.get('caseSensitive', False),
+                                    regex=facet.get('mode') == 'regex').eq(True)
+            return ~hit if facet.get('invert') else hit
+    elif kind == 'range':
+        def mask(df, current):
+            values = _facet_values(df, current, column)
+            numbers = pd.to_numeric(_text(values), errors='coerce')
+            blank = _blank(values)
+            numeric = numbers.notna()
+            hit = numeric & facet.get('selectNumeric', True)
+            if 'from' in facet:
+                hit &= numbers >= facet['from']
+            if 'to' in facet:
+                hit &= numbers < facet['to']
+            hit |= ~numeric & ~blank & facet.get('selectNonNumeric', True)
+            hit |= blank & facet.get('selectBlank', True)
+            return hit
+    else:
+        raise ValueError(f"unsupported facet type {kind!r}")
+    return mask
+
+def compile_engine(engine_config):
+    """Facet functions of an operation's engineConfig (all must match)"""
+    engine_config = engine_config or {}
+    facets = engine_config.get('facets', [])
+    if facets and engine_config.get('mode', 'row-based') != 'row-based':
+        raise ValueError("only row-based facets are supported")
+    return [compile_facet(facet) for facet in facets]
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+
+class Step:
+    """One compiled cell transform of a column: a GREL chain, constant or mass edit"""
+
+    def __init__(self, label, functions=None, constant=False, value=None,
+                 facets=None, on_error='keep-original', edits=None):
+        self.label = label
+        self.functions = functions or []
+        self.constant = constant
+        self.value = value
+        self.facets = facets or []
+        self.on_error = on_error
+        self.edits = edits
+
+    def overwrites(self):
+        """True if the step replaces every cell regardless of its input"""
+        return self.constant and not self.facets
+
+    def same_transform(self, other):
+        """True if other is the same idempotent transform, so one of them can go"""
+        return (not self.facets and not other.facets and self.on_error == other.on_error
+                and self.functions and self.functions == other.functions
+                and all(name in IDEMPOTENT for name in self.functions))
+
+    def apply(self, series, df, column):
+        original = series
+        if self.edits is not None:
+            result, failed = self._mass_edit(series)
+        elif self.constant:
+            result, failed = _constant(self.value)(series)
+        else:
+            result, failed = series, _no_errors(series)
+            for name in self.functions:
+                result, step_failed = FUNCTIONS[name](result)
+                failed = failed | step_failed
+        if failed.any():
+            fallback = original if self.on_error == 'keep-original' else None
+            result = result.astype(object).where(~failed, fallback)
+        if self.facets:
+            mask = pd.Series(True, index=series.index)
+            for facet in self.facets:
+                mask &= facet(df, (column, original))
+            if not mask.all():
+                result = result.astype(object).where(mask, original.astype(object))
+        return result, int(failed.sum()) if self.on_error == 'keep-original' else 0
+
+    def _mass_edit(self, series):
+        mapping, blank_to = self.edits
+        text = _text(series)
+        hit = text.isin(list(mapping))
+        blank = _blank(series) if blank_to is not None else None
+        if not hit.any() and (blank is None or not blank.any()):
+            return series, _no_errors(series)
+        result = series.astype(object).copy()
+        result[hit] = text[hit].map(mapping)
+        if blank is not None:
+            result[blank] = blank_to
+        return result, _no_errors(series)
+
+class ColumnProgram:
+    """Fused edits of one column, applied in a single pass"""
+
+    def __init__(self, column, steps, operations=1):
+        self.column = column
+        self.steps = steps
+        self.operations = operations
+        self.errors = 0
+
+    def fuse(self, other):
+        self.steps.extend(other.steps)
+        self.operations += other.operations
+
+    def simplify(self):
+        """Drop steps whose effect is overwritten or repeated"""
+        steps = []
+        for step in self.steps:
+            if step.overwrites():
+                steps = []
+            elif steps and step.same_transform(steps[-1]):
+                continue
+            steps.append(step)
+        self.steps = steps
+
+    def run(self, df):
+        series = df[self.column]
+        for step in self.steps:
+            series, errors = step.apply(series, df, self.column)
+            self.errors += errors
+        df[self.column] = series
+        return df
+
+    def describe(self):
+        labels = ' -> '.join(step.label for step in self.steps) or '(no-op)'
+        fused = f" [{self.operations} ops fused]" if self.operations > 1 else ""
+        return f"column {self.column}: {labels}{fused}"
+
+class RemoveDuplicates:
+    """core/row-duplicate-removal; remembers keys across chunks"""
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+        self.seen = set()
+        self.removed = 0
+
+    def run(self, df):
+        parts = [_text(df[col]).fillna(BLANK_KEY) for col in self.criteria]
+        keys = parts[0].str.cat(parts[1:], sep=KEY_SEPARATOR) if len(parts) > 1 else parts[0]
+        drop = keys.duplicated() | keys.isin(self.seen)
+        self.seen.update(keys[~drop])
+        if not drop.any():
+            return df
+        self.removed += int(drop.sum())
+        return df[~drop.to_numpy()].copy()
+
+    def describe(self):
+        return f"remove duplicate rows by {', '.join(self.criteria)}"
+
+class ColumnEdit:
+    """Column removal, rename or reorder"""
+
+    def __init__(self, kind, **params):
+        self.kind = kind
+        self.params = params
+
+    def run(self, df):
+        if self.kind == 'remove':
+            return df.drop(columns=[self.params['column']])
+        if self.kind == 'rename':
+            return df.rename(columns={self.params['old']: self.params['new']})
+        return df[self.params['columns']]
+
+    def describe(self):
+        if self.kind == 'remove':
+            return f"remove column {self.params['column']}"
+        if self.kind == 'rename':
+            return f"rename column {self.params['old']} -> {self.params['new']}"
+        return f"reorder columns ({len(self.params['columns'])} kept)"
+
+# ---------------------------------------------------------------------------
+# Compilation
+# ---------------------------------------------------------------------------
+
+def compile_operation(op):
+    """Compile one history entry into a stage (ValueError if unsupported)"""
+    name = op.get('op')
+    if name == 'core/text-transform':
+        if op.get('repeat'):
+            raise ValueError("repeat-until-unchanged transforms are not supported")
+        on_error = op.get('onError', 'keep-original')
+        if on_error not in ('keep-original', 'set-to-blank', 'store-error'):
+            raise ValueError(f"unsupported onError {on_error!r}")
+        parsed = parse_expression(op['expression'])
+        facets = compile_engine(op.get('engineConfig'))
+        # store-error would keep an error object in the cell; a blank is the closest CSV value
+        on_error = 'keep-original' if on_error == 'keep-original' else 'set-to-blank'
+        if isinstance(parsed, tuple):
+            step = Step(op['expression'], constant=True, value=parsed[1], facets=facets, on_error=on_error)
+        else:
+            step = Step(op['expression'], functions=parsed, facets=facets, on_error=on_error)
+        return ColumnProgram(op['columnName'], [step])
+
+    if name == 'core/mass-edit':
+        if op.get('expression', 'value') not in ('value', 'grel:value'):
+            raise ValueError(f"unsupported mass-edit expression {op.get('expression')!r}")
+        mapping, blank_to = {}, None
+        for edit in op.get('edits', []):
+            if edit.get('fromError'):
+                raise ValueError("mass edits of error cells are not supported")
+            for value in edit.get('from', []):
+                mapping[str(value)] = edit['to']
+            if edit.get('fromBlank'):
+                blank_to = edit['to']
+        label = f"mass-edit({len(mapping) + (blank_to is not None)} values)"
+        step = Step(label, edits=(mapping, blank_to), facets=compile_engine(op.get('engineConfig')))
+        return ColumnProgram(op['columnName'], [step])
+
+    if name == 'core/row-duplicate-removal':
+        if compile_engine(op.get('engineConfig')):
+            raise ValueError("faceted duplicate removal is not supported")
+        return RemoveDuplicates(list(op['criteria']))
+    if name == 'core/column-removal':
+        return ColumnEdit('remove', column=op['columnName'])
+    if name == 'core/column-rename':
+        return ColumnEdit('rename', old=op['oldColumnName'], new=op['newColumnName'])
+    if name == 'core/column-reorder':
+        return ColumnEdit('reorder', columns=list(op['columnNames']))
+    raise ValueError("operation not supported")
+
+def compile_history(operations):
+    """Compile an OpenRefine operation history into a list of stages
+
+    Consecutive column edits of the same column are fused into one
+    ColumnProgram. Raises ValueError listing every unsupported operation.
+    """
+    stages, unsupported = [], []
+    for i, op in enumerate(operations, 1):
+        try:
+            stage = compile_operation(op)
+        except ValueError as exc:
+            unsupported.append(f"#{i} {op.get('op')}: {exc} ({op.get('description', '')})")
+            continue
+        last = stages[-1] if stages else None
+        if (isinstance(stage, ColumnProgram) and isinstance(last, ColumnProgram)
+                and last.column == stage.column):
+            last.fuse(stage)
+        else:
+            stages.append(stage)
+    if unsupported:
+        raise ValueError("Unsupported OpenRefine operations:\n  " + "\n  ".join(unsupported))
+    for stage in stages:
+        if isinstance(stage, ColumnProgram):
+            stage.simplify()
+    return stages
+
+def load_history(path):
+    """Operation list of an exported OpenRefine history (list or {'entries': ...})"""
+    with open(path) as f:
+        history = json.load(f)
+    if isinstance(history, dict):
+        history = [entry.get('operation', entry) for entry in history.get('entries', [])]
+    return history
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+def _trim(chunk):
+    """Strip every cell the way OpenRefine's import does; whitespace-only cells become blanks"""
+    for col in chunk.columns:
+        values = chunk[col].str.strip()
+        chunk[col] = values.where(values != '')
+    return chunk
+
+def read_raw(path, chunksize=CHUNKSIZE):
+    """Raw CSV in chunks, every cell as trimmed text (blanks as missing), like an OpenRefine import"""
+    reader = pd.read_csv(path, dtype=str, keep_default_na=False, na_values=[''], chunksize=chunksize)
+    return (_trim(chunk) for chunk in reader)
+
+def run_stages(stages, df):
+    """Apply compiled stages to one chunk"""
+    for stage in stages:
+        df = stage.run(df)
+    return df
+
+def replay(history_path, input_path, output_path, chunksize=CHUNKSIZE):
+    """Replay a history over a raw CSV, streaming it to output_path; returns a summary dict"""
+    operations = load_history(history_path)
+    stages = compile_history(operations)
+    tmp_path = f"{output_path}.tmp"
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    rows_in = rows_out = 0
+    with open(tmp_path, 'w', newline='') as out:
+        for i, chunk in enumerate(read_raw(input_path, chunksize)):
+            rows_in += len(chunk)
+            chunk = run_stages(stages, chunk)
+            rows_out += len(chunk)
+            chunk.to_csv(out, header=(i == 0), index=False)
+    os.replace(tmp_path, output_path)
+    return {
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'duplicates_removed': sum(s.removed for s in stages if isinstance(s, RemoveDuplicates)),
+        'cells_kept_on_error': {s.column: s.errors for s in stages
+                                if isinstance(s, ColumnProgram) and s.errors},
+        'operations': len(operations),
+        'stages': len(stages),
+    }
+
+def compare_csv(path, reference_path):
+    """[(row, column, replayed, reference)] for every cell that differs (shape changes included)"""
+    ours = pd.read_csv(path, dtype=str, keep_default_na=False)
+    theirs = pd.read_csv(reference_path, dtype=str, keep_default_na=False)
+    if list(ours.columns) != list(theirs.columns) or len(ours) != len(theirs):
+        return [(None, None, f"{len(ours)} rows x {list(ours.columns)}",
+                 f"{len(theirs)} rows x {list(theirs.columns)}")]
+    diff = ours.ne(theirs)
+    return [(int(row), col, ours.at[row, col], theirs.at[row, col])
+            for col in ours.columns for row in ours.index[diff[col].to_numpy()]]
+
+def print_plan(history_path):
+    operations = load_history(history_path)
+    stages = compile_history(operations)
+    print(f"  {os.path.basename(history_path)}: {len(operations)} operations -> {len(stages)} stages")
+    for stage in stages:
+        print(f"    - {stage.describe()}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay OpenRefine cleaning histories over raw CSVs")
+    parser.add_argument("--dataset", choices=sorted(RECIPES), nargs='+', default=sorted(RECIPES),
+                        help="built-in raw/history/cleaned triples to run")
+    parser.add_argument("--history", help="OpenRefine history JSON (with --input and --output)")
+    parser.add_argument("--input", help="raw CSV")
+    parser.add_argument("--output", help="cleaned CSV to write")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="rows per chunk")
+    parser.add_argument("--plan", action="store_true", help="print the compiled stages and exit")
+    parser.add_argument("--check", action="store_true",
+                        help=f"fail unless each output equals its namesake in {REFERENCE_DIR}")
+    tracing.add_arguments(parser, TRACE_DIR)
+    args = parser.parse_args(argv)
+    if any([args.history, args.input, args.output]) and not all([args.history, args.input, args.output]):
+        parser.error("--history, --input and --output go together")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    tracing.configure("cleaning", TRACE_DIR if args.trace_dir is None else args.trace_dir,
+                      args.profile, args.profile_stages)
+    if args.history:
+        jobs = [(os.path.basename(args.history), (args.input, args.history, args.output))]
+    else:
+        jobs = [(name, RECIPES[name]) for name in args.dataset]
+
+    print("=" * 70)
+    print("OPENREFINE REPLAY: Sleep Patterns & Academic Performance")
+    print("=" * 70)
+
+    failed = False
+    for name, (input_path, history_path, output_path) in jobs:
+        print(f"\n[{name}]")
+        try:
+            if args.plan:
+                print_plan(history_path)
+                continue
+            start = time.perf_counter()
+            with tracing.span(f"replay_{name}", input=input_path) as span:
+                summary = replay(history_path, input_path, output_path, args.chunksize)
+                span.set(rows_in=summary['rows_in'], rows_out=summary['rows_out'])
+        except (OSError, ValueError, KeyError) as exc:
+            print(f"  ✗ {exc}")
+            failed = True
+            continue
+        print(f"  ✓ {summary['operations']} operations compiled into {summary['stages']} stages")
+        print(f"  ✓ {summary['rows_in']:,} rows in, {summary['rows_out']:,} rows out "
+              f"({summary['duplicates_removed']:,} duplicates removed) "
+              f"in {time.perf_counter() - start:.2f}s")
+        for column, count in summary['cells_kept_on_error'].items():
+            print(f"    - {column}: {count:,} cells kept as text (conversion failed)")
+        print(f"  ✓ Saved to: {output_path}")
+        if args.check:
+            reference = os.path.join(REFERENCE_DIR, os.path.basename(output_path))
+            differences = compare_csv(output_path, reference)
+            if differences:
+                failed = True
+                print(f"  ✗ {len(differences):,} cells differ from {reference}, e.g.:")
+                for row, column, ours, theirs in differences[:5]:
+                    print(f"    - row {row}, {column}: {ours!r} (reference {theirs!r})")
+            else:
+                print(f"  ✓ Identical to {reference}")
+
+    if not args.plan:
+        tracing.finish()
+    print("\n" + "=" * 70)
+    if failed:
+        print("✗ Replay finished with errors")
+        print("=" * 70)
+        sys.exit(1)
+    print("✓ Replay complete!")
+    print("=" * 70)
+
+if __name__ == "__main__":
+    main()
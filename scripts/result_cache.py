@@ -0,0 +1,212 @@
+"""
+Result Cache - Sleep Patterns and Academic Performance
+Content-addressed cache of pipeline outputs keyed on inputs, code and config
+
+The cache key is a SHA-256 over:
+    - the content of the cleaned input CSVs
+    - the source of every pipeline script in this folder
+    - the config.yaml parameters that change outputs
+      (pipeline_config.analysis_params: category bins and sweep,
+      significance level, validation rules, derived variables, dedup)
+Everything integration and analysis write (the workflow DAG's declared
+outputs, plus the run traces) is stored under .cache/results/<key>/.
+Re-running with identical inputs restores them instead of recomputing.
+Input hashes are memoized on (size, mtime) so an unchanged multi-GB input
+is not re-read, and a least-recently-used policy keeps the cache under a
+size limit.
+
+Usage:
+    python result_cache.py key                # print the current key
+    python result_cache.py restore            # exit 0 on hit (outputs restored), 1 on miss
+    python result_cache.py store              # save current outputs under the key
+    python result_cache.py run                # restore, or run integration + analysis and store
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import checksums
+import pipeline_config
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+CACHE_DIR = Path(".cache/results")
+MEMO_FILE = "input_hashes.json"
+META_FILE = "meta.json"
+
+# Cleaned inputs (same defaults as 02_data_integration.py)
+INPUTS = ["cleaned_cmu-sleep.csv", "cleaned_student_habits.csv"]
+
+# Written by both stages but not a task output in the workflow DAG
+TRACE_DIR = "results/traces"
+
+# Default size limit for the whole cache
+MAX_CACHE_BYTES = 500 * 1024 * 1024
+
+def declared_outputs():
+    """Files and directories produced by integration + analysis
+
+    Taken from the workflow DAG, so a new declared output is cached without
+    editing a copy here; cleaning is left out since its outputs are our inputs.
+    """
+    import workflow
+    declared = [output for task in workflow.build_tasks() if not task.name.startswith("clean_")
+                for output in task.outputs]
+    return declared + [TRACE_DIR]
+
+def input_hashes(inputs=INPUTS, cache_dir=CACHE_DIR):
+    """SHA-256 of each input, reusing the memo when size and mtime are unchanged"""
+    memo_path = Path(cache_dir) / MEMO_FILE
+    memo = json.loads(memo_path.read_text()) if memo_path.exists() else {}
+    hashes, pending = {}, []
+    for path in inputs:
+        st = os.stat(path)
+        entry = memo.get(os.path.abspath(path))
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            hashes[path] = entry['sha256']
+        else:
+            pending.append(path)
+    for path, digest in checksums.hash_files(pending).items():
+        st = os.stat(path)
+        hashes[path] = digest
+        memo[os.path.abspath(path)] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns,
+                                       'sha256': digest}
+    if pending:
+        memo_path.parent.mkdir(parents=True, exist_ok=True)
+        memo_path.write_text(json.dumps(memo, indent=2))
+    return hashes
+
+def code_hash(scripts_dir=SCRIPTS_DIR):
+    """Hash of every pipeline script, so any code change invalidates the cache"""
+    h = hashlib.sha256()
+    for path in sorted(Path(scripts_dir).rglob("*.py")):
+        h.update(path.relative_to(scripts_dir).as_posix().encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+def cache_key(inputs=INPUTS, cache_dir=CACHE_DIR):
+    """Content address for the current inputs, code and analysis parameters"""
+    payload = {
+        'inputs': input_hashes(inputs, cache_dir),
+        'code': code_hash(),
+        'params': pipeline_config.analysis_params(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+def _copy(src, dst):
+    """Copy a file or directory tree, replacing whatever is at dst"""
+    dst = Path(dst)
+    if dst.is_dir():
+        shutil.rmtree(dst)
+    elif dst.exists():
+        dst.unlink()
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if Path(src).is_dir():
+        shutil.copytree(src, dst)
+    else:
+        shutil.copy2(src, dst)
+
+def _size(path):
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+def restore(key, cache_dir=CACHE_DIR):
+    """Copy cached outputs for key into place; returns False on a miss"""
+    entry = Path(cache_dir) / key
+    meta_path = entry / META_FILE
+    if not meta_path.exists():
+        return False
+    meta = json.loads(meta_path.read_text())
+    for output in meta['outputs']:
+        _copy(entry / output, output)
+    meta['last_used'] = time.time()
+    meta_path.write_text(json.dumps(meta, indent=2))
+    return True
+
+def store(key, outputs=None, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Save existing outputs under key, then evict old entries beyond max_bytes"""
+    entry = Path(cache_dir) / key
+    tmp = entry.with_name(key + ".tmp")
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    saved = [output for output in (declared_outputs() if outputs is None else outputs) if os.path.exists(output)]
+    for output in saved:
+        _copy(output, tmp / output)
+    meta = {'outputs': saved, 'created': time.time(), 'last_used': time.time(),
+            'bytes': _size(tmp)}
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2))
+    if entry.exists():
+        shutil.rmtree(entry)
+    tmp.rename(entry)
+    evict(cache_dir, max_bytes, keep=key)
+    return meta
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, keep=None):
+    """Drop least-recently-used entries until the cache fits in max_bytes"""
+    entries = []
+    for meta_path in Path(cache_dir).glob(f"*/{META_FILE}"):
+        meta = json.loads(meta_path.read_text())
+        entries.append((meta['last_used'], meta['bytes'], meta_path.parent))
+    total = sum(size for _, size, _ in entries)
+    evicted = []
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path.name == keep:
+            continue
+        shutil.rmtree(path)
+        total -= size
+        evicted.append(path.name)
+    return evicted
+
+def run_pipeline():
+    """Run integration and analysis with the same interpreter"""
+    for script in ["02_data_integration.py", "03_analysis_visualization.py"]:
+        subprocess.run([sys.executable, str(SCRIPTS_DIR / script)], check=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Content-addressed cache for pipeline outputs")
+    parser.add_argument("command", choices=["key", "restore", "store", "run"])
+    parser.add_argument("--cache-dir", default=str(CACHE_DIR))
+    parser.add_argument("--max-mb", type=float, default=MAX_CACHE_BYTES / 1024 / 1024,
+                        help="cache size limit in MB (least recently used entries are evicted)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    start = time.perf_counter()
+    max_bytes = int(args.max_mb * 1024 * 1024)
+    key = cache_key(cache_dir=args.cache_dir)
+
+    if args.command == "key":
+        print(key)
+    elif args.command == "restore":
+        if not restore(key, args.cache_dir):
+            print(f"✗ Cache miss ({key[:12]})")
+            sys.exit(1)
+        print(f"✓ Cache hit ({key[:12]}): outputs restored in {time.perf_counter() - start:.2f}s")
+    elif args.command == "store":
+        meta = store(key, cache_dir=args.cache_dir, max_bytes=max_bytes)
+        print(f"✓ Stored {len(meta['outputs'])} outputs ({meta['bytes'] / 1024:.0f} KB) under {key[:12]}")
+    elif args.command == "run":
+        if restore(key, args.cache_dir):
+            print(f"✓ Cache hit ({key[:12]}): outputs restored in {time.perf_counter() - start:.2f}s")
+            return
+        print(f"✗ Cache miss ({key[:12]}): running pipeline")
+        run_pipeline()
+        store(key, cache_dir=args.cache_dir, max_bytes=max_bytes)
+        print(f"✓ Outputs cached under {key[:12]} ({time.perf_counter() - start:.1f}s total)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+Sleep Analysis Package - Sleep Patterns and Academic Performance
+Importable analysis pipeline (tables and figures) with lazy imports
+
+Importing the package is cheap: the stage functions are resolved on first
+use, and each stage imports its own dependencies when it runs. The stats-only
+mode never imports matplotlib or seaborn.
+
+    import sleep_analysis
+    df, cmu_df, kaggle_df = sleep_analysis.load_data("data/integrated_data.parquet")
+    tables = sleep_analysis.compute_tables(df)
+
+Command line (from the scripts folder, or with it on PYTHONPATH):
+    python -m sleep_analysis                # tables and figures
+    python -m sleep_analysis --stats-only   # tables only, no plotting imports
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+__all__ = ['MODES', 'load_data', 'compute_tables', 'write_tables', 'start_figures',
+           'finish_figures', 'import_stage_modules', 'run']
+
+def __getattr__(name):
+    if name in __all__:
+        from . import pipeline
+        return getattr(pipeline, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,41 @@
+"""
+Command Line Interface - Sleep Patterns and Academic Performance
+Argument parsing for python -m sleep_analysis and 03_analysis_visualization.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import os
+
+import tracing
+
+from . import pipeline
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyze integrated data and render figures")
+    parser.add_argument("--input", default=None,
+                        help="integrated dataset (default: data/integrated_data.parquet, else .csv)")
+    parser.add_argument("--output-dir", default=pipeline.OUTPUT_DIR, help="tables/ and figures/ go here")
+    parser.add_argument("--mode", choices=pipeline.MODES, default='full',
+                        help="full = tables and figures; stats = tables only, no plotting imports")
+    parser.add_argument("--stats-only", dest="mode", action="store_const", const='stats',
+                        help="same as --mode stats")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for figures and resampling (default: CPU count)")
+    parser.add_argument("--force-figures", action="store_true", help="re-render figures even if unchanged")
+    parser.add_argument("--bootstrap", type=int, default=None, metavar="N",
+                        help="bootstrap resamples for the regression CIs (0 = skip)")
+    parser.add_argument("--permutations", type=int, default=None, metavar="N",
+                        help="permutations for the slope tests (0 = skip)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for resampling")
+    tracing.add_arguments(parser, "<output-dir>/traces")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    trace_dir = os.path.join(args.output_dir, "traces") if args.trace_dir is None else args.trace_dir
+    tracing.configure("analysis", trace_dir, args.profile, args.profile_stages)
+    pipeline.run(args.input, args.output_dir, args.mode, args.jobs, args.force_figures,
+                 args.bootstrap, args.permutations, args.seed)
+    tracing.finish()
@@ -0,0 +1,223 @@
+"""
+Analysis Pipeline - Sleep Patterns and Academic Performance
+Loading, tables and figures as reusable stages
+
+Each stage imports what it needs when it is called:
+    load_data       storage (pyarrow)
+    compute_tables  analysis_tables, stats_kernel (numpy, scipy.special)
+    sensitivity_table  binning (numpy, scipy.special)
+    regression_with_intervals  also bootstrap.py for the CIs (process pool) and
+                    mixed_model (scipy.sparse, scipy.optimize)
+    start_figures   figures; matplotlib and seaborn load in the render workers only
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import json
+import os
+import sys
+import time
+
+MODES = ['full', 'stats']
+
+# Only the columns each part of the analysis uses are read; the Kaggle-only
+# measures come from the Kaggle partition alone
+CORE_COLUMNS = ['record_id', 'dataset_source', 'sleep_hours', 'academic_score', 'sleep_category',
+                'productivity_score', 'cohort']
+KAGGLE_COLUMNS = CORE_COLUMNS + ['study_hours_per_day', 'attendance_percentage']
+
+# Default locations
+INPUT_CANDIDATES = ["data/integrated_data.parquet", "data/integrated_data.csv"]
+OUTPUT_DIR = "results"
+
+PLOTTING_MODULES = ('matplotlib', 'seaborn')
+
+def import_stage_modules(mode='full'):
+    """Import the modules a mode needs up front; returns the seconds it took"""
+    start = time.perf_counter()
+    import storage
+    import analysis_tables
+    if mode == 'full':
+        import figures
+    return time.perf_counter() - start
+
+def plotting_loaded():
+    """True if matplotlib or seaborn has been imported in this process"""
+    return any(name in sys.modules for name in PLOTTING_MODULES)
+
+def default_input():
+    import storage
+    return storage.resolve_input(*INPUT_CANDIDATES)
+
+def load_data(input_file=None):
+    """(df, cmu_df, kaggle_df) with the columns the analysis uses, downcast on load"""
+    import compact_frame
+    input_file = input_file or default_input()
+    df = compact_frame.read_compact(input_file, columns=CORE_COLUMNS)
+    cmu_df = df[df['dataset_source'] == 'CMU'].copy()
+    kaggle_df = compact_frame.read_compact(input_file, columns=KAGGLE_COLUMNS, sources=['Kaggle'])
+    return df, cmu_df, kaggle_df
+
+def compute_tables(df, alpha=None):
+    """All result tables keyed by JSON file name, from one grouped pass over df"""
+    import analysis_tables
+    return analysis_tables.build_tables(analysis_tables.compute_moments(df), alpha)
+
+def write_tables(tables, tables_dir):
+    """Write each table to tables_dir/<name>"""
+    os.makedirs(tables_dir, exist_ok=True)
+    for name, table in tables.items():
+        with open(os.path.join(tables_dir, name), 'w') as f:
+            json.dump(table, f, indent=2)
+
+def start_figures(figures_dir, df, cmu_df, kaggle_df, jobs=None, force=False):
+    """Start rendering the figures that depend only on the data; returns the renderer"""
+    import figures
+    os.makedirs(figures_dir, exist_ok=True)
+    renderer = figures.FigureRenderer(figures_dir, jobs=jobs, force=force)
+    renderer.submit('01_sleep_distribution', figures.sleep_distribution_inputs(df))
+    renderer.submit('03_dataset_comparison', figures.dataset_comparison_inputs(cmu_df, kaggle_df))
+    return renderer
+
+def finish_figures(renderer, df, kaggle_df, tables):
+    """Submit the figures that need the tables and wait for all of them"""
+    import figures
+    model_all = tables['regression_results.json']['model_1_simple']
+    renderer.submit('02_sleep_vs_performance', figures.sleep_vs_performance_inputs(df, model_all))
+    if 'productivity_score' in kaggle_df.columns:
+        renderer.submit('04_productivity_mediation',
+                        figures.productivity_inputs(kaggle_df, tables['correlations.json']))
+    return renderer.wait()
+
+def regression_with_intervals(df, moments, resamples, permutations, seed, jobs=None):
+    """regression_results.json with bootstrap CIs, permutation p-values and the mixed model added"""
+    import analysis_tables
+    import bootstrap
+    import mixed_model
+    import tracing
+    results = analysis_tables.regression_table(moments)
+    # Fit time goes to the trace, not the table, so the table stays byte-reproducible
+    with tracing.span('mixed_model', rows_in=len(df)):
+        results['model_5_mixed'] = mixed_model.mixed_regression(df)
+    if resamples or permutations:
+        extra = bootstrap.regression_intervals(df, resamples, permutations, seed, jobs=jobs)
+        bootstrap.add_intervals(results, extra)
+    return results
+
+def sensitivity_table(df):
+    """sleep_category_sensitivity.json: every configured binning scheme in one pass over df"""
+    import binning
+    return binning.sensitivity_table(df)
+
+def run(input_file=None, output_dir=OUTPUT_DIR, mode='full', jobs=None, force_figures=False,
+        resamples=None, permutations=None, seed=None):
+    """Run the analysis with progress output; returns the tables
+
+    resamples / permutations: bootstrap and permutation counts for the
+    regression table (None = defaults in bootstrap.py, 0 = skip)
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown mode {mode!r}; expected one of {MODES}")
+    import tracing
+    with tracing.span('imports', mode=mode):
+        import_seconds = import_stage_modules(mode)
+    input_file = input_file or default_input()
+    figures_dir = os.path.join(output_dir, "figures")
+    tables_dir = os.path.join(output_dir, "tables")
+    os.makedirs(tables_dir, exist_ok=True)
+
+    print("=" * 70)
+    print("DATA ANALYSIS: Sleep Patterns & Academic Performance")
+    print("=" * 70)
+
+    # Load data
+    print("\n[1/7] Loading integrated data...")
+    with tracing.span('load_data', input=input_file) as span:
+        df, cmu_df, kaggle_df = load_data(input_file)
+        span.set(rows_out=len(df))
+    print(f"  Loaded {len(df)} students with {len(df.columns)} variables from {input_file}")
+    print(f"  CMU subset: {len(cmu_df)} students")
+    print(f"  Kaggle subset: {len(kaggle_df)} students")
+
+    # Figures 1 and 3 depend only on the data, so they render while the stats run
+    renderer = None
+    if mode == 'full':
+        with tracing.span('figures_start', rows_in=len(df)):
+            renderer = start_figures(figures_dir, df, cmu_df, kaggle_df, jobs, force_figures)
+
+    # One grouped pass: per (source, sleep_category) sufficient statistics that
+    # every table below is derived from
+    import analysis_tables
+    import bootstrap
+    with tracing.span('compute_moments', rows_in=len(df)) as span:
+        moments = analysis_tables.compute_moments(df)
+        span.set(groups=len(moments.keys))
+    resamples = bootstrap.DEFAULT_RESAMPLES if resamples is None else resamples
+    permutations = bootstrap.DEFAULT_PERMUTATIONS if permutations is None else permutations
+    seed = bootstrap.DEFAULT_SEED if seed is None else seed
+    steps = [
+        ('descriptive_statistics.json', analysis_tables.descriptive_table,
+         "Computing descriptive statistics...", "Descriptive statistics saved"),
+        ('correlations.json', analysis_tables.correlation_table,
+         "Computing correlations...", "Correlations computed and saved"),
+        ('regression_results.json',
+         lambda m: regression_with_intervals(df, m, resamples, permutations, seed, jobs),
+         "Running regression analyses...", "Regression analyses completed and saved"),
+        ('category_analysis.json', analysis_tables.category_table,
+         "Analyzing sleep categories...", "Category analysis completed and saved"),
+        ('sleep_category_sensitivity.json', lambda m: sensitivity_table(df),
+         "Sweeping sleep category schemes...", "Category sensitivity table saved"),
+    ]
+    tables = {}
+    for step, (name, build, started, done) in enumerate(steps, start=2):
+        print(f"\n[{step}/7] {started}")
+        with tracing.span(name.replace('.json', '')):
+            tables[name] = build(moments)
+            write_tables({name: tables[name]}, tables_dir)
+        print(f"  {done}")
+
+    # Visualizations
+    print("\n[7/7] Creating visualizations...")
+    if renderer is None:
+        print("  Skipped (stats-only mode)")
+    else:
+        with tracing.span('figures') as span:
+            reports = finish_figures(renderer, df, kaggle_df, tables)
+            span.set(render_seconds={name: round(r['seconds'], 3) for name, r in reports.items()})
+        for name, report in reports.items():
+            if report['status'] == 'skipped':
+                print(f"  {name}.png unchanged, skipped")
+            else:
+                print(f"  {name}.png rendered in {report['seconds']:.2f}s")
+
+    corr_all = tables['correlations.json']['sleep_hours_vs_academic_score']['overall']
+    results = tables['regression_results.json']
+    model_all = results['model_1_simple']
+    deprived = (df['sleep_category'].isin(['Poor', 'Insufficient'])).sum()
+
+    # Summary
+    print("\n" + "=" * 70)
+    print("ANALYSIS COMPLETE")
+    print("=" * 70)
+    print(f"\nKey Findings:")
+    print(f"  Overall sleep-performance correlation: r = {corr_all:.3f}")
+    print(f"  Each hour of sleep -> {model_all['coefficient']:.2f} points increase")
+    print(f"  {deprived} students ({deprived/len(df)*100:.1f}%) sleep deprived")
+
+    if 'model_4_mediation' in results:
+        print(f"  Productivity mediates {results['model_4_mediation']['proportion_mediated']*100:.1f}% of sleep effect")
+
+    if 'model_5_mixed' in results:
+        mixed = results['model_5_mixed']
+        print(f"  Within source/cohort: {mixed['coefficient']:.2f} points per hour of sleep "
+              f"(mixed model, p = {mixed['p_value']:.3g})")
+
+    print(f"\nOutputs saved to:")
+    print(f"  Tables: {tables_dir}/")
+    if renderer is not None:
+        print(f"  Figures: {figures_dir}/")
+    print(f"\nStartup ({mode} mode): stage imports {import_seconds:.2f}s, "
+          f"plotting libraries loaded in this process: {'yes' if plotting_loaded() else 'no'}")
+    print("\n" + "=" * 70)
+    return tables
@@ -0,0 +1,161 @@
+"""
+Statistics Kernel - Sleep Patterns and Academic Performance
+Single-pass grouped sufficient statistics and the estimators derived from them
+
+One pass over the rows accumulates, per group and per pair of variables
+(i, j), over the rows where both are observed:
+    n[g, i, j]  count
+    s[g, i, j]  sum of x_i
+    q[g, i, j]  sum of x_i ** 2
+    c[g, i, j]  sum of x_i * x_j
+and, over the rows where every variable is observed, the count, sums and
+cross-products of all of them (`complete`, for models with several
+regressors, whose listwise-complete sums pairwise ones cannot give).
+Descriptive statistics, Pearson r and one-way ANOVA are then closed-form
+functions of these sums (OLS too, see ols_engine.py), so subsets (a source,
+a category, the whole sample) are obtained by adding group rows instead of
+re-filtering data.
+The sums are additive, so moments from separate chunks or files can be merged.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+# scipy.special holds the F distribution tail without the import cost of scipy.stats
+from scipy import special
+
+# Rows processed per block when accumulating
+CHUNK_ROWS = 1 << 20
+
+class Moments:
+    """Pairwise-complete sufficient statistics for a set of variables, per group"""
+
+    def __init__(self, keys, variables):
+        self.keys = list(keys)
+        self.variables = list(variables)
+        self.index = {name: i for i, name in enumerate(self.variables)}
+        g, k = len(self.keys), len(self.variables)
+        self.rows = np.zeros(g, dtype=np.int64)
+        self.n = np.zeros((g, k, k))
+        self.s = np.zeros((g, k, k))
+        self.q = np.zeros((g, k, k))
+        self.c = np.zeros((g, k, k))
+        # [1, x...]'[1, x...] over complete rows: [0, 0] count, [0, 1:] sums, [1:, 1:] cross-products
+        self.complete = np.zeros((g, k + 1, k + 1))
+
+    @classmethod
+    def from_arrays(cls, columns, codes, keys, chunk_rows=CHUNK_ROWS):
+        """Accumulate moments for columns (name -> array) grouped by integer codes into keys"""
+        moments = cls(keys, list(columns))
+        moments.update(columns, codes, chunk_rows=chunk_rows)
+        return moments
+
+    def update(self, columns, codes, chunk_rows=CHUNK_ROWS):
+        """Add a batch of rows (name -> array, group code per row) to the running sums"""
+        values = np.column_stack([np.asarray(columns[name], dtype=np.float64)
+                                  for name in self.variables])
+        codes = np.asarray(codes, dtype=np.int64)
+        for start in range(0, len(codes), chunk_rows):
+            self._accumulate(values[start:start + chunk_rows], codes[start:start + chunk_rows])
+        return self
+
+    def _accumulate(self, values, codes):
+        """Sort one block by group and reduce each contiguous group slice with matrix products"""
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        observed = ~np.isnan(values[order])
+        z = np.where(observed, values[order], 0.0)
+        m = observed.astype(np.float64)
+        full = observed.all(axis=1)
+        complete = np.column_stack([full, z]) * full[:, None]
+
+        present, starts = np.unique(codes, return_index=True)
+        bounds = np.append(starts, len(codes))
+        self.rows += np.bincount(codes, minlength=len(self.keys))
+        for g, lo, hi in zip(present, bounds[:-1], bounds[1:]):
+            zg, mg = z[lo:hi], m[lo:hi]
+            self.n[g] += mg.T @ mg
+            self.s[g] += zg.T @ mg
+            self.q[g] += (zg * zg).T @ mg
+            self.c[g] += zg.T @ zg
+            self.complete[g] += complete[lo:hi].T @ complete[lo:hi]
+
+    def merge(self, other):
+        """Add another Moments object with the same keys and variables"""
+        if self.keys != other.keys or self.variables != other.variables:
+            raise ValueError("Can only merge moments with identical keys and variables")
+        self.rows += other.rows
+        self.n += other.n
+        self.s += other.s
+        self.q += other.q
+        self.c += other.c
+        self.complete += other.complete
+        return self
+
+    def total(self, select=None):
+        """Collapse the groups whose key satisfies select (all groups if None) into one group"""
+        mask = np.array([select is None or bool(select(key)) for key in self.keys], dtype=bool)
+        out = Moments([None], self.variables)
+        out.rows[0] = self.rows[mask].sum()
+        out.n[0] = self.n[mask].sum(axis=0)
+        out.s[0] = self.s[mask].sum(axis=0)
+        out.q[0] = self.q[mask].sum(axis=0)
+        out.c[0] = self.c[mask].sum(axis=0)
+        out.complete[0] = self.complete[mask].sum(axis=0)
+        return out
+
+    def pair(self, x, y, group=0):
+        """(n, sum_x, sum_y, sum_xx, sum_yy, sum_xy) over rows where both x and y are observed"""
+        i, j = self.index[x], self.index[y]
+        return (self.n[group, i, j], self.s[group, i, j], self.s[group, j, i],
+                self.q[group, i, j], self.q[group, j, i], self.c[group, i, j])
+
+def describe(m, var, group=0):
+    """Count, mean and sample standard deviation (ddof=1) of var"""
+    n, sx, _, sxx, _, _ = m.pair(var, var, group)
+    mean = sx / n if n else np.nan
+    var_ = (sxx - n * mean ** 2) / (n - 1) if n > 1 else np.nan
+    return {'n': int(n), 'mean': float(mean), 'std': float(np.sqrt(max(var_, 0.0)))}
+
+def _centered(m, x, y, group):
+    """n and centered sums of squares / cross-products for the complete pairs of x, y"""
+    n, sx, sy, sxx, syy, sxy = m.pair(x, y, group)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
+    return n, sx, sy, sxx - sx * sx / n, syy - sy * sy / n, sxy - sx * sy / n
+
+def pearson(m, x, y, group=0):
+    """Pearson correlation between x and y over pairwise-complete rows"""
+    n, _, _, cxx, cyy, cxy = _centered(m, x, y, group)
+    if n < 2 or cxx <= 0 or cyy <= 0:
+        return np.nan
+    return float(cxy / np.sqrt(cxx * cyy))
+
+def anova_from_sums(n, s, q):
+    """One-way ANOVA per row of (rows, groups) count / sum / sum-of-squares arrays
+
+    Returns F, p and eta squared per row; they are NaN where fewer than two
+    groups have data or no within-group degrees of freedom are left.
+    """
+    n, s, q = (np.asarray(a, dtype=np.float64) for a in (n, s, q))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        groups = (n > 0).sum(axis=1)
+        total = n.sum(axis=1)
+        grand_mean = s.sum(axis=1) / total
+        between = np.where(n > 0, s ** 2 / n, 0.0)
+        ss_between = between.sum(axis=1) - total * grand_mean ** 2
+        ss_within = (q - between).sum(axis=1)
+        df_between, df_within = groups - 1, total - groups
+        defined = (df_between > 0) & (df_within > 0)
+        f_stat = np.where(defined, (ss_between / df_between) / (ss_within / df_within), np.nan)
+        p_value = np.where(defined, special.fdtrc(df_between, df_within, f_stat), np.nan)
+        eta_squared = np.where(defined, ss_between / (ss_between + ss_within), np.nan)
+    return f_stat, p_value, eta_squared
+
+def anova_oneway(groups, var):
+    """One-way ANOVA on var across single-group Moments objects (empty groups are skipped)"""
+    pairs = [g.pair(var, var) for g in groups]
+    n, sx, sxx = (np.array([[pair[i] for pair in pairs]]).reshape(1, -1) for i in (0, 1, 3))
+    f_stat, p_value, _ = anova_from_sums(n, sx, sxx)
+    return {'f_statistic': float(f_stat[0]), 'p_value': float(p_value[0])}
@@ -0,0 +1,351 @@
+"""
+Sufficient-Statistics Store - Sleep Patterns and Academic Performance
+Persisted, mergeable per-partition moments so new cohorts don't force a full recompute
+
+Every result table is a function of grouped moments (stats_kernel.Moments).
+This store keeps those moments per (dataset_source, term, sleep_category)
+partition in a JSON file. A new term only needs one pass over its own rows
+(append); stores built elsewhere can be merged; the four JSON tables are then
+derived from the merged state without touching row-level data.
+
+Usage:
+    python stats_store.py append --term 2025FA --input data/integrated_data.parquet [--replace]
+    python stats_store.py merge other_store.json
+    python stats_store.py tables [--terms 2025SP 2025FA]
+    python stats_store.py verify --input data/integrated_data.parquet
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+
+import numpy as np
+from scipy import stats
+
+import analysis_tables
+import stats_kernel
+import storage
+
+STORE_PATH = "data/stats_store.json"
+# Separate from results/tables: these omit the resampling CIs and the mixed model,
+# so writing over the pipeline's tables would lose them
+TABLES_DIR = "results/store_tables"
+STORE_VERSION = 2
+
+# Tolerance for the consistency check against a full recompute
+VERIFY_RTOL = 1e-6
+
+class StatsStore:
+    """Per-(source, term, sleep_category) moments with append, merge and table derivation"""
+
+    def __init__(self, variables=analysis_tables.ANALYSIS_VARIABLES):
+        self.variables = list(variables)
+        self.partitions = {}
+
+    def _partition(self, key):
+        """Single-group Moments for key, created empty on first use"""
+        if key not in self.partitions:
+            self.partitions[key] = stats_kernel.Moments([key], self.variables)
+        return self.partitions[key]
+
+    def append(self, df, term, replace=False):
+        """Add a batch of integrated rows for one term; costs one pass over the batch only
+
+        A term already in the store is refused (its rows would be counted
+        twice) unless replace=True, which drops the stored term first.
+        """
+        if str(term) in self.terms():
+            if not replace:
+                raise ValueError(f"Term {term!r} is already in the store; re-send it with replace=True (--replace)")
+            self.drop_term(term)
+        df = df.copy()
+        for var in self.variables:
+            if var not in df.columns:
+                df[var] = np.nan
+        batch = analysis_tables.compute_moments(df, self.variables)
+        for g, (source, category) in enumerate(batch.keys):
+            if batch.rows[g] == 0:
+                continue
+            part = self._partition((source, str(term), category))
+            part.rows[0] += batch.rows[g]
+            part.n[0] += batch.n[g]
+            part.s[0] += batch.s[g]
+            part.q[0] += batch.q[g]
+            part.c[0] += batch.c[g]
+            part.complete[0] += batch.complete[g]
+        return self
+
+    def drop_term(self, term):
+        """Remove every partition of a term"""
+        for key in [key for key in self.partitions if key[1] == str(term)]:
+            del self.partitions[key]
+        return self
+
+    def merge(self, other):
+        """Fold another store's partitions into this one"""
+        if other.variables != self.variables:
+            raise ValueError("Cannot merge stores built over different variables")
+        for key, part in other.partitions.items():
+            self._partition(key).merge(part)
+        return self
+
+    def terms(self):
+        return sorted({term for _, term, _ in self.partitions})
+
+    def moments(self, terms=None):
+        """Collapse partitions (optionally only some terms) onto the analysis groups"""
+        merged = stats_kernel.Moments(analysis_tables.group_keys(), self.variables)
+        slot = {key: g for g, key in enumerate(merged.keys)}
+        for (source, term, category), part in self.partitions.items():
+            if terms is not None and term not in terms:
+                continue
+            g = slot[(source, category)]
+            merged.rows[g] += part.rows[0]
+            merged.n[g] += part.n[0]
+            merged.s[g] += part.s[0]
+            merged.q[g] += part.q[0]
+            merged.c[g] += part.c[0]
+            merged.complete[g] += part.complete[0]
+        return merged
+
+    def tables(self, terms=None, alpha=None):
+        """The four result tables derived from the stored moments"""
+        return analysis_tables.build_tables(self.moments(terms), alpha)
+
+    def to_dict(self):
+        partitions = []
+        for (source, term, category), part in sorted(self.partitions.items(), key=lambda kv: str(kv[0])):
+            partitions.append({
+                "source": source,
+                "term": term,
+                "sleep_category": category,
+                "rows": int(part.rows[0]),
+                "n": part.n[0].tolist(),
+                "s": part.s[0].tolist(),
+                "q": part.q[0].tolist(),
+                "c": part.c[0].tolist(),
+                "complete": part.complete[0].tolist(),
+            })
+        return {"version": STORE_VERSION, "variables": self.variables, "partitions": partitions}
+
+    @classmethod
+    def from_dict(cls, data):
+        # Version 1 stores have no complete-row moments; they stay unknown (NaN)
+        if data.get("version") not in (1, STORE_VERSION):
+            raise ValueError(f"Unsupported stats store version: {data.get('version')}")
+        store = cls(data["variables"])
+        for p in data["partitions"]:
+            part = store._partition((p["source"], p["term"], p["sleep_category"]))
+            part.rows[0] = p["rows"]
+            part.n[0] = np.array(p["n"])
+            part.s[0] = np.array(p["s"])
+            part.q[0] = np.array(p["q"])
+            part.c[0] = np.array(p["c"])
+            part.complete[0] = np.array(p["complete"]) if "complete" in p else np.nan
+        return store
+
+    def save(self, path=STORE_PATH):
+        """Write atomically so an interrupted append never corrupts the store"""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path=STORE_PATH):
+        """Load a store, or return an empty one if path does not exist yet"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+def full_recompute(df, alpha=None):
+    """Reference tables computed directly from rows with pandas/scipy (no moments)"""
+    if alpha is None:
+        import pipeline_config
+        alpha = pipeline_config.significance_level()
+    cmu = df[df['dataset_source'] == 'CMU']
+    kaggle = df[df['dataset_source'] == 'Kaggle']
+
+    def describe(subset):
+        return {
+            "n": int(len(subset)),
+            "sleep_mean": float(subset['sleep_hours'].mean()),
+            "sleep_std": float(subset['sleep_hours'].std()),
+            "academic_mean": float(subset['academic_score'].mean()),
+            "academic_std": float(subset['academic_score'].std())
+        }
+
+    def corr(subset, x, y):
+        return float(subset[[x, y]].astype('float64').corr().loc[x, y])
+
+    def fit(subset, y, xs):
+        data = subset[xs + [y]].astype('float64').dropna()
+        X = np.column_stack([np.ones(len(data))] + [data[x] for x in xs])
+        beta, *_ = np.linalg.lstsq(X, data[y].to_numpy(), rcond=None)
+        resid = data[y].to_numpy() - X @ beta
+        sst = ((data[y] - data[y].mean()) ** 2).sum()
+        dof = len(data) - X.shape[1]
+        se = np.sqrt(np.diag((resid ** 2).sum() / dof * np.linalg.inv(X.T @ X)))
+        p = 2 * stats.t.sf(np.abs(beta / se), dof)
+        return (beta, len(data), float(1 - (resid ** 2).sum() / sst), float(np.sqrt((resid ** 2).mean())),
+                se, p)
+
+    descriptive = {"Overall": describe(df), "CMU": describe(cmu), "Kaggle": describe(kaggle)}
+    descriptive['sleep_distribution'] = {
+        str(k): int(v) for k, v in df['sleep_category'].value_counts().items() if v > 0
+    }
+
+    correlations = {
+        "sleep_hours_vs_academic_score": {
+            "overall": corr(df, 'sleep_hours', 'academic_score'),
+            "cmu": corr(cmu, 'sleep_hours', 'academic_score'),
+            "kaggle": corr(kaggle, 'sleep_hours', 'academic_score')
+        },
+        "sleep_hours_vs_productivity": corr(kaggle, 'sleep_hours', 'productivity_score'),
+        "productivity_vs_academic_score": corr(kaggle, 'productivity_score', 'academic_score'),
+    }
+
+    regressions = {}
+    for name, subset in [('model_1_simple', df), ('model_2_cmu', cmu), ('model_3_kaggle', kaggle)]:
+        beta, n, r2, rmse, se, p = fit(subset, 'academic_score', ['sleep_hours'])
+        regressions[name] = {"n": n, "coefficient": float(beta[1]), "intercept": float(beta[0]),
+                             "r_squared": r2, "rmse": rmse, "std_error": float(se[1]),
+                             "p_value": float(p[1]), "intercept_std_error": float(se[0])}
+    beta_a, _, _, _, _, p_a = fit(kaggle, 'productivity_score', ['sleep_hours'])
+    path_a = beta_a[1]
+    beta_b, n_b, _, _, _, p_b = fit(kaggle, 'academic_score', ['sleep_hours', 'productivity_score'])
+    path_c = regressions['model_3_kaggle']['coefficient']
+    regressions['model_4_mediation'] = {
+        "n": n_b,
+        "path_a_sleep_to_productivity": float(path_a),
+        "path_b_productivity_to_academic": float(beta_b[2]),
+        "path_c_total_effect": path_c,
+        "path_c_prime_direct_effect": float(beta_b[1]),
+        "indirect_effect": float(path_a * beta_b[2]),
+        "proportion_mediated": float(path_a * beta_b[2] / path_c) if path_c != 0 else 0.0,
+        "path_a_p_value": float(p_a[1]),
+        "path_b_p_value": float(p_b[2]),
+        "path_c_prime_p_value": float(p_b[1]),
+    }
+
+    present = [cat for cat in storage.SLEEP_CATEGORIES if (df['sleep_category'] == cat).any()]
+    groups = [df.loc[df['sleep_category'] == cat, 'academic_score'].dropna() for cat in present]
+    f_stat, p_value = stats.f_oneway(*groups)
+    categories = {
+        "anova": {"f_statistic": float(f_stat), "p_value": float(p_value),
+                  "significant": bool(p_value < alpha)},
+        "by_category": {
+            cat: {"n": int(len(df[df['sleep_category'] == cat])),
+                  "academic_score_mean": float(g.mean()),
+                  "academic_score_std": float(g.std())}
+            for cat, g in zip(present, groups)
+        }
+    }
+
+    return {
+        'descriptive_statistics.json': descriptive,
+        'correlations.json': correlations,
+        'regression_results.json': regressions,
+        'category_analysis.json': categories,
+    }
+
+def compare_tables(derived, reference, rtol=VERIFY_RTOL):
+    """List (path, derived, reference) for every leaf of reference that differs"""
+    mismatches = []
+
+    def walk(a, b, path):
+        if isinstance(b, dict):
+            for key, value in b.items():
+                if not isinstance(a, dict) or key not in a:
+                    mismatches.append((f"{path}/{key}", None, value))
+                else:
+                    walk(a[key], value, f"{path}/{key}")
+        elif isinstance(b, float):
+            if not math.isclose(a, b, rel_tol=rtol, abs_tol=1e-12):
+                mismatches.append((path, a, b))
+        elif a != b:
+            mismatches.append((path, a, b))
+
+    walk(derived, reference, "")
+    return mismatches
+
+def write_tables(tables, tables_dir=TABLES_DIR):
+    os.makedirs(tables_dir, exist_ok=True)
+    for name, table in tables.items():
+        with open(os.path.join(tables_dir, name), 'w') as f:
+            json.dump(table, f, indent=2)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Incremental sufficient-statistics store")
+    parser.add_argument("--store", default=STORE_PATH, help="store file")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    append = sub.add_parser("append", help="add a batch of integrated rows for one term")
+    append.add_argument("--input", required=True, help="integrated data (.parquet/.feather/.csv)")
+    append.add_argument("--term", required=True, help="cohort/term label for this batch")
+    append.add_argument("--replace", action="store_true",
+                        help="drop the term's stored partitions first (a re-sent term)")
+
+    merge = sub.add_parser("merge", help="merge other stores into this one")
+    merge.add_argument("others", nargs="+")
+
+    tables = sub.add_parser("tables", help="derive the four JSON tables from the store")
+    tables.add_argument("--terms", nargs="*", help="restrict to these terms (default: all)")
+    tables.add_argument("--output", default=TABLES_DIR)
+    tables.add_argument("--alpha", type=float, default=None,
+                        help="significance level (default: significance_level in config.yaml)")
+
+    verify = sub.add_parser("verify", help="check the store against a full recompute")
+    verify.add_argument("--input", required=True, help="all rows the store was built from")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    store = StatsStore.load(args.store)
+
+    if args.command == "append":
+        df = storage.read_integrated(args.input, columns=['dataset_source', 'sleep_category'] + store.variables)
+        start = time.perf_counter()
+        replaced = args.replace and str(args.term) in store.terms()
+        try:
+            store.append(df, args.term, replace=args.replace)
+        except ValueError as e:
+            print(f"✗ {e}")
+            raise SystemExit(1)
+        store.save(args.store)
+        print(f"✓ {'Replaced' if replaced else 'Appended'} {len(df)} rows as term {args.term!r} "
+              f"({(time.perf_counter() - start) * 1000:.1f} ms) → {args.store}")
+
+    elif args.command == "merge":
+        for other in args.others:
+            store.merge(StatsStore.load(other))
+        store.save(args.store)
+        print(f"✓ Merged {len(args.others)} store(s); {len(store.partitions)} partitions → {args.store}")
+
+    elif args.command == "tables":
+        start = time.perf_counter()
+        tables = store.tables(terms=args.terms, alpha=args.alpha)
+        elapsed = (time.perf_counter() - start) * 1000
+        write_tables(tables, args.output)
+        print(f"✓ Derived {len(tables)} tables from {len(store.partitions)} partitions "
+              f"in {elapsed:.1f} ms → {args.output}/")
+
+    elif args.command == "verify":
+        df = storage.read_integrated(args.input)
+        mismatches = compare_tables(store.tables(), full_recompute(df))
+        if mismatches:
+            print(f"✗ Store disagrees with full recompute in {len(mismatches)} value(s):")
+            for path, derived, reference in mismatches:
+                print(f"  {path}: store={derived} full={reference}")
+            raise SystemExit(1)
+        print(f"✓ Store matches full recompute over {len(df)} rows (rtol={VERIFY_RTOL})")
+
+if __name__ == "__main__":
+    main()
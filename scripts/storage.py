@@ -0,0 +1,330 @@
+"""
+Columnar Storage Backend - Sleep Patterns and Academic Performance
+Typed Parquet/Feather storage for the integrated dataset
+
+The integrated dataset is written as a hive-partitioned Arrow dataset
+(one directory per dataset_source) with a fixed schema: categorical labels,
+float32 measures. Readers can ask for a subset of columns and sources so
+only those column chunks and partitions are touched. CSV stays available
+as an export format and is read back through the same schema.
+
+Two on-disk layouts share that schema:
+
+    split (default)  core/dataset_source=<source>/   columns every source has
+                     extensions/<source>/           record_id + that source's
+                                                     own columns
+    wide             dataset_source=<source>/        every column, padded with
+                                                     nulls for the other sources
+
+read_integrated returns the same wide frame for both; with the split layout
+an extension is only opened when one of its columns is requested, and a new
+source adds an extension table instead of widening every row.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+# Fixed label vocabularies
+SOURCES = ['CMU', 'Kaggle']
+SLEEP_CATEGORIES = ['Poor', 'Insufficient', 'Adequate', 'Optimal']
+GENDERS = ['Female', 'Male', 'Other']
+INTEGRATION_METHODS = ['append']
+
+# Vocabularies that unseen labels extend (appended, sorted); in the others
+# (sources, ordered sleep categories) an unseen label is an error
+OPEN_VOCABULARIES = {'gender', 'integration_method'}
+
+# Column -> pandas dtype for the integrated schema
+PANDAS_DTYPES = {
+    'record_id': 'int64',
+    'student_id': 'string',
+    'dataset_source': pd.CategoricalDtype(SOURCES),
+    'sleep_hours': 'float32',
+    'academic_score': 'float32',
+    'gender': pd.CategoricalDtype(GENDERS),
+    'sleep_category': pd.CategoricalDtype(SLEEP_CATEGORIES, ordered=True),
+    'integration_method': pd.CategoricalDtype(INTEGRATION_METHODS),
+    'bedtime_variability': 'float32',
+    'cumulative_gpa': 'float32',
+    'cohort': 'string',
+    'age': 'float32',
+    'study_hours_per_day': 'float32',
+    'attendance_percentage': 'float32',
+    'productivity_score': 'float32',
+    'distraction_hours': 'float32',
+}
+
+# Split layout: columns every source has, and each source's own columns
+CORE_COLUMNS = [
+    'record_id', 'student_id', 'dataset_source', 'sleep_hours', 'academic_score',
+    'gender', 'sleep_category', 'integration_method'
+]
+SOURCE_EXTENSIONS = {
+    'CMU': ['bedtime_variability', 'cumulative_gpa', 'cohort'],
+    'Kaggle': ['age', 'study_hours_per_day', 'attendance_percentage',
+               'productivity_score', 'distraction_hours'],
+}
+LAYOUTS = ['split', 'wide']
+DEFAULT_LAYOUT = 'split'
+CORE_DIR = 'core'
+EXTENSIONS_DIR = 'extensions'
+
+_LABEL = pa.dictionary(pa.int8(), pa.string())
+_ORDERED_LABEL = pa.dictionary(pa.int8(), pa.string(), ordered=True)
+
+ARROW_SCHEMA = pa.schema([
+    ('record_id', pa.int64()),
+    ('student_id', pa.string()),
+    ('dataset_source', _LABEL),
+    ('sleep_hours', pa.float32()),
+    ('academic_score', pa.float32()),
+    ('gender', _LABEL),
+    ('sleep_category', _ORDERED_LABEL),
+    ('integration_method', _LABEL),
+    ('bedtime_variability', pa.float32()),
+    ('cumulative_gpa', pa.float32()),
+    ('cohort', pa.string()),
+    ('age', pa.float32()),
+    ('study_hours_per_day', pa.float32()),
+    ('attendance_percentage', pa.float32()),
+    ('productivity_score', pa.float32()),
+    ('distraction_hours', pa.float32()),
+])
+
+PARTITION_COLUMN = 'dataset_source'
+PARTITIONING = ds.partitioning(
+    pa.schema([(PARTITION_COLUMN, pa.string())]), flavor='hive'
+)
+
+CORE_SCHEMA = pa.schema([ARROW_SCHEMA.field(name) for name in CORE_COLUMNS])
+
+# Storage format by file suffix
+FORMATS = {'.parquet': 'parquet', '.feather': 'feather', '.csv': 'csv'}
+
+def storage_format(path):
+    """Infer the storage format ('parquet', 'feather' or 'csv') from a path suffix"""
+    suffix = os.path.splitext(str(path).rstrip('/'))[1].lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unknown storage format for {path!r} (expected one of {sorted(FORMATS)})")
+    return FORMATS[suffix]
+
+def storage_layout(path):
+    """'split' if path holds a core table plus extensions, else 'wide'"""
+    return 'split' if os.path.isdir(os.path.join(str(path), CORE_DIR)) else 'wide'
+
+def extension_schema(source):
+    """Arrow schema of one source's extension table (record_id + its own columns)"""
+    return pa.schema([ARROW_SCHEMA.field(name) for name in ['record_id'] + SOURCE_EXTENSIONS[source]])
+
+def as_categorical(col, values):
+    """values as col's categorical dtype, never turning a label into a missing value
+
+    Unknown labels extend an open vocabulary and raise ValueError for a closed one.
+    """
+    dtype = PANDAS_DTYPES[col]
+    values = values.astype('object')
+    out = values.astype(dtype)
+    lost = out.isna() & values.notna()
+    if not lost.any():
+        return out
+    unknown = sorted({str(v) for v in values[lost]})
+    if col not in OPEN_VOCABULARIES:
+        raise ValueError(f"{col} has labels outside the schema vocabulary {list(dtype.categories)}: {unknown}")
+    values = values.copy()
+    values[lost] = values[lost].astype(str)
+    return values.astype(pd.CategoricalDtype(list(dtype.categories) + unknown, ordered=dtype.ordered))
+
+def apply_schema(df):
+    """Cast an integrated frame to the fixed schema (columns not present are skipped)"""
+    out = {}
+    for col in df.columns:
+        dtype = PANDAS_DTYPES.get(col)
+        if dtype is None:
+            out[col] = df[col]
+        elif dtype == 'float32':
+            out[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+        elif isinstance(dtype, pd.CategoricalDtype):
+            out[col] = as_categorical(col, df[col])
+        else:
+            out[col] = df[col].astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+def _to_arrow(df):
+    """Convert an integrated frame to an Arrow table with the fixed schema"""
+    return pa.Table.from_pandas(apply_schema(df), schema=ARROW_SCHEMA, preserve_index=False)
+
+def _write_dataset(data, path, fmt, schema=None, partitioning=PARTITIONING, part=None):
+    """Write a table or record-batch iterator as a (partitioned) dataset
+
+    part numbers the files of one write so several writes can share a directory.
+    """
+    ds.write_dataset(
+        data, path,
+        schema=schema,
+        format='ipc' if fmt == 'feather' else fmt,
+        partitioning=partitioning,
+        basename_template=None if part is None else f"part-{part}-{{i}}.{fmt}",
+        existing_data_behavior='delete_matching' if part is None else 'overwrite_or_ignore',
+    )
+
+def _clear(path):
+    """Remove a previous dataset at path so layouts never mix"""
+    if os.path.isdir(str(path)):
+        shutil.rmtree(str(path))
+
+def _write_split(df, path, fmt, part=None):
+    """Write one frame as core rows plus per-source extension rows"""
+    df = apply_schema(df)
+    core = pa.Table.from_pandas(df[CORE_COLUMNS], schema=CORE_SCHEMA, preserve_index=False)
+    _write_dataset(core, os.path.join(str(path), CORE_DIR), fmt, part=part)
+    for source, columns in SOURCE_EXTENSIONS.items():
+        rows = df.loc[df[PARTITION_COLUMN] == source, ['record_id'] + columns]
+        if len(rows) == 0:
+            continue
+        table = pa.Table.from_pandas(rows, schema=extension_schema(source), preserve_index=False)
+        _write_dataset(table, os.path.join(str(path), EXTENSIONS_DIR, source), fmt,
+                       partitioning=None, part=part)
+
+def reset_dataset(path):
+    """Start an empty dataset at path for write_part() calls from several writers"""
+    storage_format(path)
+    os.makedirs(os.path.dirname(str(path).rstrip('/')) or ".", exist_ok=True)
+    _clear(path)
+
+def write_part(df, path, part, layout=DEFAULT_LAYOUT):
+    """Add one numbered part to a dataset started with reset_dataset()
+
+    Parts never touch each other's files, so separate processes may write
+    them concurrently.
+    """
+    fmt = storage_format(path)
+    if fmt == 'csv':
+        raise ValueError(f"Partitioned writes need a columnar dataset, not {path!r}")
+    if layout == 'split':
+        _write_split(df, path, fmt, part=part)
+    else:
+        _write_dataset(_to_arrow(df), path, fmt, part=part)
+
+def write_integrated(df, path, layout=DEFAULT_LAYOUT):
+    """Write the integrated frame to path; the format follows the suffix"""
+    fmt = storage_format(path)
+    os.makedirs(os.path.dirname(str(path).rstrip('/')) or ".", exist_ok=True)
+    if fmt == 'csv':
+        df.to_csv(path, index=False)
+        return
+    _clear(path)
+    if layout == 'split':
+        _write_split(df, path, fmt)
+    else:
+        _write_dataset(_to_arrow(df), path, fmt)
+
+def convert_csv(csv_path, path, chunksize=100_000, layout=DEFAULT_LAYOUT):
+    """Convert an integrated CSV to a columnar dataset without loading it whole"""
+    fmt = storage_format(path)
+    _clear(path)
+    chunks = pd.read_csv(csv_path, chunksize=chunksize)
+    if layout == 'split':
+        for part, chunk in enumerate(chunks):
+            _write_split(chunk, path, fmt, part=part)
+        return
+    batches = (
+        batch
+        for chunk in chunks
+        for batch in _to_arrow(chunk).to_batches()
+    )
+    _write_dataset(batches, path, fmt, schema=ARROW_SCHEMA)
+
+def read_integrated(path, columns=None, sources=None):
+    """Read the integrated dataset with the fixed schema
+
+    columns: subset of columns to load (None = all)
+    sources: subset of dataset_source partitions to load (None = all)
+    Only the requested columns and partitions are read from columnar storage;
+    with the split layout an extension table is opened only for its columns.
+    """
+    fmt = storage_format(path)
+
+    if fmt == 'csv':
+        usecols = None
+        if columns is not None:
+            usecols = list(dict.fromkeys(list(columns) + ([PARTITION_COLUMN] if sources else [])))
+        df = apply_schema(pd.read_csv(path, usecols=usecols))
+        if sources is not None:
+            df = df[df[PARTITION_COLUMN].isin(sources)].reset_index(drop=True)
+            if columns is not None and PARTITION_COLUMN not in columns:
+                df = df.drop(columns=PARTITION_COLUMN)
+        return df
+
+    if columns is None:
+        columns = ARROW_SCHEMA.names
+    if storage_layout(path) == 'split':
+        return apply_schema(_read_split(path, fmt, list(columns), sources))
+
+    dataset = ds.dataset(path, format='ipc' if fmt == 'feather' else fmt,
+                         partitioning=PARTITIONING)
+    row_filter = None
+    if sources is not None:
+        row_filter = ds.field(PARTITION_COLUMN).isin(list(sources))
+    table = dataset.to_table(columns=list(columns), filter=row_filter)
+    return apply_schema(table.to_pandas())
+
+def _read_split(path, fmt, columns, sources):
+    """Core rows joined with the extensions that hold any requested column"""
+    fmt = 'ipc' if fmt == 'feather' else fmt
+    wanted = {
+        source: [col for col in own if col in columns]
+        for source, own in SOURCE_EXTENSIONS.items()
+        if sources is None or source in sources
+    }
+    wanted = {source: cols for source, cols in wanted.items()
+              if cols and os.path.isdir(os.path.join(str(path), EXTENSIONS_DIR, source))}
+
+    core_columns = [col for col in columns if col in CORE_COLUMNS]
+    if wanted and 'record_id' not in core_columns:
+        core_columns.append('record_id')
+    row_filter = None
+    if sources is not None:
+        row_filter = ds.field(PARTITION_COLUMN).isin(list(sources))
+    core = ds.dataset(os.path.join(str(path), CORE_DIR), format=fmt, partitioning=PARTITIONING)
+    df = core.to_table(columns=core_columns, filter=row_filter).to_pandas()
+
+    for source, cols in wanted.items():
+        extension = ds.dataset(os.path.join(str(path), EXTENSIONS_DIR, source), format=fmt)
+        rows = extension.to_table(columns=['record_id'] + cols).to_pandas().set_index('record_id')
+        aligned = rows.reindex(df['record_id'].to_numpy())
+        for col in cols:
+            values = pd.Series(aligned[col].to_numpy(), index=df.index)
+            df[col] = values if col not in df.columns else df[col].fillna(values)
+
+    # Columns no selected source carries come back empty, as in the wide layout
+    for col in columns:
+        if col not in df.columns:
+            df[col] = np.nan
+    return df[columns]
+
+def _modified(path):
+    """Modification time of a file, or of the newest file in a dataset directory"""
+    if os.path.isdir(path):
+        return max((os.path.getmtime(os.path.join(root, name))
+                    for root, _, names in os.walk(path) for name in names),
+                   default=os.path.getmtime(path))
+    return os.path.getmtime(path)
+
+def resolve_input(*candidates):
+    """Return the most recently written existing path among candidates
+
+    A CSV regenerated or edited after the columnar copy wins over the stale
+    copy; on a tie the earlier candidate (columnar first, then CSV) is used.
+    """
+    existing = [candidate for candidate in candidates if os.path.exists(candidate)]
+    if not existing:
+        raise FileNotFoundError(f"None of the integrated data paths exist: {', '.join(candidates)}")
+    return max(existing, key=_modified)
@@ -0,0 +1,150 @@
+"""
+Synthetic Data Generator - Sleep Patterns and Academic Performance
+Schema-faithful CMU-style and Kaggle-style inputs at any scale
+
+Columns, dtypes, category levels and missing-value rates follow the cleaned
+inputs (cleaned_cmu-sleep.csv, cleaned_student_habits.csv); marginal
+distributions and the main relationships (sleep -> GPA, habits -> exam
+score) are fitted to them approximately. Files are written in chunks, so
+10^8-row inputs never need to fit in memory.
+
+Usage:
+    python synthetic_data.py --rows 1000000 --out-dir bench_data
+    python synthetic_data.py --rows 1e8 --out-dir /scratch/bench --seed 7
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Rows generated and written per chunk
+CHUNK_ROWS = 1_000_000
+
+CMU_FILE = "cleaned_cmu-sleep.csv"
+KAGGLE_FILE = "cleaned_student_habits.csv"
+
+CMU_COHORTS = {'nh': 147, 'lac1': 131, 'uw2': 115, 'uw1': 99, 'lac2': 55}
+CMU_STUDY = {'nh': 4, 'lac1': 5, 'uw2': 3, 'uw1': 2, 'lac2': 1}
+CMU_FIRSTGEN = {'0': 458, '1': 86, 'Unknown': 3}
+
+KAGGLE_LEVELS = {
+    'gender': {'Female': 481, 'Male': 477, 'Other': 42},
+    'part_time_job': {'No': 785, 'Yes': 215},
+    'diet_quality': {'Fair': 437, 'Good': 378, 'Poor': 185},
+    'parental_education_level': {'High School': 392, 'Bachelor': 350, 'Master': 167, None: 91},
+    'internet_quality': {'Good': 447, 'Average': 391, 'Poor': 162},
+    'extracurricular_participation': {'No': 682, 'Yes': 318},
+}
+
+def _choice(rng, counts, n):
+    """Draw n labels with the observed frequencies"""
+    labels = list(counts)
+    p = np.array(list(counts.values()), dtype=np.float64)
+    return np.array(labels, dtype=object)[rng.choice(len(labels), size=n, p=p / p.sum())]
+
+def _with_missing(rng, values, rate):
+    values = values.astype(np.float64)
+    values[rng.random(len(values)) < rate] = np.nan
+    return values
+
+def generate_cmu(n, seed=0, start=0):
+    """CMU Sleep rows with the cleaned file's columns; subject_id starts after start"""
+    rng = np.random.default_rng([seed, 1, start])
+    cohort = _choice(rng, CMU_COHORTS, n)
+    total_sleep = np.clip(rng.normal(397, 51, n), 200, 600)
+    # term GPA rises with sleep (r about 0.16); cumulative GPA tracks term GPA
+    term_gpa = np.clip(3.46 + 0.0015 * (total_sleep - 397) + rng.normal(0, 0.47, n), 1.0, 4.0)
+    cum_gpa = np.clip(3.49 + 0.55 * (term_gpa - 3.46) + rng.normal(0, 0.33, n), 1.0, 4.0)
+    units_missing = rng.random(n) < 0.27
+    term_units = np.where(rng.random(n) < 0.6, rng.integers(12, 20, n), rng.integers(40, 74, n)).astype(np.float64)
+    z_units = rng.normal(0, 0.99, n)
+    term_units[units_missing] = np.nan
+    z_units[units_missing] = np.nan
+    return pd.DataFrame({
+        'subject_id': np.arange(start + 1, start + n + 1),
+        'study': pd.Series(cohort).map(CMU_STUDY).to_numpy(),
+        'cohort': cohort,
+        'demo_race': _with_missing(rng, (rng.random(n) < 0.81).astype(int), 0.002),
+        'demo_gender': _with_missing(rng, (rng.random(n) < 0.587).astype(int), 0.004),
+        'demo_firstgen': _choice(rng, CMU_FIRSTGEN, n),
+        'bedtime_mssd': rng.lognormal(-1.9, 1.1, n),
+        'TotalSleepTime': total_sleep,
+        'midpoint_sleep': np.clip(rng.normal(398, 71, n), 240, 730),
+        'frac_nights_with_data': np.clip(1.05 - rng.gamma(1.2, 0.16, n), 0.2, 1.0),
+        'daytime_sleep': rng.gamma(2.6, 15.5, n),
+        'cum_gpa': np.round(cum_gpa, 2),
+        'term_gpa': np.round(term_gpa, 2),
+        'term_units': term_units,
+        'Zterm_units_ZofZ': z_units,
+    })
+
+def generate_kaggle(n, seed=0, start=0):
+    """Kaggle Student Habits rows with the cleaned file's columns; student_id starts after start"""
+    rng = np.random.default_rng([seed, 2, start])
+    study = np.round(np.clip(rng.normal(3.55, 1.47, n), 0, 8.3), 1)
+    social = np.round(np.clip(rng.normal(2.5, 1.17, n), 0, 7.2), 1)
+    netflix = np.round(np.clip(rng.normal(1.82, 1.08, n), 0, 5.4), 1)
+    attendance = np.round(np.clip(rng.normal(84.1, 9.4, n), 56, 100), 1)
+    sleep = np.round(np.clip(rng.normal(6.47, 1.23, n), 3.2, 10), 1)
+    exercise = rng.integers(0, 7, n)
+    mental = rng.integers(1, 11, n)
+    # Linear fit to the real exam scores, with the same residual spread
+    exam = (6.16 + 9.58 * study - 2.62 * social - 2.28 * netflix + 0.145 * attendance
+            + 2.0 * sleep + 1.45 * exercise + 1.95 * mental + rng.normal(0, 5.3, n))
+    frame = pd.DataFrame({
+        'student_id': np.char.add('S', np.arange(start + 1000, start + n + 1000).astype(str)),
+        'age': rng.integers(17, 25, n),
+        'gender': _choice(rng, KAGGLE_LEVELS['gender'], n),
+        'study_hours_per_day': study,
+        'social_media_hours': social,
+        'netflix_hours': netflix,
+        'part_time_job': _choice(rng, KAGGLE_LEVELS['part_time_job'], n),
+        'attendance_percentage': attendance,
+        'sleep_hours': sleep,
+        'diet_quality': _choice(rng, KAGGLE_LEVELS['diet_quality'], n),
+        'exercise_frequency': exercise,
+        'parental_education_level': _choice(rng, KAGGLE_LEVELS['parental_education_level'], n),
+        'internet_quality': _choice(rng, KAGGLE_LEVELS['internet_quality'], n),
+        'mental_health_rating': mental,
+        'extracurricular_participation': _choice(rng, KAGGLE_LEVELS['extracurricular_participation'], n),
+        'exam_score': np.round(np.clip(exam, 18.4, 100), 1),
+    })
+    return frame
+
+def write_csv(generate, path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Write rows generated chunk by chunk to path"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate(min(chunk_rows, rows - start), seed=seed, start=start)
+            chunk.to_csv(f, index=False, header=(start == 0))
+    return path
+
+def write_inputs(out_dir, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    """Write both synthetic inputs with rows each; returns (cmu_path, kaggle_path)"""
+    cmu_path = write_csv(generate_cmu, os.path.join(out_dir, CMU_FILE), rows, seed, chunk_rows)
+    kaggle_path = write_csv(generate_kaggle, os.path.join(out_dir, KAGGLE_FILE), rows, seed, chunk_rows)
+    return cmu_path, kaggle_path
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic CMU and Kaggle inputs")
+    parser.add_argument("--rows", type=float, default=1e4, help="rows per source (e.g. 1e6)")
+    parser.add_argument("--out-dir", default="bench_data", help="directory for the two CSVs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    rows = int(args.rows)
+    print(f"Generating {rows:,} rows per source in {args.out_dir}/ ...")
+    for path in write_inputs(args.out_dir, rows, args.seed, args.chunk_rows):
+        print(f"  ✓ {path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+"""
+Test setup - Sleep Patterns and Academic Performance
+Puts scripts/ on the import path, as running a script from there does
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,41 @@
+"""
+Analysis Table Tests - Sleep Patterns and Academic Performance
+Regression tests for analysis_tables.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+import analysis_tables
+
+def test_category_anova_with_one_category():
+    """A single populated sleep category gives a NaN ANOVA instead of ZeroDivisionError"""
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        'dataset_source': ['CMU'] * 10 + ['Kaggle'] * 10,
+        'sleep_category': ['Adequate'] * 20,
+        'sleep_hours': rng.uniform(7, 8, 20),
+        'academic_score': rng.uniform(50, 100, 20),
+        'productivity_score': np.r_[np.full(10, np.nan), rng.uniform(0, 100, 10)],
+    })
+    anova = analysis_tables.build_tables(analysis_tables.compute_moments(df))['category_analysis.json']['anova']
+    assert np.isnan(anova['f_statistic']) and np.isnan(anova['p_value'])
+    assert anova['significant'] is False
+
+def test_significance_level_comes_from_config(tmp_path, monkeypatch):
+    """category_analysis.json flags significance at analysis.significance_level, not a fixed 0.05"""
+    df = pd.DataFrame({
+        'dataset_source': ['Kaggle'] * 40,
+        'sleep_category': ['Poor'] * 20 + ['Optimal'] * 20,
+        'sleep_hours': np.r_[np.full(20, 5.0), np.full(20, 8.0)],
+        'academic_score': np.r_[np.linspace(50, 60, 20), np.linspace(58, 68, 20)],
+    })
+    moments = analysis_tables.compute_moments(df)
+    assert analysis_tables.category_table(moments, alpha=0.05)['anova']['significant']
+    config = tmp_path / "config.yaml"
+    config.write_text("analysis:\n  significance_level: 1.0e-12\n")
+    monkeypatch.setenv("PIPELINE_CONFIG", str(config))
+    assert not analysis_tables.category_table(moments)['anova']['significant']
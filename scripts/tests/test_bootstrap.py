@@ -0,0 +1,22 @@
+"""
+Bootstrap Tests - Sleep Patterns and Academic Performance
+Regression tests for bootstrap.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+
+import bootstrap
+
+def _data(seed):
+    rng = np.random.default_rng(seed)
+    return {source: tuple(rng.normal(size=50) for _ in range(3)) for source in bootstrap.SOURCES}
+
+def test_worker_cache_follows_content():
+    """A new data set never reuses cached products, even if it lands at a recycled id()"""
+    first = bootstrap.observed_statistics(_data(0))
+    second = bootstrap.observed_statistics(_data(1))
+    assert first['model_1_simple'] != second['model_1_simple']
+    assert bootstrap.observed_statistics(_data(0)) == first
@@ -0,0 +1,129 @@
+"""
+Data Acquisition Tests - Sleep Patterns and Academic Performance
+01_data_acquisition.py against a local HTTP stand-in server (--source NAME=URL)
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parents[1] / "01_data_acquisition.py"
+# Overrides the default CMU source, so nothing leaves the machine
+NAME = "cmu_sleep.csv"
+BODY = b"subject_id,TotalSleepTime,term_gpa\n" + b"".join(
+    f"{i},{360 + i % 120},{2 + (i % 20) / 10:.1f}\n".encode() for i in range(2000))
+ETAG = '"v1"'
+
+class StandIn(BaseHTTPRequestHandler):
+    """Serves BODY with an ETag, conditional GETs and byte ranges (If-Range on the ETag)"""
+
+    seen = []
+
+    def do_GET(self):
+        self.seen.append(dict(self.headers))
+        if self.headers.get("If-None-Match") == ETAG:
+            self._reply(304)
+            return
+        requested = self.headers.get("Range")
+        if requested and self.headers.get("If-Range") == ETAG:
+            start = int(requested.split("=", 1)[1].rstrip("-"))
+            if start >= len(BODY):
+                self._reply(416, {"Content-Range": f"bytes */{len(BODY)}"})
+            else:
+                self._reply(206, {"Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}"},
+                            BODY[start:])
+            return
+        self._reply(200, body=BODY)
+
+    def _reply(self, status, headers=None, body=b""):
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    handler = type("Handler", (StandIn,), {"seen": []})
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}/{NAME}", handler.seen
+    httpd.shutdown()
+    httpd.server_close()
+
+def acquire(tmp_path, url):
+    """Run the script with the stand-in in place of the CMU source; returns stdout"""
+    env = {**os.environ, "NO_PROXY": "127.0.0.1", "no_proxy": "127.0.0.1"}
+    result = subprocess.run(
+        [sys.executable, str(SCRIPT), "--data-dir", str(tmp_path / "raw"), "--source", f"{NAME}={url}",
+         "--manifest", str(tmp_path / "MANIFEST.json")],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result.stdout
+
+def write_part(tmp_path, data):
+    raw = tmp_path / "raw"
+    raw.mkdir(exist_ok=True)
+    (raw / f"{NAME}.part").write_bytes(data)
+    (raw / f"{NAME}.part.json").write_text(json.dumps({"etag": ETAG, "last_modified": None}))
+    return raw
+
+def test_resume_with_range(tmp_path, server):
+    url, seen = server
+    raw = write_part(tmp_path, BODY[:1000])
+    out = acquire(tmp_path, url)
+    assert "Download resumed and completed" in out
+    assert seen[-1]["Range"] == "bytes=1000-"
+    assert (raw / NAME).read_bytes() == BODY
+    assert not (raw / f"{NAME}.part").exists()
+
+def test_not_modified_on_if_none_match(tmp_path, server):
+    url, seen = server
+    acquire(tmp_path, url)
+    out = acquire(tmp_path, url)
+    assert "304 Not Modified" in out
+    assert seen[-1]["If-None-Match"] == ETAG
+    assert (tmp_path / "raw" / NAME).read_bytes() == BODY
+
+def test_checksum_mismatch_rejects_download(tmp_path, server):
+    url, _ = server
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    (raw / "CHECKSUMS.txt").write_text(f"{NAME}:\n{'0' * 64}\n")
+    out = acquire(tmp_path, url)
+    assert "does not match CHECKSUMS.txt" in out
+    assert not (raw / NAME).exists()
+    assert not (raw / f"{NAME}.part").exists()
+
+def test_416_completes_a_full_part(tmp_path, server):
+    url, seen = server
+    raw = write_part(tmp_path, BODY)
+    out = acquire(tmp_path, url)
+    assert seen[-1]["Range"] == f"bytes={len(BODY)}-"
+    assert "Download resumed and completed" in out
+    assert (raw / NAME).read_bytes() == BODY
+    assert hashlib.sha256(BODY).hexdigest() in out
+
+def test_416_discards_an_oversized_part(tmp_path, server):
+    url, _ = server
+    raw = write_part(tmp_path, BODY + b"junk\n")
+    out = acquire(tmp_path, url)
+    assert "partial download discarded" in out
+    assert not (raw / NAME).exists()
+    assert not (raw / f"{NAME}.part").exists()
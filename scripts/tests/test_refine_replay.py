@@ -0,0 +1,23 @@
+"""
+OpenRefine Replay Tests - Sleep Patterns and Academic Performance
+The replay must reproduce the cleaned CSVs exported from OpenRefine
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import os
+
+import pytest
+
+import refine_replay
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.mark.parametrize('dataset', sorted(refine_replay.RECIPES))
+def test_replay_matches_committed_cleaned_csv(dataset, tmp_path):
+    raw, history, cleaned = refine_replay.RECIPES[dataset]
+    output = tmp_path / cleaned
+    refine_replay.replay(os.path.join(ROOT, history), os.path.join(ROOT, raw), str(output), chunksize=200)
+    reference = os.path.join(ROOT, refine_replay.REFERENCE_DIR, cleaned)
+    assert refine_replay.compare_csv(str(output), reference) == []
@@ -0,0 +1,22 @@
+"""
+Result Cache Tests - Sleep Patterns and Academic Performance
+Regression tests for result_cache.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import result_cache
+
+def test_key_follows_significance_level(tmp_path, monkeypatch):
+    """significance_level changes the category tables, so it must change the key"""
+    source = tmp_path / "input.csv"
+    source.write_text("a,b\n1,2\n")
+    config = tmp_path / "config.yaml"
+    monkeypatch.setenv("PIPELINE_CONFIG", str(config))
+    keys = []
+    for alpha in ["0.05", "0.01", "0.05"]:
+        config.write_text(f"analysis:\n  significance_level: {alpha}\n")
+        keys.append(result_cache.cache_key([str(source)], tmp_path / "cache"))
+    assert keys[0] != keys[1]
+    assert keys[0] == keys[2]
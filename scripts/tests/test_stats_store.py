@@ -0,0 +1,37 @@
+"""
+Stats Store Tests - Sleep Patterns and Academic Performance
+Regression tests for stats_store.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import stats_store
+
+def _batch(seed, rows=40):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'dataset_source': rng.choice(['CMU', 'Kaggle'], rows),
+        'sleep_category': rng.choice(['Poor', 'Adequate', 'Optimal'], rows),
+        'sleep_hours': rng.uniform(4, 10, rows),
+        'academic_score': rng.uniform(40, 100, rows),
+        'productivity_score': rng.uniform(0, 100, rows),
+    })
+
+def test_append_refuses_a_stored_term():
+    """Re-sending a term is refused instead of counting its rows twice"""
+    store = stats_store.StatsStore().append(_batch(0), 'A')
+    with pytest.raises(ValueError, match="already in the store"):
+        store.append(_batch(0), 'A')
+    assert store.moments().rows.sum() == 40
+
+def test_append_replace_drops_the_term_first():
+    """replace=True swaps the term's rows and leaves other terms alone"""
+    store = stats_store.StatsStore().append(_batch(0), 'A').append(_batch(1), 'B')
+    store.append(_batch(2, rows=25), 'A', replace=True)
+    assert store.moments(terms=['A']).rows.sum() == 25
+    assert store.moments(terms=['B']).rows.sum() == 40
@@ -0,0 +1,37 @@
+"""
+Storage Tests - Sleep Patterns and Academic Performance
+Regression tests for storage.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import storage
+
+def test_unseen_gender_is_kept():
+    """A label outside GENDERS extends the vocabulary instead of becoming NaN"""
+    out = storage.apply_schema(pd.DataFrame({'gender': ['Male', 'Non-binary', None]}))
+    assert out['gender'].tolist()[:2] == ['Male', 'Non-binary']
+    assert list(out['gender'].cat.categories) == storage.GENDERS + ['Non-binary']
+
+def test_unseen_source_is_rejected():
+    """Sources are a closed vocabulary (analysis groups and layout key on them)"""
+    with pytest.raises(ValueError, match="UIUC"):
+        storage.apply_schema(pd.DataFrame({'dataset_source': ['CMU', 'UIUC']}))
+
+def test_resolve_input_prefers_newer_csv(tmp_path):
+    """A CSV written after the columnar copy is not shadowed by the stale copy"""
+    store, csv = tmp_path / "data.parquet", tmp_path / "data.csv"
+    (store / "core").mkdir(parents=True)
+    (store / "core" / "part-0.parquet").write_bytes(b"")
+    csv.write_text("record_id\n")
+    os.utime(store / "core" / "part-0.parquet", (1000, 1000))
+    os.utime(csv, (2000, 2000))
+    assert storage.resolve_input(str(store), str(csv)) == str(csv)
+    os.utime(csv, (1000, 1000))
+    assert storage.resolve_input(str(store), str(csv)) == str(store)
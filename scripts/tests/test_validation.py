@@ -0,0 +1,29 @@
+"""
+Validation Tests - Sleep Patterns and Academic Performance
+Regression tests for validation.py
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+import validation
+
+def test_seen_keys_after_empty_chunk():
+    """An empty chunk (e.g. fully dropped by dedup) neither crashes nor forgets earlier keys"""
+    seen = validation.SeenKeys()
+    assert not seen.add(np.array([1, 2], dtype=np.int64)).any()
+    assert len(seen.add(np.array([], dtype=np.int64))) == 0
+    assert seen.add(np.array([2, 3], dtype=np.int64)).tolist() == [True, False]
+
+def test_unique_rule_across_empty_chunk():
+    """The unique rule still flags repeats in chunks that follow an empty one"""
+    validator = validation.Validator([{'name': 'id_unique', 'unique': 'student_id'}])
+    chunk = pd.DataFrame({'student_id': ['a', 'b'], 'record_id': [1, 2]})
+    validator.validate(chunk)
+    validator.validate(chunk.iloc[:0])
+    kept, quarantined = validator.validate(pd.DataFrame({'student_id': ['b', 'c'], 'record_id': [3, 4]}))
+    assert kept['student_id'].tolist() == ['c']
+    assert quarantined['record_id'].tolist() == [3]
@@ -0,0 +1,310 @@
+"""
+Stage Tracing - Sleep Patterns and Academic Performance
+Per-stage spans with timings, memory, rows and I/O, plus opt-in profiling
+
+    tracing.configure("analysis", trace_dir="results/traces")
+    with tracing.span("load_data") as s:
+        df = ...
+        s.set(rows_out=len(df))
+    tracing.finish()
+
+Every span records wall and CPU time (this process, plus reaped child
+processes), the process peak RSS when it ended and how much the span raised
+it, rows in/out when the stage sets them, and bytes read/written by the
+process during the span (/proc/self/io; left out where unavailable).
+Spans nest. finish() prints a per-stage table and writes a Chrome trace,
+<trace_dir>/<name>.trace.json, which chrome://tracing and
+https://ui.perfetto.dev open directly; every event carries the metrics in
+its args, so the file doubles as the machine-readable record.
+
+Profiling is opt-in (--profile MODE, limited with --profile-stages):
+    cprofile  cProfile per stage: <name>.<stage>.prof (pstats / snakeviz)
+              and the top functions by cumulative time in the span's args
+    sample    a sampling thread records the main thread's stack every 5 ms:
+              <name>.<stage>.folded (collapsed stacks for flamegraph.pl or
+              speedscope)
+Only one profiler runs at a time; spans nested inside a profiled span are
+covered by it.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+PROFILE_MODES = ['cprofile', 'sample']
+SAMPLE_INTERVAL = 0.005
+PROFILE_TOP = 15
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+def io_counters():
+    """(bytes read, bytes written) by this process so far, or None"""
+    try:
+        with open('/proc/self/io') as f:
+            fields = dict(line.split(':', 1) for line in f if ':' in line)
+        return int(fields['rchar']), int(fields['wchar'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+def _cpu_seconds():
+    times = os.times()
+    return times.user + times.system, times.children_user + times.children_system
+
+class SamplingProfiler:
+    """Collapsed-stack sampler for one thread (default: the calling thread)"""
+
+    def __init__(self, interval=SAMPLE_INTERVAL, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id or threading.get_ident()
+        self.stacks = {}
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack = ';'.join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1]):
+                f.write(f"{stack} {count}\n")
+
+class Span:
+    """One traced stage; set() attaches rows, bytes or any other metric"""
+
+    def __init__(self, name, depth, fields):
+        self.name = name
+        self.depth = depth
+        self.fields = dict(fields)
+        self.start = self.end = None
+        self.metrics = {}
+
+    def set(self, **fields):
+        self.fields.update(fields)
+        return self
+
+class Tracer:
+    """Collects spans for one script run"""
+
+    def __init__(self, name='pipeline', trace_dir=None, profile=None, profile_stages=None):
+        if profile not in (None, *PROFILE_MODES):
+            raise ValueError(f"Unknown profile mode {profile!r}; expected one of {PROFILE_MODES}")
+        self.name = name
+        self.trace_dir = trace_dir
+        self.profile = profile
+        self.profile_stages = set(profile_stages) if profile_stages else None
+        self.spans = []
+        self.depth = 0
+        self.profiling = False
+        self.origin = time.perf_counter()
+        self.wall_clock = time.time()
+
+    def _wants_profile(self, name):
+        return (self.profile is not None and not self.profiling
+                and (self.profile_stages is None or name in self.profile_stages))
+
+    def _profile_path(self, name, suffix):
+        os.makedirs(self.trace_dir or ".", exist_ok=True)
+        safe = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+        return os.path.join(self.trace_dir or ".", f"{self.name}.{safe}.{suffix}")
+
+    def _start_profiler(self, name):
+        if not self._wants_profile(name):
+            return None
+        self.profiling = True
+        if self.profile == 'cprofile':
+            import cProfile
+            profiler = cProfile.Profile()
+            profiler.enable()
+            return profiler
+        profiler = SamplingProfiler()
+        profiler.start()
+        return profiler
+
+    def _stop_profiler(self, profiler, span):
+        if profiler is None:
+            return
+        self.profiling = False
+        if self.profile == 'cprofile':
+            import pstats
+            profiler.disable()
+            path = self._profile_path(span.name, 'prof')
+            profiler.dump_stats(path)
+            stats = pstats.Stats(profiler).sort_stats('cumulative')
+            top = []
+            for func in stats.fcn_list[:PROFILE_TOP]:
+                calls, _, total, cumulative, _ = stats.stats[func]
+                top.append({'function': f"{func[2]} ({os.path.basename(func[0])}:{func[1]})",
+                            'calls': calls, 'total_seconds': round(total, 6),
+                            'cumulative_seconds': round(cumulative, 6)})
+            span.metrics['profile'] = {'mode': 'cprofile', 'path': path, 'top': top}
+        else:
+            profiler.stop()
+            path = self._profile_path(span.name, 'folded')
+            profiler.write(path)
+            span.metrics['profile'] = {'mode': 'sample', 'path': path, 'samples': profiler.samples,
+                                       'interval_seconds': profiler.interval}
+
+    @contextmanager
+    def span(self, name, **fields):
+        span = Span(name, self.depth, fields)
+        self.depth += 1
+        profiler = self._start_profiler(name)
+        io_start = io_counters()
+        peak_start = peak_rss_mb()
+        cpu_start, children_start = _cpu_seconds()
+        span.start = time.perf_counter()
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            cpu_end, children_end = _cpu_seconds()
+            peak_end = peak_rss_mb()
+            io_end = io_counters()
+            self._stop_profiler(profiler, span)
+            self.depth -= 1
+            span.metrics.update({
+                'wall_seconds': span.end - span.start,
+                'cpu_seconds': cpu_end - cpu_start,
+                'child_cpu_seconds': children_end - children_start,
+            })
+            if peak_end is not None:
+                span.metrics['peak_rss_mb'] = peak_end
+                span.metrics['peak_rss_growth_mb'] = peak_end - peak_start
+            if io_start is not None and io_end is not None:
+                span.metrics.setdefault('bytes_read', io_end[0] - io_start[0])
+                span.metrics.setdefault('bytes_written', io_end[1] - io_start[1])
+            self.spans.append(span)
+
+    def record(self):
+        """Spans in start order as plain dicts"""
+        rows = []
+        for span in sorted(self.spans, key=lambda s: s.start):
+            row = {'name': span.name, 'depth': span.depth,
+                   'start_seconds': span.start - self.origin}
+            row.update(span.metrics)
+            # Values a stage set itself win over the measured defaults (e.g. bytes of one file)
+            row.update(span.fields)
+            rows.append(row)
+        return rows
+
+    def chrome_trace(self):
+        """Chrome trace-event JSON object (complete events plus a peak-RSS counter)"""
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 1,
+                   'args': {'name': self.name}}]
+        for row in self.record():
+            start_us = row['start_seconds'] * 1e6
+            args = {k: v for k, v in row.items() if k not in ('name', 'depth', 'start_seconds')}
+            events.append({'name': row['name'], 'cat': 'stage', 'ph': 'X', 'pid': pid, 'tid': 1,
+                           'ts': round(start_us, 1), 'dur': round(row['wall_seconds'] * 1e6, 1),
+                           'args': args})
+            if 'peak_rss_mb' in row:
+                events.append({'name': 'peak_rss_mb', 'ph': 'C', 'pid': pid, 'tid': 1,
+                               'ts': round(start_us + row['wall_seconds'] * 1e6, 1),
+                               'args': {'MB': round(row['peak_rss_mb'], 1)}})
+        return {
+            'traceEvents': events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'name': self.name, 'started': self.wall_clock, 'argv': sys.argv,
+                          'python': sys.version.split()[0]},
+        }
+
+    def write(self):
+        """Write <trace_dir>/<name>.trace.json; returns the path (None if tracing to disk is off)"""
+        if not self.trace_dir:
+            return None
+        os.makedirs(self.trace_dir, exist_ok=True)
+        path = os.path.join(self.trace_dir, f"{self.name}.trace.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.chrome_trace(), f, indent=1, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    def summary(self):
+        """Per-stage table for the console"""
+        def fmt(value, spec):
+            return format(value, spec) if value is not None else '-'
+
+        lines = [f"  {'stage':30s}{'wall s':>9s}{'cpu s':>9s}{'peak MB':>9s}"
+                 f"{'rows in':>11s}{'rows out':>11s}{'read MB':>9s}{'write MB':>9s}"]
+        for row in self.record():
+            cpu = row['cpu_seconds'] + row['child_cpu_seconds']
+            read = row.get('bytes_read')
+            written = row.get('bytes_written')
+            lines.append(
+                f"  {('  ' * row['depth'] + row['name'])[:30]:30s}"
+                f"{row['wall_seconds']:9.3f}{cpu:9.3f}{fmt(row.get('peak_rss_mb'), '9.1f'):>9s}"
+                f"{fmt(row.get('rows_in'), ',d'):>11s}{fmt(row.get('rows_out'), ',d'):>11s}"
+                f"{fmt(None if read is None else read / 1e6, '9.2f'):>9s}"
+                f"{fmt(None if written is None else written / 1e6, '9.2f'):>9s}")
+        return '\n'.join(lines)
+
+# Tracer used by span() until configure() replaces it (records, never writes)
+_tracer = Tracer()
+
+def configure(name, trace_dir=None, profile=None, profile_stages=None):
+    """Start a fresh tracer for this run; returns it"""
+    global _tracer
+    _tracer = Tracer(name, trace_dir, profile, profile_stages)
+    return _tracer
+
+def span(name, **fields):
+    """Context manager timing one stage of the current tracer"""
+    return _tracer.span(name, **fields)
+
+def finish(print_summary=True):
+    """Print the stage table and write the trace; returns the trace path"""
+    path = _tracer.write()
+    if print_summary and _tracer.spans:
+        print("\nStage timings:")
+        print(_tracer.summary())
+        if path:
+            print(f"  Trace: {path}")
+    return path
+
+def add_arguments(parser, default_dir):
+    """--trace-dir / --profile / --profile-stages for a script's argparse parser
+
+    --trace-dir defaults to None; the script resolves it (default_dir is only shown in --help).
+    """
+    parser.add_argument("--trace-dir", default=None,
+                        help=f"where the Chrome trace goes (default: {default_dir}; '' = no file)")
+    parser.add_argument("--profile", choices=PROFILE_MODES, default=None,
+                        help="profile stages with cProfile or the sampling profiler")
+    parser.add_argument("--profile-stages", nargs='+', default=None, metavar="STAGE",
+                        help="only profile these stages (default: every top-level stage)")
@@ -0,0 +1,364 @@
+"""
+Data Validation - Sleep Patterns and Academic Performance
+Declarative data-quality rules checked in one vectorized pass per chunk
+
+Rules come from the validation section of config.yaml (DEFAULT_RULES when
+it is absent). Each rule has a name, a severity and one check:
+
+    range     {column, min, max}           value outside [min, max]
+              (min_exclusive / max_exclusive make an end open; missing
+              values pass)
+    not_null  [columns]                    any of them missing
+    allowed   {column, values}             label outside the list (missing passes)
+    unique    column                       value seen before, in this chunk or
+                                           an earlier one (first occurrence passes)
+    check     "expression"                 cross-field condition (DataFrame.eval
+                                           syntax) that must hold; rows where a
+                                           column it uses is missing are skipped
+
+`sources: [...]` limits any rule to some dataset_source values.
+compile_rules() turns the list into closures over numpy columns once;
+Validator.validate() evaluates every rule on a chunk into one violation
+matrix, counts violations per rule, and splits off rows that break an
+'error' rule into a quarantine file (with the broken rules listed per row).
+'warn' rules are only counted and reported.
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+SEVERITIES = ['error', 'warn']
+RULE_KINDS = ['range', 'not_null', 'allowed', 'unique', 'check']
+
+# Default output locations
+QUARANTINE_DIR = "data/quarantine"
+SUMMARY_FILE = "validation_summary.json"
+
+# record_ids kept per rule as examples in the summary
+EXAMPLES = 5
+
+# Used when config.yaml has no validation section (mirrors the shipped config)
+DEFAULT_RULES = [
+    {'name': 'identity_not_null', 'not_null': ['record_id', 'student_id', 'dataset_source'], 'severity': 'error'},
+    {'name': 'student_id_unique', 'unique': 'student_id', 'severity': 'error'},
+    {'name': 'sleep_hours_possible', 'range': {'column': 'sleep_hours', 'min': 0, 'max': 24,
+                                               'min_exclusive': True}, 'severity': 'error'},
+    {'name': 'academic_score_scale', 'range': {'column': 'academic_score', 'min': 0, 'max': 100},
+     'severity': 'error'},
+    {'name': 'cumulative_gpa_scale', 'range': {'column': 'cumulative_gpa', 'min': 0, 'max': 4},
+     'severity': 'error'},
+    {'name': 'attendance_percentage_scale', 'range': {'column': 'attendance_percentage', 'min': 0, 'max': 100},
+     'severity': 'error'},
+    {'name': 'daily_hours_possible', 'check': 'study_hours_per_day + distraction_hours <= 24',
+     'sources': ['Kaggle'], 'severity': 'error'},
+    {'name': 'sleep_category_assigned', 'not_null': ['sleep_category'], 'severity': 'warn'},
+    {'name': 'sleep_hours_in_bins', 'range': {'column': 'sleep_hours', 'min': 0, 'max': 12,
+                                              'min_exclusive': True}, 'severity': 'warn'},
+    {'name': 'productivity_score_scale', 'range': {'column': 'productivity_score', 'min': 0, 'max': 100},
+     'severity': 'warn'},
+    {'name': 'gender_known', 'not_null': ['gender'], 'severity': 'warn'},
+    {'name': 'gender_levels', 'allowed': {'column': 'gender', 'values': storage.GENDERS}, 'severity': 'warn'},
+    {'name': 'age_plausible', 'range': {'column': 'age', 'min': 15, 'max': 80}, 'severity': 'warn'},
+    {'name': 'day_accounted_for', 'check': 'sleep_hours + study_hours_per_day + distraction_hours <= 24',
+     'sources': ['Kaggle'], 'severity': 'warn'},
+]
+
+_NAME = re.compile(r'[A-Za-z_]\w*')
+_KEYWORDS = {'and', 'or', 'not', 'in', 'True', 'False', 'abs'}
+
+class SeenKeys:
+    """64-bit hashes of every key seen so far, as a few sorted runs (merged like a binary counter)"""
+
+    def __init__(self):
+        self.runs = []
+
+    def _seen(self, keys):
+        found = np.zeros(len(keys), dtype=bool)
+        for run in self.runs:
+            if not len(run):
+                continue
+            idx = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found |= run[idx] == keys
+        return found
+
+    def add(self, keys, order=None):
+        """Mark keys as seen; returns which were duplicates (earlier chunk or earlier in this one)
+
+        order gives the row positions in the order that decides which copy counts as first.
+        """
+        ordered = keys if order is None else keys[order]
+        unique, first = np.unique(ordered, return_index=True)
+        repeated = np.ones(len(keys), dtype=bool)
+        repeated[first] = False
+        if order is not None:
+            repeated[order] = repeated.copy()
+        duplicate = repeated | self._seen(keys)
+        if not len(unique):
+            return duplicate
+        self.runs.append(unique)
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], last)
+        return duplicate
+
+class Rule:
+    """One compiled rule: name, severity and a function from a chunk to a violation mask"""
+
+    def __init__(self, name, severity, test, sources=None):
+        self.name = name
+        self.severity = severity
+        self.test = test
+        self.sources = sources
+
+    def violations(self, chunk, columns):
+        mask = self.test(chunk, columns)
+        if self.sources is not None:
+            mask &= columns.in_sources(self.sources)
+        return mask
+
+class Columns:
+    """Per-chunk cache of columns as float arrays / label series, converted once for all rules"""
+
+    def __init__(self, chunk, order=None):
+        self.chunk = chunk
+        self.order = order
+        self.numbers = {}
+        self.labels = {}
+        self.sources = {}
+        self.nulls = {}
+
+    def number(self, name):
+        if name not in self.numbers:
+            values = self.chunk[name]
+            if values.dtype == object:
+                values = pd.to_numeric(values, errors='coerce')
+            self.numbers[name] = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        return self.numbers[name]
+
+    def label(self, name):
+        if name not in self.labels:
+            self.labels[name] = self.chunk[name].astype('object')
+        return self.labels[name]
+
+    def in_sources(self, sources):
+        key = tuple(sources)
+        if key not in self.sources:
+            self.sources[key] = self.label(storage.PARTITION_COLUMN).isin(sources).to_numpy()
+        return self.sources[key]
+
+    def missing(self, name):
+        if name not in self.nulls:
+            self.nulls[name] = self.chunk[name].isna().to_numpy()
+        return self.nulls[name]
+
+def _is_numeric(name):
+    return storage.PANDAS_DTYPES.get(name) in ('float32', 'int64')
+
+def _range_test(spec):
+    column, low, high = spec['column'], spec.get('min'), spec.get('max')
+    low_open, high_open = spec.get('min_exclusive', False), spec.get('max_exclusive', False)
+
+    def test(chunk, columns):
+        values = columns.number(column)
+        with np.errstate(invalid='ignore'):
+            bad = np.zeros(len(values), dtype=bool)
+            if low is not None:
+                bad |= values <= low if low_open else values < low
+            if high is not None:
+                bad |= values >= high if high_open else values > high
+        return bad
+    return test, [column]
+
+def _not_null_test(spec):
+    names = [spec] if isinstance(spec, str) else list(spec)
+
+    def test(chunk, columns):
+        bad = np.zeros(len(chunk), dtype=bool)
+        for name in names:
+            bad |= columns.missing(name)
+        return bad
+    return test, names
+
+def _allowed_test(spec):
+    column, values = spec['column'], [str(v) for v in spec['values']]
+
+    def test(chunk, columns):
+        labels = columns.label(column)
+        return (labels.notna() & ~labels.astype(str).isin(values)).to_numpy()
+    return test, [column]
+
+def _unique_test(spec):
+    column = spec
+    seen = SeenKeys()
+
+    def test(chunk, columns):
+        # Python's string hash: cached on the objects and salted per process, which is
+        # fine because the seen keys never leave this process
+        values = columns.label(column).astype(str).to_numpy(dtype=object)
+        keys = np.fromiter(map(hash, values), dtype=np.int64, count=len(values))
+        return seen.add(keys, columns.order)
+    return test, [column]
+
+def _check_test(spec):
+    expression = spec
+    names = sorted(set(_NAME.findall(expression)) - _KEYWORDS)
+
+    def test(chunk, columns):
+        skip = np.zeros(len(chunk), dtype=bool)
+        for name in names:
+            skip |= columns.missing(name)
+        frame = pd.DataFrame({name: columns.number(name) if _is_numeric(name) else columns.label(name)
+                              for name in names}, index=chunk.index)
+        holds = np.asarray(frame.eval(expression), dtype=bool)
+        return ~holds & ~skip
+    return test, names
+
+_COMPILERS = {
+    'range': _range_test,
+    'not_null': _not_null_test,
+    'allowed': _allowed_test,
+    'unique': _unique_test,
+    'check': _check_test,
+}
+
+def compile_rules(rules=None, columns=None):
+    """Compiled Rule objects for rule dicts (DEFAULT_RULES if None)
+
+    columns (default: the integrated schema) is what the rules may refer to;
+    unknown columns, kinds or severities raise ValueError here, not mid-run.
+    """
+    rules = DEFAULT_RULES if rules is None else rules
+    known = set(columns if columns is not None else storage.ARROW_SCHEMA.names)
+    compiled, names = [], set()
+    for rule in rules:
+        kinds = [kind for kind in RULE_KINDS if kind in rule]
+        name = rule.get('name') or (f"{kinds[0]}_{len(compiled)}" if kinds else None)
+        if len(kinds) != 1:
+            raise ValueError(f"Validation rule {name or rule!r} needs exactly one of {RULE_KINDS}")
+        if name in names:
+            raise ValueError(f"Duplicate validation rule name {name!r}")
+        severity = rule.get('severity', 'error')
+        if severity not in SEVERITIES:
+            raise ValueError(f"Rule {name!r}: severity must be one of {SEVERITIES}, got {severity!r}")
+        test, used = _COMPILERS[kinds[0]](rule[kinds[0]])
+        unknown = sorted(set(used) - known)
+        if unknown:
+            raise ValueError(f"Rule {name!r} refers to unknown columns {unknown}")
+        sources = rule.get('sources')
+        compiled.append(Rule(name, severity, test, None if sources is None else list(sources)))
+        names.add(name)
+    return compiled
+
+class Validator:
+    """Runs compiled rules over successive chunks and keeps the violation summary"""
+
+    def __init__(self, rules=None, quarantine_path=None):
+        self.rules = compile_rules(rules)
+        self.quarantine_path = quarantine_path
+        self.rows = 0
+        self.quarantined = 0
+        self.counts = {rule.name: 0 for rule in self.rules}
+        self.examples = {rule.name: [] for rule in self.rules}
+        self._quarantine_started = False
+        if quarantine_path and os.path.exists(quarantine_path):
+            os.remove(quarantine_path)
+
+    def validate(self, chunk, order=None):
+        """(rows passing every error rule, quarantined rows with a 'violations' column)
+
+        order (row positions) sets which copy of a duplicate is the first; default: chunk order.
+        """
+        columns = Columns(chunk, order)
+        matrix = np.column_stack([rule.violations(chunk, columns) for rule in self.rules]) \
+            if self.rules else np.zeros((len(chunk), 0), dtype=bool)
+        self.rows += len(chunk)
+
+        counts = matrix.sum(axis=0)
+        for j, rule in enumerate(self.rules):
+            if counts[j]:
+                self.counts[rule.name] += int(counts[j])
+                room = EXAMPLES - len(self.examples[rule.name])
+                if room > 0 and 'record_id' in chunk.columns:
+                    ids = chunk['record_id'].to_numpy()[matrix[:, j]][:room]
+                    self.examples[rule.name].extend(int(i) for i in ids)
+
+        errors = [j for j, rule in enumerate(self.rules) if rule.severity == 'error']
+        bad = matrix[:, errors].any(axis=1)
+        if not bad.any():
+            return chunk, chunk.iloc[:0]
+
+        names = np.array([self.rules[j].name for j in errors], dtype=object)
+        quarantined = chunk.loc[bad].copy()
+        quarantined['violations'] = [';'.join(names[row]) for row in matrix[bad][:, errors]]
+        if order is not None:
+            rank = np.empty(len(chunk), dtype=np.int64)
+            rank[order] = np.arange(len(chunk))
+            quarantined = quarantined.iloc[np.argsort(rank[bad], kind='stable')]
+        self.quarantined += len(quarantined)
+        self._write_quarantine(quarantined)
+        return chunk.loc[~bad], quarantined
+
+    def _write_quarantine(self, rows):
+        if not self.quarantine_path:
+            return
+        os.makedirs(os.path.dirname(self.quarantine_path) or ".", exist_ok=True)
+        rows.to_csv(self.quarantine_path, mode='a' if self._quarantine_started else 'w',
+                    header=not self._quarantine_started, index=False)
+        self._quarantine_started = True
+
+    def summary(self):
+        """Rows checked, rows quarantined, and per-rule counts with example record_ids"""
+        return {
+            'rows_checked': self.rows,
+            'rows_quarantined': self.quarantined,
+            'rules': {rule.name: {'severity': rule.severity, 'violations': self.counts[rule.name],
+                                  'example_record_ids': self.examples[rule.name]}
+                      for rule in self.rules},
+        }
+
+def merge_summaries(summaries):
+    """Add up summaries from several validators (e.g. one per shard)"""
+    merged = {'rows_checked': 0, 'rows_quarantined': 0, 'rules': {}}
+    for summary in summaries:
+        merged['rows_checked'] += summary['rows_checked']
+        merged['rows_quarantined'] += summary['rows_quarantined']
+        for name, rule in summary['rules'].items():
+            entry = merged['rules'].setdefault(name, {'severity': rule['severity'], 'violations': 0,
+                                                      'example_record_ids': []})
+            entry['violations'] += rule['violations']
+            entry['example_record_ids'] = (entry['example_record_ids'] + rule['example_record_ids'])[:EXAMPLES]
+    return merged
+
+def load_rules(config=None):
+    """Rules from config.yaml's validation section, else DEFAULT_RULES"""
+    import pipeline_config
+    rules = pipeline_config.analysis_params(config)['validation_rules']
+    return DEFAULT_RULES if rules is None else rules
+
+def write_summary(summary, quarantine_dir=QUARANTINE_DIR):
+    """Write <quarantine_dir>/validation_summary.json; returns the path"""
+    os.makedirs(quarantine_dir, exist_ok=True)
+    path = os.path.join(quarantine_dir, SUMMARY_FILE)
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+    return path
+
+def print_summary(summary):
+    """Console report of the rules that fired"""
+    fired = {name: rule for name, rule in summary['rules'].items() if rule['violations']}
+    print(f"  ✓ Validated {summary['rows_checked']:,} rows against {len(summary['rules'])} rules; "
+          f"{summary['rows_quarantined']:,} quarantined")
+    for name, rule in fired.items():
+        mark = '✗' if rule['severity'] == 'error' else '!'
+        examples = ', '.join(str(i) for i in rule['example_record_ids'])
+        print(f"    {mark} {name} ({rule['severity']}): {rule['violations']:,} rows"
+              + (f" (e.g. record_id {examples})" if examples else ""))
@@ -0,0 +1,412 @@
+"""
+Workflow DAG - Sleep Patterns and Academic Performance
+Per-artifact tasks with declared inputs, run on a local worker pool
+
+Every table and figure is its own task, declaring the files it reads, the
+scripts whose code it runs and the parameters it depends on:
+
+    clean_cmu, clean_kaggle       raw CSV + OpenRefine history -> cleaned_*.csv
+                                  (only when the raw drops are present)
+    integrate                     cleaned CSVs -> integrated CSV + columnar store,
+                                  quarantine/dedup reports + dedup index
+    descriptive_statistics, correlations, regression_results,
+    category_analysis, sleep_category_sensitivity
+                                  store -> results/tables/<name>.json
+    fig01 .. fig04                store (+ the tables they annotate) -> results/figures/*.png
+
+Independent tasks run concurrently on a process pool (-j N). Before a task
+runs, its inputs, code and parameters are hashed; if the digest matches
+the last successful run and its outputs are still the files that run
+wrote, the task is skipped. Because downstream digests use the content of
+upstream outputs, a task that re-runs but writes identical bytes does not
+trigger its dependents. File hashes are memoized on (size, mtime) like the
+checksum manifest, and state lives in .cache/workflow_state.json.
+
+Usage:
+    python workflow.py -j 4                     # build everything that changed
+    python workflow.py regression_results fig02 # these targets and what they need
+    python workflow.py --dry-run                # show what would run
+    python workflow.py --only fig01             # one task, inputs assumed built (Snakemake rules)
+    python workflow.py --force --list
+
+Author: [Your Name]
+Date: December 2025
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import checksums
+import pipeline_config
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+STATE_PATH = ".cache/workflow_state.json"
+LOG_DIR = "logs"
+
+INTEGRATED_CSV = "data/integrated_data.csv"
+STORE = "data/integrated_data.parquet"
+QUARANTINE_DIR = "data/quarantine"
+DEDUP_INDEX = "data/dedup/index.sqlite"
+TABLES_DIR = "results/tables"
+FIGURES_DIR = "results/figures"
+
+# Code every analysis task runs (in addition to its own modules)
+ANALYSIS_CODE = ["sleep_analysis/pipeline.py", "storage.py", "compact_frame.py"]
+TABLE_CODE = ANALYSIS_CODE + ["analysis_tables.py", "stats_kernel.py", "ols_engine.py"]
+FIGURE_CODE = ANALYSIS_CODE + ["figures.py", "plot_reduction.py"]
+
+TABLES = {
+    'descriptive_statistics': 'descriptive_table',
+    'correlations': 'correlation_table',
+    'regression_results': None,
+    'category_analysis': 'category_table',
+    'sleep_category_sensitivity': None,
+}
+
+# Figure task -> (figure name, tables it annotates)
+FIGURES = {
+    'fig01': ('01_sleep_distribution', []),
+    'fig02': ('02_sleep_vs_performance', ['regression_results']),
+    'fig03': ('03_dataset_comparison', []),
+    'fig04': ('04_productivity_mediation', ['correlations']),
+}
+
+class Task:
+    """A unit of work with declared inputs, code and outputs"""
+
+    def __init__(self, name, action, inputs, outputs, code=(), params=None):
+        self.name = name
+        self.action = action
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = [str(SCRIPTS_DIR / c) for c in code]
+        self.params = params or {}
+        self.digest = None
+
+# ---------------------------------------------------------------------------
+# Task actions (run in worker processes)
+# ---------------------------------------------------------------------------
+
+def _clean(dataset):
+    import refine_replay
+    raw, history, cleaned = refine_replay.RECIPES[dataset]
+    summary = refine_replay.replay(history, raw, cleaned)
+    print(f"{dataset}: {summary['rows_in']} rows in, {summary['rows_out']} rows out")
+
+def _integrate():
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "02_data_integration.py"), "--output", INTEGRATED_CSV,
+         "--store", STORE, "--quarantine-dir", QUARANTINE_DIR, "--dedup-index", DEDUP_INDEX, "--trace-dir", ""],
+        stdout=sys.stdout, stderr=subprocess.STDOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"02_data_integration.py exited with {result.returncode}")
+
+def _table(name, resamples, permutations, seed):
+    import analysis_tables
+    from sleep_analysis import pipeline
+    df, _, _ = pipeline.load_data(STORE)
+    moments = analysis_tables.compute_moments(df)
+    if name == 'regression_results':
+        # The DAG already runs tasks in parallel; resampling stays in this worker
+        table = pipeline.regression_with_intervals(df, moments, resamples, permutations, seed, jobs=1)
+    elif name == 'sleep_category_sensitivity':
+        table = pipeline.sensitivity_table(df)
+    else:
+        table = getattr(analysis_tables, TABLES[name])(moments)
+    pipeline.write_tables({f"{name}.json": table}, TABLES_DIR)
+
+def _load_table(name):
+    with open(os.path.join(TABLES_DIR, f"{name}.json")) as f:
+        return json.load(f)
+
+def _figure(task_name):
+    import figures
+    from sleep_analysis import pipeline
+    name, _ = FIGURES[task_name]
+    df, cmu_df, kaggle_df = pipeline.load_data(STORE)
+    if name == '01_sleep_distribution':
+        inputs = figures.sleep_distribution_inputs(df)
+    elif name == '02_sleep_vs_performance':
+        inputs = figures.sleep_vs_performance_inputs(df, _load_table('regression_results')['model_1_simple'])
+    elif name == '03_dataset_comparison':
+        inputs = figures.dataset_comparison_inputs(cmu_df, kaggle_df)
+    else:
+        inputs = figures.productivity_inputs(kaggle_df, _load_table('correlations'))
+    os.makedirs(FIGURES_DIR, exist_ok=True)
+    figures.render(name, inputs, os.path.join(FIGURES_DIR, f"{name}.png"))
+
+ACTIONS = {'clean': _clean, 'integrate': _integrate, 'table': _table, 'figure': _figure}
+
+def _execute(name, action, args, log_dir):
+    """Worker entry point: run one action with its output captured in logs/<task>.log"""
+    os.makedirs(log_dir, exist_ok=True)
+    start = time.perf_counter()
+    with open(os.path.join(log_dir, f"{name}.log"), 'w') as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        ACTIONS[action](*args)
+    return time.perf_counter() - start
+
+# ---------------------------------------------------------------------------
+# Task graph
+# ---------------------------------------------------------------------------
+
+def build_tasks(resamples=None, permutations=None, seed=None):
+    """The project's tasks in definition order"""
+    import bootstrap
+    import refine_replay
+    params = pipeline_config.analysis_params()
+    resampling = {
+        'resamples': bootstrap.DEFAULT_RESAMPLES if resamples is None else resamples,
+        'permutations': bootstrap.DEFAULT_PERMUTATIONS if permutations is None else permutations,
+        'seed': bootstrap.DEFAULT_SEED if seed is None else seed,
+    }
+    tasks = []
+    # Cleaning only joins the graph when the raw drops exist; otherwise the cleaned CSVs are sources
+    for dataset, (raw, history, cleaned) in refine_replay.RECIPES.items():
+        if os.path.exists(raw):
+            tasks.append(Task(f"clean_{dataset}", ('clean', (dataset,)), [raw, history], [cleaned],
+                              code=["refine_replay.py"]))
+    tasks.append(Task('integrate', ('integrate', ()), [cleaned for _, _, cleaned in refine_replay.RECIPES.values()],
+                      [INTEGRATED_CSV, STORE, QUARANTINE_DIR, DEDUP_INDEX],
+                      code=["02_data_integration.py", "storage.py", "compact_frame.py", "validation.py", "binning.py",
+                            "derived.py", "dedup.py"], params=params))
+    for name in TABLES:
+        code, extra = TABLE_CODE, {}
+        if name == 'regression_results':
+            code, extra = TABLE_CODE + ["bootstrap.py", "mixed_model.py"], resampling
+        elif name == 'sleep_category_sensitivity':
+            code = TABLE_CODE + ["binning.py"]
+        tasks.append(Task(name, ('table', (name, resampling['resamples'], resampling['permutations'],
+                                           resampling['seed'])),
+                          [STORE], [os.path.join(TABLES_DIR, f"{name}.json")], code=code,
+                          params={**params, **extra}))
+    for task_name, (figure, tables) in FIGURES.items():
+        tasks.append(Task(task_name, ('figure', (task_name,)),
+                          [STORE] + [os.path.join(TABLES_DIR, f"{t}.json") for t in tables],
+                          [os.path.join(FIGURES_DIR, f"{figure}.png")], code=FIGURE_CODE))
+    return tasks
+
+def dependencies(tasks):
+    """{task name: set of task names producing its inputs}"""
+    producers = {output: task.name for task in tasks for output in task.outputs}
+    return {task.name: {producers[i] for i in task.inputs if i in producers} for task in tasks}
+
+def select(tasks, targets):
+    """Tasks needed for targets (task names or output paths), in definition order"""
+    if not targets:
+        return tasks
+    by_name = {task.name: task for task in tasks}
+    producers = {Path(output).as_posix(): task.name for task in tasks for output in task.outputs}
+    deps = dependencies(tasks)
+    wanted, stack = set(), []
+    for target in targets:
+        name = target if target in by_name else producers.get(Path(target).as_posix())
+        if name is None:
+            raise ValueError(f"Unknown target {target!r} (tasks: {', '.join(by_name)})")
+        stack.append(name)
+    while stack:
+        name = stack.pop()
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(deps[name])
+    return [task for task in tasks if task.name in wanted]
+
+# ---------------------------------------------------------------------------
+# Change detection
+# ---------------------------------------------------------------------------
+
+def _files(path):
+    """Files behind an input/output path (directories are expanded)"""
+    if os.path.isdir(path):
+        return sorted(p.as_posix() for p in Path(path).rglob("*") if p.is_file())
+    return [path] if os.path.exists(path) else []
+
+def _stats(paths):
+    """{file: [size, mtime_ns]} for every file behind paths"""
+    stats = {}
+    for path in paths:
+        for f in _files(path):
+            st = os.stat(f)
+            stats[f] = [st.st_size, st.st_mtime_ns]
+    return stats
+
+def _hash(paths, memo):
+    """{file: sha256}, reusing memo entries whose size and mtime are unchanged"""
+    files = {f: 'workflow' for path in paths for f in _files(path)}
+    manifest, _ = checksums.build_manifest(files, {'files': memo})
+    memo.update(manifest['files'])
+    return {f: entry['sha256'] for f, entry in manifest['files'].items()}
+
+def task_digest(task, memo):
+    """Digest over the task's input contents, code and parameters (None if an input is missing)"""
+    missing = [i for i in task.inputs if not _files(i)]
+    if missing:
+        return None
+    record = {
+        'task': task.name,
+        'inputs': _hash(task.inputs, memo),
+        'code': _hash(task.code, memo),
+        'params': task.params,
+    }
+    return hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+def up_to_date(task, digest, state):
+    """True if the last run had this digest and its outputs are untouched"""
+    previous = state['tasks'].get(task.name)
+    if digest is None or not previous or previous['digest'] != digest:
+        return False
+    if not all(_files(output) for output in task.outputs):
+        return False
+    return _stats(task.outputs) == previous['outputs']
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return {'tasks': {}, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+# ---------------------------------------------------------------------------
+# Executor
+# ---------------------------------------------------------------------------
+
+def run(tasks, jobs=None, force=False, dry_run=False, only=False, state_path=STATE_PATH, log_dir=LOG_DIR):
+    """Run tasks in dependency order on a pool of jobs workers
+
+    Returns {task name: status} with status one of ran, skipped, failed,
+    blocked (an upstream task failed) or would-run (dry run).
+    """
+    state = load_state(state_path)
+    deps = dependencies(tasks) if not only else {task.name: set() for task in tasks}
+    names = {task.name for task in tasks}
+    deps = {name: d & names for name, d in deps.items()}
+    by_name = {task.name: task for task in tasks}
+    status, running = {}, {}
+
+    def ready():
+        return [t for t in tasks if t.name not in status and t.name not in running.values()
+                and all(d in status for d in deps[t.name])]
+
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        while len(status) < len(tasks):
+            for task in ready():
+                upstream = [status[d] for d in deps[task.name]]
+                if any(s in ('failed', 'blocked') for s in upstream):
+                    status[task.name] = 'blocked'
+                    print(f"  - {task.name}: blocked (upstream failure)")
+                    continue
+                if dry_run and any(s == 'would-run' for s in upstream):
+                    status[task.name] = 'would-run'
+                    print(f"  • {task.name}: would run (after upstream)")
+                    continue
+                digest = task_digest(task, state['files'])
+                if not force and up_to_date(task, digest, state):
+                    status[task.name] = 'skipped'
+                    print(f"  - {task.name}: unchanged, skipped")
+                    continue
+                if digest is None:
+                    missing = [i for i in task.inputs if not _files(i)]
+                    status[task.name] = 'failed'
+                    print(f"  ✗ {task.name}: missing inputs {missing}")
+                    continue
+                if dry_run:
+                    status[task.name] = 'would-run'
+                    print(f"  • {task.name}: would run")
+                    continue
+                action, args = task.action
+                future = pool.submit(_execute, task.name, action, args, log_dir)
+                running[future] = task.name
+                state['tasks'].pop(task.name, None)
+                task.digest = digest
+            if not running:
+                if not ready() and len(status) < len(tasks):
+                    raise ValueError("Task graph has a cycle: "
+                                     + ", ".join(t.name for t in tasks if t.name not in status))
+                continue
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                task = by_name[name]
+                try:
+                    seconds = future.result()
+                except Exception as exc:
+                    status[name] = 'failed'
+                    print(f"  ✗ {name}: {exc} (see {os.path.join(log_dir, name + '.log')})")
+                    continue
+                status[name] = 'ran'
+                state['tasks'][name] = {'digest': task.digest, 'outputs': _stats(task.outputs),
+                                        'seconds': round(seconds, 3)}
+                print(f"  ✓ {name} ({seconds:.2f}s)")
+                if not dry_run:
+                    save_state(state, state_path)
+    if not dry_run:
+        save_state(state, state_path)
+    return status
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the pipeline as a DAG of per-artifact tasks")
+    parser.add_argument("targets", nargs='*', help="task names or output paths (default: everything)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="run tasks even if their inputs are unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="show what would run")
+    parser.add_argument("--only", action="store_true", help="run just the named tasks, not their upstream tasks")
+    parser.add_argument("--list", action="store_true", help="list tasks with inputs and outputs")
+    parser.add_argument("--bootstrap", type=int, default=None, metavar="N", help="bootstrap resamples")
+    parser.add_argument("--permutations", type=int, default=None, metavar="N", help="permutations")
+    parser.add_argument("--seed", type=int, default=None, help="seed for resampling")
+    parser.add_argument("--state", default=STATE_PATH, help="task state file")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    tasks = build_tasks(args.bootstrap, args.permutations, args.seed)
+    if args.list:
+        deps = dependencies(tasks)
+        for task in tasks:
+            after = f" (after {', '.join(sorted(deps[task.name]))})" if deps[task.name] else ""
+            print(f"{task.name}{after}\n    in:  {', '.join(task.inputs)}\n    out: {', '.join(task.outputs)}")
+        return
+    try:
+        if args.only:
+            by_name = {task.name: task for task in tasks}
+            unknown = [t for t in args.targets if t not in by_name]
+            if unknown or not args.targets:
+                raise ValueError(f"--only needs task names (unknown: {unknown}; tasks: {', '.join(by_name)})")
+            tasks = [by_name[t] for t in args.targets]
+        else:
+            tasks = select(tasks, args.targets)
+    except ValueError as exc:
+        print(f"✗ {exc}")
+        sys.exit(2)
+
+    print("=" * 70)
+    print(f"WORKFLOW: {len(tasks)} tasks, {args.jobs or os.cpu_count()} workers"
+          + (" (dry run)" if args.dry_run else ""))
+    print("=" * 70)
+    start = time.perf_counter()
+    status = run(tasks, args.jobs, args.force, args.dry_run, args.only, args.state)
+    counts = {s: sum(1 for v in status.values() if v == s) for s in sorted(set(status.values()))}
+    print("\n" + "=" * 70)
+    print(f"{'✗' if 'failed' in counts or 'blocked' in counts else '✓'} "
+          + ", ".join(f"{n} {s}" for s, n in counts.items())
+          + f" in {time.perf_counter() - start:.2f}s")
+    print("=" * 70)
+    if 'failed' in counts or 'blocked' in counts:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()